@@ -4,13 +4,20 @@ Processes raw alerts through assessment, correlation, filtering, and scoring
 Determines actionability of alerts
 """
 
+import heapq
 import json
 import time
+import uuid
+from array import array
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from collections import defaultdict
+from bisect import bisect_left
 import re
 
+from rule_compiler import CompiledRules, load_rules, weekday_hour
+from sim_clock import SYSTEM_CLOCK
+
 
 class AlertNormalizer:
     """Convert different alert formats to standard format"""
@@ -34,7 +41,7 @@ class AlertNormalizer:
             "check_id": alert_data.get("check_id", 0),
             "activity_name": alert_data.get("activity_name", "Unknown"),
             "url": alert_data.get("url", ""),
-            "status": alert_data.get("status", "unknown"),  # success, failure, error
+            "status": alert_data.get("status", "unknown"),  # success, failure, content_violation, error
             "response_code": alert_data.get("response_code"),
             "response_time": alert_data.get("response_time", 0),
             "error_message": alert_data.get("error_message", ""),
@@ -46,13 +53,79 @@ class AlertNormalizer:
         }
 
 
+class FrequencyWindow:
+    """
+    Alert count over a sliding window of event time, in a ring of one-second buckets
+    
+    Memory is fixed by the window. Alerts arriving in time order are
+    counted in O(1); late alerts (backfill, replay out of order) still land
+    in their own bucket and are counted against their own time.
+    """
+    
+    def __init__(self, window_seconds: int = 300):
+        self.window_seconds = window_seconds
+        self.buckets = array("I", [0]) * window_seconds
+        self.head: Optional[int] = None  # Latest second seen
+        self.total = 0                   # Alerts in (head - window, head]
+    
+    def add(self, second: int) -> int:
+        """
+        Count an alert at an epoch second
+        
+        Returns:
+            Earlier alerts within the window ending at that second
+        """
+        
+        if self.head is None or second - self.head >= self.window_seconds:
+            self.buckets = array("I", [0]) * self.window_seconds
+            self.head = second
+            self.total = 0
+        elif second > self.head:
+            for expired in range(self.head + 1, second + 1):
+                slot = expired % self.window_seconds
+                self.total -= self.buckets[slot]
+                self.buckets[slot] = 0
+            self.head = second
+        elif second <= self.head - self.window_seconds:
+            return 0  # Older than everything the ring still holds
+        
+        count = self.count(second)
+        self.buckets[second % self.window_seconds] += 1
+        self.total += 1
+        return count
+    
+    def count(self, second: int) -> int:
+        """Alerts within the window ending at second"""
+        
+        if self.head is None or second <= self.head - self.window_seconds:
+            return 0
+        if second == self.head:
+            return self.total
+        low = max(second, self.head) - self.window_seconds + 1
+        high = min(second, self.head)
+        return sum(self.buckets[t % self.window_seconds] for t in range(low, high + 1))
+
+
+def _epoch_seconds(moment: datetime) -> int:
+    """Whole seconds since the epoch; aware timestamps are taken as local time"""
+    
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return (moment - _EPOCH) // timedelta(seconds=1)
+
+
 class AlertAssessor:
     """Assess if alert is actionable"""
     
-    def __init__(self, history_file: str = "alert_history.json"):
+    def __init__(self, history_file: str = "alert_history.json", clock=None,
+                 compiled_rules: CompiledRules = None):
         self.history_file = history_file
+        self.clock = clock or SYSTEM_CLOCK
+        # Storms are counted against the same threshold RuleEngine deduplicates on
+        self.storm_threshold = (compiled_rules or load_rules()).storm_threshold
         self.known_false_positives = self._load_false_positives()
-        self.alert_frequency = defaultdict(list)
+        self.alert_frequency: Dict[str, FrequencyWindow] = defaultdict(FrequencyWindow)
+        self.baselines: Dict[str, Dict] = {}  # Per-activity alert counts and response time
     
     def assess(self, alert: Dict) -> Dict:
         """
@@ -71,6 +144,7 @@ class AlertAssessor:
             "threshold_exceeded": self._check_threshold(alert)
         }
         
+        self._update_baseline(alert)
         return assessment
     
     def _check_false_positive(self, alert: Dict) -> bool:
@@ -104,30 +178,35 @@ class AlertAssessor:
         """Check alert frequency/storm"""
         
         activity = alert["activity_name"]
-        now = datetime.now()
-        five_min_ago = now - timedelta(minutes=5)
-        
-        # Get alerts for this activity in last 5 minutes
-        recent_alerts = [
-            a for a in self.alert_frequency.get(activity, [])
-            if datetime.fromisoformat(a["timestamp"]) > five_min_ago
-        ]
         
-        self.alert_frequency[activity].append(alert)
+        # Windows follow the alert's own time, so backfills and replays
+        # count the same as live cycles
+        moment = _parse_timestamp(alert.get("timestamp")) or self.clock.now()
+        count = self.alert_frequency[activity].add(_epoch_seconds(moment))
         
         return {
-            "count_5_min": len(recent_alerts),
-            "exceeded": len(recent_alerts) > 10,  # Threshold: >10 in 5 min
-            "is_storm": len(recent_alerts) > 50
+            "count_5_min": count,
+            "exceeded": count > 10,  # Threshold: >10 in 5 min
+            "is_storm": count > self.storm_threshold
         }
     
     def _has_historical_context(self, alert: Dict) -> bool:
         """Check if we have historical data for this activity"""
         
-        activity = alert["activity_name"]
-        # In real system, would query database
-        # For now, return True (assume we have context after first run)
-        return True
+        baseline = self.baselines.get(alert["activity_name"])
+        return baseline is not None and baseline["alerts"] > 0
+    
+    def _update_baseline(self, alert: Dict):
+        """Fold the alert into its activity's running baseline"""
+        
+        baseline = self.baselines.setdefault(alert["activity_name"], {
+            "alerts": 0, "failures": 0, "avg_response_time": 0.0
+        })
+        baseline["alerts"] += 1
+        if alert.get("status") != "success":
+            baseline["failures"] += 1
+        response_time = alert.get("response_time") or 0
+        baseline["avg_response_time"] += (response_time - baseline["avg_response_time"]) / baseline["alerts"]
     
     def _calculate_severity(self, alert: Dict) -> float:
         """Calculate severity score 0-10"""
@@ -136,6 +215,8 @@ class AlertAssessor:
         
         if alert["status"] == "failure":
             base_score += 3
+        elif alert["status"] == "content_violation":
+            base_score += 2  # Page is up but serving broken content
         
         if alert["response_code"] and alert["response_code"] >= 500:
             base_score += 2
@@ -159,7 +240,7 @@ class AlertAssessor:
             return True
         
         # Failed status
-        if alert["status"] in ["failure", "error"]:
+        if alert["status"] in ["failure", "content_violation", "error"]:
             return True
         
         return False
@@ -174,6 +255,68 @@ class AlertAssessor:
         }
 
 
+CASCADE_KEYWORDS = ("timeout", "connection", "refused")
+
+# Engine incidents stay open from one scheduled run (every 10 minutes) to the
+# next, so a failure that persists across cycles remains a single incident
+INCIDENT_WINDOW = 900
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _micros(moment: datetime) -> int:
+    """Integer microseconds since the epoch (naive timestamps against a naive epoch)"""
+    
+    epoch = _EPOCH if moment.tzinfo is None else _EPOCH_UTC
+    return (moment - epoch) // timedelta(microseconds=1)
+
+
+class _TimeIndex:
+    """Alert indexes sorted by time; taken entries are skipped through a union-find next pointer"""
+    
+    def __init__(self):
+        self._entries = []
+        self._keys = None
+        self._next = None
+    
+    def add(self, micros: int, index: int):
+        self._entries.append((micros, index))
+    
+    def take(self, low: int, high: int, processed: List[bool]):
+        """Yield unprocessed alert indexes with low <= time <= high"""
+        
+        if self._keys is None:
+            self._entries.sort()
+            self._keys = [micros for micros, _ in self._entries]
+            self._next = list(range(len(self._entries) + 1))
+        
+        position = self._find(bisect_left(self._keys, low))
+        while position < len(self._keys) and self._keys[position] <= high:
+            index = self._entries[position][1]
+            if processed[index]:
+                self._next[position] = position + 1
+            else:
+                yield index
+                if processed[index]:
+                    self._next[position] = position + 1
+            position = self._find(position + 1)
+    
+    def _find(self, position: int) -> int:
+        root = position
+        while self._next[root] != root:
+            root = self._next[root]
+        while self._next[position] != root:
+            self._next[position], position = root, self._next[position]
+        return root
+
+
 class EventCorrelator:
     """Correlate related alerts"""
     
@@ -185,6 +328,16 @@ class EventCorrelator:
         """
         Correlate related alerts into groups
         
+        Each unprocessed alert, in order, collects every later unprocessed
+        alert correlated with it (see _are_correlated). Candidates come from
+        indexes instead of a pair scan:
+        
+        - same activity: all remaining alerts of that activity
+        - duplicate: remaining alerts with the same error message, found by
+          bisecting their timestamps
+        - cascade: remaining timeout/connection/refused alerts, when the
+          alert reports a network failure
+        
         Args:
             alerts: List of normalized alerts
         
@@ -195,25 +348,59 @@ class EventCorrelator:
         if not alerts:
             return []
         
+        by_activity = defaultdict(list)
+        by_message = defaultdict(_TimeIndex)
+        cascade_candidates = []
+        network = []
+        moments = []
+        
+        # Timestamps are parsed and messages lowercased once per alert
+        for i, alert in enumerate(alerts):
+            by_activity[alert["activity_name"]].append(i)
+            message = alert.get("error_message", "").lower()
+            network.append("network" in message)
+            if any(keyword in message for keyword in CASCADE_KEYWORDS):
+                cascade_candidates.append(i)
+            
+            moment = _parse_timestamp(alert.get("timestamp"))
+            moments.append(moment)
+            if moment is not None and "error_message" in alert:
+                # Naive and aware timestamps never compare, so they are indexed apart
+                by_message[(alert["error_message"], moment.tzinfo is None)].add(_micros(moment), i)
+        
+        window = timedelta(seconds=self.time_window)
+        window_micros = window // timedelta(microseconds=1)
+        processed = [False] * len(alerts)
         groups = []
-        processed = set()
         
         for i, alert in enumerate(alerts):
-            if i in processed:
+            if processed[i]:
                 continue
+            processed[i] = True
+            members = []
             
-            group = [alert]
-            processed.add(i)
+            for j in by_activity.pop(alert["activity_name"], ()):
+                if not processed[j]:
+                    processed[j] = True
+                    members.append(j)
             
-            # Find related alerts
-            for j, other_alert in enumerate(alerts):
-                if j <= i or j in processed:
-                    continue
-                
-                if self._are_correlated(alert, other_alert):
-                    group.append(other_alert)
-                    processed.add(j)
+            moment = moments[i]
+            if moment is not None and "error_message" in alert:
+                index = by_message[(alert["error_message"], moment.tzinfo is None)]
+                micros = _micros(moment)
+                for j in index.take(micros - window_micros, micros + window_micros, processed):
+                    if abs((moments[j] - moment).total_seconds()) < self.time_window:
+                        processed[j] = True
+                        members.append(j)
             
+            if network[i]:
+                for j in cascade_candidates:
+                    if not processed[j]:
+                        processed[j] = True
+                        members.append(j)
+                cascade_candidates = []
+            
+            group = [alert] + [alerts[j] for j in sorted(members)]
             groups.append({
                 "group_id": f"group_{i}",
                 "alerts": group,
@@ -253,31 +440,264 @@ class EventCorrelator:
     def _infer_root_cause(self, alert_group: List[Dict]) -> str:
         """Infer root cause from alert group"""
         
-        error_messages = [a.get("error_message", "") for a in alert_group]
-        
-        if any("timeout" in msg.lower() for msg in error_messages):
-            return "Network timeout or high latency"
+        signals = set()
+        for alert in alert_group:
+            signals |= _root_cause_signals(alert)
+        return _root_cause(signals, len(alert_group))
+
+
+def _root_cause_signals(alert: Dict) -> set:
+    """Root-cause hints carried by one alert"""
+    
+    message = alert.get("error_message", "").lower()
+    response_code = str(alert.get("response_code", ""))
+    return {signal for signal, present in (
+        ("timeout", "timeout" in message),
+        ("connection", "connection" in message),
+        ("503", "503" in response_code),
+        ("500", "500" in response_code)
+    ) if present}
+
+
+def _root_cause(signals: set, count: int) -> str:
+    """Root cause of a group from its alerts' signals, in priority order"""
+    
+    if "timeout" in signals:
+        return "Network timeout or high latency"
+    
+    if "connection" in signals:
+        return "Connection/Connectivity issue"
+    
+    if "503" in signals:
+        return "Service unavailable"
+    
+    if "500" in signals:
+        return "Server error"
+    
+    if count > 5:
+        return "Multiple service failures - possible cascading issue"
+    
+    return "Unknown cause"
+
+
+def _last_update_per_incident(events: List[Dict]) -> List[Dict]:
+    """Drop all but each incident's last "updated" event of a batch"""
+    
+    last_update = {event["group_id"]: i for i, event in enumerate(events) if event["event"] == "updated"}
+    return [event for i, event in enumerate(events)
+            if event["event"] != "updated" or last_update[event["group_id"]] == i]
+
+
+class StreamingEventCorrelator:
+    """
+    Correlate alerts one at a time into incidents that stay open while they
+    keep receiving alerts within time_window
+    
+    An alert joins an open incident with the same activity, the same error
+    message, or the other side of a cascade (a network failure and
+    timeout/connection/refused errors), each within time_window of the
+    incident's last matching alert. An alert matching several incidents
+    merges them into the oldest. Incidents close once the watermark (latest
+    alert time seen) moves time_window past their last alert, so memory is
+    bounded by the window rather than by history.
+    
+    add() returns incident events:
+        opened  - first alert of an incident
+        updated - an alert joined it (or another incident was merged in)
+        closed  - it expired, or was merged into another ("merged_into")
+    """
+    
+    OPENED = "opened"
+    UPDATED = "updated"
+    CLOSED = "closed"
+    
+    def __init__(self, time_window: int = 300, clock=None):
+        """
+        Args:
+            time_window: Seconds an incident stays open after its last alert
+            clock: Clock used for alerts without a parseable timestamp
+        """
+        self.time_window = time_window
+        self.clock = clock or SYSTEM_CLOCK
+        self.watermark: Optional[datetime] = None
+        self.incidents: Dict[str, Dict] = {}
+        self._window = timedelta(seconds=time_window)
+        self._index: Dict[Tuple, Tuple[str, datetime]] = {}  # match key -> (incident, last seen)
+        self._expiry = []                                     # heap of (last seen, incident)
+    
+    def add(self, alert: Dict) -> List[Dict]:
+        """
+        Correlate one alert
         
-        if any("connection" in msg.lower() for msg in error_messages):
-            return "Connection/Connectivity issue"
+        Returns:
+            Incident events caused by this alert, including incidents it expired
+        """
         
-        if any("503" in str(a.get("response_code", "")) for a in alert_group):
-            return "Service unavailable"
+        moment = self._moment(alert)
+        if self.watermark is None or moment > self.watermark:
+            self.watermark = moment
+        
+        message = alert.get("error_message", "")
+        lowered = message.lower()
+        keys = [("activity", alert.get("activity_name"))]
+        if message:
+            keys.append(("message", message))
+        matches = list(keys)
+        if "network" in lowered:
+            keys.append(("network",))
+            matches.append(("cascade",))
+        if any(keyword in lowered for keyword in CASCADE_KEYWORDS):
+            keys.append(("cascade",))
+            matches.append(("network",))
+        
+        found = []
+        for key in matches:
+            entry = self._index.get(key)
+            if entry is not None and entry[0] in self.incidents and abs(moment - entry[1]) < self._window:
+                if entry[0] not in found:
+                    found.append(entry[0])
+        
+        events = []
+        if found:
+            found.sort(key=lambda incident_id: self.incidents[incident_id]["first_seen"])
+            incident = self.incidents[found[0]]
+            for other_id in found[1:]:
+                events.append(self._merge(incident, self.incidents.pop(other_id)))
+            self._join(incident, alert, moment)
+            event_type = self.UPDATED
+        else:
+            incident = {
+                "group_id": f"incident_{alert.get('alert_id') or uuid.uuid4().hex[:12]}",
+                "first_seen": moment,
+                "last_seen": moment,
+                "count": 0,
+                "activities": set(),
+                "signals": set(),
+                "first_alert_id": alert.get("alert_id")
+            }
+            self.incidents[incident["group_id"]] = incident
+            self._join(incident, alert, moment)
+            event_type = self.OPENED
+        
+        for key in keys:
+            entry = self._index.get(key)
+            if entry is None or entry[0] != incident["group_id"] or entry[1] < moment:
+                self._index[key] = (incident["group_id"], moment)
+        
+        events.append(self._event(event_type, incident, alert.get("alert_id")))
+        events.extend(self._evict())
+        return events
+    
+    def add_many(self, alerts: List[Dict]) -> List[Dict]:
+        """Correlate alerts in order; returns all their incident events"""
         
-        if any("500" in str(a.get("response_code", "")) for a in alert_group):
-            return "Server error"
+        events = []
+        for alert in alerts:
+            events.extend(self.add(alert))
+        return events
+    
+    def advance(self, moment: datetime) -> List[Dict]:
+        """Move the watermark to moment without an alert (e.g. between cycles) and close expired incidents"""
         
-        if len(alert_group) > 5:
-            return "Multiple service failures - possible cascading issue"
+        if self.watermark is None or moment > self.watermark:
+            self.watermark = moment
+        return self._evict()
+    
+    def flush(self) -> List[Dict]:
+        """Close every open incident"""
+        
+        events = [self._event(self.CLOSED, incident) for incident in
+                  sorted(self.incidents.values(), key=lambda i: i["first_seen"])]
+        self.incidents.clear()
+        self._index.clear()
+        self._expiry.clear()
+        return events
+    
+    def restore(self, incident: Dict):
+        """Reopen an incident saved by a previous run"""
         
-        return "Unknown cause"
+        self.incidents[incident["group_id"]] = incident
+        heapq.heappush(self._expiry, (incident["last_seen"], incident["group_id"]))
+    
+    def _moment(self, alert: Dict) -> datetime:
+        moment = _parse_timestamp(alert.get("timestamp"))
+        if moment is None:
+            return self.clock.now()
+        if moment.tzinfo is not None:
+            moment = moment.astimezone().replace(tzinfo=None)
+        return moment
+    
+    def _join(self, incident: Dict, alert: Dict, moment: datetime):
+        incident["count"] += 1
+        incident["activities"].add(alert.get("activity_name"))
+        incident["signals"] |= _root_cause_signals(alert)
+        incident["first_seen"] = min(incident["first_seen"], moment)
+        if moment >= incident["last_seen"]:
+            incident["last_seen"] = moment
+        heapq.heappush(self._expiry, (incident["last_seen"], incident["group_id"]))
+    
+    def _merge(self, incident: Dict, other: Dict) -> Dict:
+        incident["count"] += other["count"]
+        incident["activities"] |= other["activities"]
+        incident["signals"] |= other["signals"]
+        incident["first_seen"] = min(incident["first_seen"], other["first_seen"])
+        incident["last_seen"] = max(incident["last_seen"], other["last_seen"])
+        for key, (incident_id, seen) in list(self._index.items()):
+            if incident_id == other["group_id"]:
+                self._index[key] = (incident["group_id"], seen)
+        closed = self._event(self.CLOSED, other)
+        closed["merged_into"] = incident["group_id"]
+        return closed
+    
+    def _evict(self) -> List[Dict]:
+        """Close incidents whose last alert fell out of the window"""
+        
+        events = []
+        cutoff = self.watermark - self._window
+        while self._expiry and self._expiry[0][0] <= cutoff:
+            last_seen, incident_id = heapq.heappop(self._expiry)
+            incident = self.incidents.get(incident_id)
+            if incident is None or incident["last_seen"] != last_seen:
+                continue  # Merged, closed, or seen again since
+            del self.incidents[incident_id]
+            events.append(self._event(self.CLOSED, incident))
+        
+        if events:
+            stale = [key for key, (incident_id, seen) in self._index.items()
+                     if seen <= cutoff or incident_id not in self.incidents]
+            for key in stale:
+                del self._index[key]
+        return events
+    
+    def _event(self, event_type: str, incident: Dict, alert_id: str = None) -> Dict:
+        return {
+            "event": event_type,
+            "group_id": incident["group_id"],
+            "alert_id": alert_id,
+            "count": incident["count"],
+            "activities": sorted(str(a) for a in incident["activities"]),
+            "root_cause": _root_cause(incident["signals"], incident["count"]),
+            "first_seen": incident["first_seen"].isoformat(),
+            "last_seen": incident["last_seen"].isoformat()
+        }
 
 
 class RuleEngine:
     """Apply rules to filter and process alerts"""
     
-    def __init__(self, rules_config: Dict = None):
+    def __init__(self, rules_config: Dict = None, compiled_rules: CompiledRules = None, clock=None):
+        """
+        Args:
+            rules_config: Engine thresholds (defaults to _get_default_rules)
+            compiled_rules: Per-activity rules (defaults to alert_rules.yaml)
+            clock: Time source for alerts without a timestamp
+        """
         self.rules = rules_config or self._get_default_rules()
+        self.compiled_rules = compiled_rules or load_rules()
+        self.clock = clock or SYSTEM_CLOCK
+        # (activity, pattern) -> epoch second the activity first matched a
+        # known false positive with exclude_after_minutes
+        self.false_positive_since: Dict[Tuple[str, str], int] = {}
     
     def apply_rules(self, alert: Dict, assessment: Dict) -> Dict:
         """
@@ -295,28 +715,56 @@ class RuleEngine:
                 "should_create_ticket": False
             }
         
-        # Rule 2: Suppress during maintenance
-        try:
-            timestamp = datetime.fromisoformat(alert["timestamp"])
-            if timestamp.weekday() == 6 and 22 <= timestamp.hour < 24:
+        rule = self.compiled_rules.for_alert(alert)
+        moment = weekday_hour(alert)
+        count_5_min = assessment["frequency_check"]["count_5_min"]
+        
+        # Rule 2: Suppress during maintenance and the activity's false-positive windows
+        maintenance = self.compiled_rules.maintenance_windows.get(moment)
+        if maintenance and maintenance["suppress"]:
+            return {
+                "action": "SUPPRESS",
+                "reason": maintenance["name"],
+                "should_create_ticket": False
+            }
+        
+        if rule is not None:
+            window = rule.false_positive_windows.get(moment)
+            if window and window[1]:
                 return {
                     "action": "SUPPRESS",
-                    "reason": "Maintenance window",
+                    "reason": window[0],
                     "should_create_ticket": False
                 }
-        except:
-            pass
+            
+            # Known false-positive messages; with exclude_after_minutes only
+            # until the activity has kept matching for that long
+            message = alert.get("error_message") or ""
+            for pattern, reason, exclude_after_minutes in rule.known_false_positives:
+                if self._is_known_false_positive(alert, message, pattern, exclude_after_minutes):
+                    return {
+                        "action": "SUPPRESS",
+                        "reason": reason,
+                        "should_create_ticket": False
+                    }
         
         # Rule 3: Suppress if frequency exceeded (deduplication)
-        if assessment["frequency_check"]["is_storm"]:
+        if count_5_min > self.compiled_rules.storm_threshold:
             return {
                 "action": "DEDUPLICATE",
                 "reason": "Alert storm detected",
                 "should_create_ticket": False
             }
         
+        if rule is not None and rule.max_alerts_5_min is not None and count_5_min > rule.max_alerts_5_min:
+            return {
+                "action": "DEDUPLICATE",
+                "reason": "Frequency threshold exceeded",
+                "should_create_ticket": False
+            }
+        
         # Rule 4: Suppress low severity
-        if assessment["severity_score"] < 2 and not alert.get("is_simulated"):
+        if assessment["severity_score"] < self.rules.get("low_severity_threshold", 2) and not alert.get("is_simulated"):
             return {
                 "action": "SUPPRESS",
                 "reason": "Low severity",
@@ -327,9 +775,40 @@ class RuleEngine:
         return {
             "action": "ESCALATE",
             "reason": "Actionable alert",
-            "should_create_ticket": True
+            "should_create_ticket": True,
+            "matched_conditions": [name for name, _ in rule.matched_conditions(alert)] if rule else []
         }
     
+    def escalation_for(self, alert: Dict, score: int) -> Optional[Dict]:
+        """Escalation band (action and notification channels) of the alert's rule for a score"""
+        
+        rule = self.compiled_rules.for_alert(alert)
+        if rule is None:
+            return None
+        return rule.escalation[max(0, min(100, int(score)))]
+
+    def _is_known_false_positive(self, alert: Dict, message: str, pattern: re.Pattern,
+                                 exclude_after_minutes: Optional[int]) -> bool:
+        """
+        Whether a known false-positive pattern suppresses the alert
+
+        A pattern with exclude_after_minutes stops suppressing once the
+        activity has matched it for that many minutes without a clean alert
+        in between: a timeout that outlasts the blip is a real outage.
+        """
+
+        key = (alert.get("activity_name") or alert.get("url", ""), pattern.pattern)
+        if not pattern.search(message):
+            self.false_positive_since.pop(key, None)
+            return False
+        if not exclude_after_minutes:
+            return True
+
+        now = _epoch_seconds(_parse_timestamp(alert.get("timestamp")) or self.clock.now())
+        since = min(self.false_positive_since.get(key, now), now)
+        self.false_positive_since[key] = since
+        return now - since < exclude_after_minutes * 60
+
     def _get_default_rules(self) -> Dict:
         """Get default rule set"""
         return {
@@ -344,7 +823,8 @@ class RuleEngine:
 class ActionabilityScorer:
     """Score alert actionability 0-100"""
     
-    def __init__(self):
+    def __init__(self, compiled_rules: CompiledRules = None):
+        self.compiled_rules = compiled_rules or load_rules()
         self.critical_services = ["account-server", "transaction-server", "loan-server"]
         self.score_weights = {
             "base_failure": 30,
@@ -364,7 +844,7 @@ class ActionabilityScorer:
         score = 0
         
         # Base: failure detection
-        if alert["status"] in ["failure", "error"]:
+        if alert["status"] in ["failure", "content_violation", "error"]:
             score += self.score_weights["base_failure"]
         
         # Not a false positive
@@ -384,13 +864,19 @@ class ActionabilityScorer:
             score += self.score_weights["threshold_exceeded"]
         
         # Critical service boost
-        if any(service in alert["url"].lower() for service in self.critical_services):
+        url = alert["url"].lower()
+        if any(service in url for service in self.critical_services) or self.compiled_rules.is_critical_url(url):
             score += 15
         
         # Simulated defects score lower
         if alert.get("is_simulated"):
             score -= 10
         
+        # Alerts inside a non-suppressing maintenance window score lower
+        maintenance = self.compiled_rules.maintenance_windows.get(weekday_hour(alert))
+        if maintenance:
+            score -= maintenance["reduce_score_by"]
+        
         # Clamp to 0-100
         score = max(0, min(100, score))
         
@@ -400,12 +886,14 @@ class ActionabilityScorer:
 class AlertEngine:
     """Main alert engine coordinating all components"""
     
-    def __init__(self, rules_config: Dict = None):
+    def __init__(self, rules_config: Dict = None, clock=None):
+        compiled_rules = load_rules()
         self.normalizer = AlertNormalizer()
-        self.assessor = AlertAssessor()
+        self.assessor = AlertAssessor(clock=clock, compiled_rules=compiled_rules)
         self.correlator = EventCorrelator()
-        self.rule_engine = RuleEngine(rules_config)
-        self.scorer = ActionabilityScorer()
+        self.incident_correlator = StreamingEventCorrelator(time_window=INCIDENT_WINDOW, clock=clock)
+        self.rule_engine = RuleEngine(rules_config, compiled_rules, clock=clock)
+        self.scorer = ActionabilityScorer(compiled_rules)
         self.processed_alerts = []
     
     def process_alerts(self, raw_alerts: List[Dict]) -> Dict:
@@ -428,12 +916,16 @@ class AlertEngine:
         # Step 3: Correlate
         correlated_groups = self.correlator.correlate(normalized)
         
+        # Incidents stay open across calls while alerts keep arriving
+        incident_events = _last_update_per_incident(self.incident_correlator.add_many(normalized))
+        
         # Step 4: Score & Filter
         results = {
             "actionable_alerts": [],
             "suppressed_alerts": [],
             "deduplicated_alerts": [],
             "correlated_groups": correlated_groups,
+            "incident_events": incident_events,
             "timestamp": datetime.now().isoformat()
         }
         
@@ -449,8 +941,11 @@ class AlertEngine:
                 "assessment": assessment,
                 "rule_result": rule_result,
                 "score": score,
-                "should_create_ticket": rule_result["should_create_ticket"] and score > 60
+                "should_create_ticket": (rule_result["should_create_ticket"]
+                                         and score > self.rule_engine.compiled_rules.ticket_minimum_score)
             }
+            if rule_result["action"] == "ESCALATE":
+                processed["escalation"] = self.rule_engine.escalation_for(alert, score)
             
             # Categorize
             if rule_result["action"] == "SUPPRESS":
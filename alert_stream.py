@@ -0,0 +1,331 @@
+"""
+Alert Stream Module
+Generates high-volume synthetic raw alert streams for load-testing the alert
+engine and storage layer. Check outcomes follow the DefectInjector's
+configured distributions and time windows; injected storms, duplicate
+bursts, cascading network failures and maintenance-window false positives
+are expanded into the alerts they would really produce
+
+Usage:
+    python alert_stream.py --count 1000000 --output raw_alerts.jsonl
+    python alert_stream.py --count 100000 --socket 127.0.0.1:9400
+    python alert_stream.py --count 50000 --load-test --batch-size 1000
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from check_backends import extract_activity_name
+from defect_injector import DefectInjector
+from sim_clock import VirtualClock
+
+
+BASE_URL = "https://kingnstarpancard-code.github.io/axis_automation"
+SOURCE = "synthetic"
+
+
+class AlertStreamGenerator:
+    """Endless, reproducible stream of raw alert events"""
+
+    def __init__(self, checks_per_second: float = 100.0, start: datetime = None, seed: int = 0,
+                 activity_count: int = 7, injector: DefectInjector = None,
+                 cascade_rate: float = 0.25, batch_size: int = 4096,
+                 execution_id: str = "load-test"):
+        """
+        Args:
+            checks_per_second: Check rate in event time (bursts come on top)
+            start: Timestamp of the first check (defaults to now)
+            seed: Seed for defects and burst shapes
+            activity_count: Activities checked round-robin
+            injector: DefectInjector deciding each check's defect (defaults
+                to the default configuration with the given seed)
+            cascade_rate: Share of connection errors that cascade to every
+                other activity
+            batch_size: Checks planned per plan_batch call
+            execution_id: Execution ID stamped on every alert
+        """
+        self.interval = 1.0 / checks_per_second
+        self.start = start or datetime.now()
+        self.seed = seed
+        self.injector = injector or DefectInjector(enabled=True, seed=seed)
+        self.cascade_rate = cascade_rate
+        self.batch_size = batch_size
+        self.execution_id = execution_id
+        self.check_ids = list(range(1, activity_count + 1))
+        self.names = {i: extract_activity_name(f"activity{i}.html") or f"Activity {i}" for i in self.check_ids}
+        self.stats: Dict[str, int] = {}
+        self._sequence = 0
+
+    def events(self, count: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Yield raw alerts in timestamp order
+
+        Args:
+            count: Stop after this many alerts (None = endless)
+        """
+
+        rng = random.Random(f"{self.seed}:bursts")
+        emitted = 0
+        tick = 0
+
+        while True:
+            ticks = range(tick, tick + self.batch_size)
+            check_ids = [self.check_ids[n % len(self.check_ids)] for n in ticks]
+            moments = [self.start + timedelta(seconds=n * self.interval) for n in ticks]
+            plan = self.injector.plan_batch(check_ids, [self.names[i] for i in check_ids], moments)
+
+            for check_id, moment, defect in zip(check_ids, moments, plan):
+                kind = defect["type"] if defect else "NONE"
+                self.stats[kind] = self.stats.get(kind, 0) + 1
+                for alert in self._expand(check_id, moment, defect, rng):
+                    yield alert
+                    emitted += 1
+                    if count is not None and emitted >= count:
+                        return
+            tick += self.batch_size
+
+    def _expand(self, check_id: int, moment: datetime, defect: Optional[Dict],
+                rng: random.Random) -> List[Dict]:
+        """Alerts one check produces; bursts are spread over the check interval"""
+
+        if defect is None:
+            return [self._alert(check_id, moment, "success", 200, rng.uniform(0.2, 1.5), "")]
+
+        kind = defect["type"]
+        message = defect["message"]
+        severity = defect["severity"]
+
+        if kind == "SLOW_RESPONSE":
+            return [self._alert(check_id, moment, "success", 200, defect["response_time"], "",
+                                simulated=True, severity=severity)]
+
+        if kind == "FALSE_POSITIVE":
+            return [self._alert(check_id, moment, "failure", defect["reported_status_code"], 0.4,
+                                message, simulated=True, severity=severity)]
+
+        if kind == "DUPLICATE_ALERT":
+            return self._burst(moment, [(check_id, "Service Unavailable", 503)] * defect["duplicate_count"],
+                               severity)
+
+        if kind == "ALERT_STORM":
+            return self._burst(moment, [(check_id, message, None)] * defect["alert_count"], severity)
+
+        if kind == "CONNECTION_ERROR" and rng.random() < self.cascade_rate:
+            # Network outage: the origin reports the network, every other
+            # activity then fails with connection errors or timeouts
+            failures = [(check_id, "Network unreachable - upstream gateway down", None)]
+            failures += [(other, rng.choice(["Connection refused - server unreachable",
+                                             "Connection timeout after 10s"]), None)
+                         for other in self.check_ids if other != check_id]
+            return self._burst(moment, failures, severity)
+
+        # TIMEOUT and plain CONNECTION_ERROR
+        return [self._alert(check_id, moment, "failure", None, 10.0 if kind == "TIMEOUT" else 0.1,
+                            message, simulated=True, severity=severity)]
+
+    def _burst(self, moment: datetime, failures: List, severity: int) -> List[Dict]:
+        step = self.interval / len(failures)
+        return [self._alert(check_id, moment + timedelta(seconds=k * step), "failure", code, 0.1,
+                            message, simulated=True, severity=severity)
+                for k, (check_id, message, code) in enumerate(failures)]
+
+    def _alert(self, check_id: int, moment: datetime, status: str, response_code: Optional[int],
+               response_time: float, error_message: str, simulated: bool = False,
+               severity: int = 5) -> Dict:
+        """Alert event shaped like the crawler's"""
+
+        self._sequence += 1
+        return {
+            "alert_id": f"{self.execution_id}-{self._sequence}",
+            "execution_id": self.execution_id,
+            "timestamp": moment.isoformat(),
+            "check_id": check_id,
+            "activity_name": self.names[check_id],
+            "url": f"{BASE_URL}/activity{check_id}.html",
+            "status": status,
+            "response_code": response_code,
+            "response_time": round(response_time, 3),
+            "error_message": error_message,
+            "is_simulated": simulated,
+            "severity": severity,
+            "retry_count": 0,
+            "source": SOURCE
+        }
+
+
+def write_file(events: Iterable[Dict], filepath: str) -> int:
+    """
+    Write alerts to a .jsonl journal or, for other extensions, a JSON array
+    (the raw_alerts.json format), without holding them in memory
+
+    Returns:
+        Number of alerts written
+    """
+
+    count = 0
+    with open(filepath, "w") as f:
+        if filepath.endswith(".jsonl"):
+            for alert in events:
+                f.write(json.dumps(alert) + "\n")
+                count += 1
+        else:
+            f.write("[")
+            for alert in events:
+                f.write(("\n" if not count else ",\n") + json.dumps(alert))
+                count += 1
+            f.write("\n]\n")
+    return count
+
+
+def send_to_socket(events: Iterable[Dict], address: str) -> int:
+    """
+    Send alerts as newline-delimited JSON to a TCP "host:port" or a Unix socket path
+
+    Returns:
+        Number of alerts sent
+    """
+
+    if ":" in address:
+        host, port = address.rsplit(":", 1)
+        sock = socket.create_connection((host, int(port)))
+    else:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(address)
+
+    count = 0
+    with sock, sock.makefile("wb", buffering=1024 * 1024) as out:
+        for alert in events:
+            out.write(json.dumps(alert).encode("utf-8") + b"\n")
+            count += 1
+    return count
+
+
+def load_test(events: Iterable[Dict], batch_size: int = 1000, engine=None,
+              db_file: str = None) -> Dict:
+    """
+    Push alerts through AlertEngine.process_alerts in batches, and optionally
+    store each batch in an AlertDatabase (one file save per batch)
+
+    Args:
+        events: Alert stream
+        batch_size: Alerts per process_alerts call (one cycle's worth)
+        engine: AlertEngine to drive (by default a new one whose clock
+            follows the stream's timestamps, so storm windows line up)
+        db_file: Store alerts in this AlertDatabase file ("" for a temporary one)
+
+    Returns:
+        Dict with alert count, per-stage seconds and alerts/sec, plus outcome totals
+    """
+
+    from alert_engine import AlertEngine
+    from database import AlertDatabase
+
+    clock = None
+    if engine is None:
+        clock = VirtualClock(datetime.min)
+        engine = AlertEngine(clock=clock)
+    db = None
+    temp_db = None
+    if db_file is not None:
+        if not db_file:
+            fd, temp_db = tempfile.mkstemp(suffix=".json", prefix="alert_stream_db_")
+            os.close(fd)
+            os.remove(temp_db)
+        db = AlertDatabase(db_file or temp_db)
+
+    totals = {"alerts": 0, "actionable": 0, "suppressed": 0, "deduplicated": 0, "tickets_to_create": 0}
+    engine_seconds = 0.0
+    storage_seconds = 0.0
+    batch = []
+
+    def flush():
+        nonlocal engine_seconds, storage_seconds
+        if clock is not None:
+            clock.set(datetime.fromisoformat(batch[-1]["timestamp"]))
+        started = time.perf_counter()
+        summary = engine.process_alerts(batch)["summary"]
+        engine_seconds += time.perf_counter() - started
+        totals["alerts"] += summary["total_alerts"]
+        for key in ("actionable", "suppressed", "deduplicated", "tickets_to_create"):
+            totals[key] += summary[key]
+        if db is not None:
+            started = time.perf_counter()
+            db.add_alerts(batch)
+            storage_seconds += time.perf_counter() - started
+        batch.clear()
+
+    try:
+        for alert in events:
+            batch.append(alert)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        if temp_db and os.path.exists(temp_db):
+            os.remove(temp_db)
+
+    result = dict(totals)
+    result["engine_seconds"] = round(engine_seconds, 3)
+    result["engine_alerts_per_sec"] = round(totals["alerts"] / engine_seconds, 1) if engine_seconds else 0
+    if db is not None:
+        result["storage_seconds"] = round(storage_seconds, 3)
+        result["storage_alerts_per_sec"] = round(totals["alerts"] / storage_seconds, 1) if storage_seconds else 0
+    return result
+
+
+def main():
+    """Command line entry point"""
+
+    parser = argparse.ArgumentParser(description="Generate synthetic raw alert streams")
+    parser.add_argument("--count", type=int, default=100000, help="Number of alerts")
+    parser.add_argument("--rate", type=float, default=100.0, help="Checks per second of event time")
+    parser.add_argument("--start", help="ISO timestamp of the first check (default: now)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cascade-rate", type=float, default=0.25)
+    parser.add_argument("--output", help="Write to a .jsonl journal or .json array file")
+    parser.add_argument("--socket", help="Send NDJSON to host:port or a Unix socket path")
+    parser.add_argument("--load-test", action="store_true", help="Feed AlertEngine.process_alerts")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Alerts per engine call")
+    parser.add_argument("--db-file", nargs="?", const="", help="Also store alerts (temporary database if no file)")
+    args = parser.parse_args()
+
+    generator = AlertStreamGenerator(
+        checks_per_second=args.rate, seed=args.seed, cascade_rate=args.cascade_rate,
+        start=datetime.fromisoformat(args.start) if args.start else None
+    )
+    events = generator.events(args.count)
+
+    started = time.perf_counter()
+    if args.output:
+        count = write_file(events, args.output)
+        print(f"💾 Wrote {count} alerts to {args.output}")
+    elif args.socket:
+        count = send_to_socket(events, args.socket)
+        print(f"📡 Sent {count} alerts to {args.socket}")
+    elif args.load_test:
+        result = load_test(events, args.batch_size, db_file=args.db_file)
+        count = result["alerts"]
+        print(f"⚙️  Engine: {count} alerts in {result['engine_seconds']:.1f}s "
+              f"({result['engine_alerts_per_sec']:.0f} alerts/s)")
+        if "storage_seconds" in result:
+            print(f"🗄️  Storage: {result['storage_seconds']:.1f}s ({result['storage_alerts_per_sec']:.0f} alerts/s)")
+        print(f"  ├─ Actionable: {result['actionable']}  Suppressed: {result['suppressed']}  "
+              f"Deduplicated: {result['deduplicated']}")
+    else:
+        count = sum(1 for _ in events)
+        print(f"🧮 Generated {count} alerts")
+
+    elapsed = time.perf_counter() - started
+    print(f"  └─ {elapsed:.1f}s total, defects per check: {generator.stats}")
+
+
+if __name__ == "__main__":
+    main()
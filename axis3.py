@@ -1,3 +1,10 @@
+"""
+Link checker for a locally served copy of the activity pages
+Runs its own original run_check and writes the legacy report and dashboard
+data; the scheduled health check (axis3_enhanced.py) runs activity checks
+through check_backends.BACKENDS instead
+"""
+
 import re
 import time
 import threading
@@ -3,15 +3,13 @@ Enhanced Selenium Script with Defect Injection
 Collects rich telemetry and feeds into alert engine
 """
 
-import re
 import time
-import threading
 import os
 import requests
-import json
 import uuid
 from datetime import datetime
-from openpyxl import Workbook
+from contextlib import nullcontext
+from functools import partial
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -23,28 +21,93 @@ from selenium.webdriver.common.by import By
 from defect_injector import DefectInjector, DefectConfiguration
 from database import AlertDatabase
 from job_execution_logger import JobExecutionLogger
+from retry_queue import RetryQueue, RetryPolicy
+from circuit_breaker import CircuitBreakerRegistry
+from rate_limiter import DomainRateLimiter
+import dns_cache
+from check_scheduler import CheckScheduler
+from work_queue import WorkQueue, start_local_workers, stop_local_workers, DEFAULT_IDLE_TIMEOUT
+from screenshot_store import ScreenshotStore
+from content_assertions import ContentAssertionRegistry, check_response
+from resource_accounting import ProcessTreeSampler, browser_transfer_bytes
+from check_backends import (BACKENDS, SELENIUM, load_activity_backends, probe_target, error_event,
+                            extract_activity_name, extract_target_url)
+from alert_engine import ActionabilityScorer, AlertEngine
+from engine_state import EngineState
+from result_sink import (ResultSink, DatabaseWriter, RawAlertFileWriter,
+                         ExcelRowWriter, LiveEngineFeed, CycleStats)
 
 
-def check_link(url):
-    """Check if URL is accessible"""
+def check_link(url, breakers=None, rate_limiter=None, metrics=None, assertions=None):
+    """
+    Check if URL is accessible
+    
+    Args:
+        url: URL to probe
+        breakers: Optional CircuitBreakerRegistry; probes to hosts with an
+            open breaker short-circuit without touching the network
+        rate_limiter: Optional DomainRateLimiter throttling requests per domain
+        metrics: Optional dict filled with probe timings (dns_time) and body size (probe_bytes)
+        assertions: Optional ContentAssertion checked against the streamed
+            body of a 200 response
+    """
+    if breakers is not None:
+        allowed, reason = breakers.allow(url)
+        if not allowed:
+            return None, reason
+    
+    if rate_limiter is not None:
+        rate_limiter.acquire(url)
+    
+    resolver = dns_cache.installed_cache()
+    if resolver is not None:
+        resolver.take_resolution_time()
+    
     try:
-        response = requests.get(url, timeout=10)
-        return response.status_code, "Success" if response.status_code == 200 else "Failed"
+        # Only the probe's own lookups go through the DNS cache
+        with resolver.active() if resolver is not None else nullcontext():
+            response = requests.get(url, timeout=10, stream=assertions is not None)
+            status_code, reason = response.status_code, "Success" if response.status_code == 200 else "Failed"
+            body_bytes = 0
+            if assertions is None:
+                body_bytes = len(response.content)
+            elif status_code == 200:
+                _, reason, body_bytes = check_response(response, assertions)
+            else:
+                response.close()
+        if metrics is not None:
+            metrics["probe_bytes"] = body_bytes
     except requests.exceptions.RequestException as e:
-        return None, str(e)
+        status_code, reason = None, str(e)
+    
+    if metrics is not None and resolver is not None:
+        metrics["dns_time"] = resolver.take_resolution_time()
+    
+    if breakers is not None:
+        breakers.record(url, status_code)
+    
+    return status_code, reason
 
 
-def run_check(activity_url, check_id, report_data, alert_events, execution_id, defect_injector):
+def run_check(activity_url, check_id, sink, execution_id, defect_injector,
+              retry_queue=None, probe=check_link, rate_limiter=None,
+              screenshot_store=None, content_assertions=None):
     """
     Run single activity check with defect injection
     
     Args:
         activity_url: URL of activity page
         check_id: Activity ID (1-7)
-        report_data: Shared list for Excel report
-        alert_events: Shared list for alerts
+        sink: ResultSink receiving the alert event and Excel report row
         execution_id: Unique execution identifier
         defect_injector: DefectInjector instance
+        retry_queue: Optional RetryQueue used to confirm failed probes
+        probe: Link probe function, check_link unless configured otherwise
+        rate_limiter: Optional DomainRateLimiter applied to browser navigation
+        screenshot_store: Optional ScreenshotStore keeping screenshots by
+            content hash; without one the screenshot is written per check id
+        content_assertions: Optional ContentAssertionRegistry with per-activity
+            checks on the probed page body
     """
     
     check_start_time = time.time()
@@ -72,86 +135,73 @@ def run_check(activity_url, check_id, report_data, alert_events, execution_id, d
             print(f"✗ Chrome driver error: {e}")
             raise
     
-    driver.get(activity_url)
+    # CPU/memory of the chromedriver + Chrome tree is sampled for the whole check
+    sampler = ProcessTreeSampler.for_driver(driver)
+    network_bytes = 0
+    pending = []  # Published once the check's resource usage is known
     
     wait = WebDriverWait(driver, 10)
     
     target_url = None
     
     try:
+        if rate_limiter is not None:
+            rate_limiter.acquire(activity_url)
+        driver.get(activity_url)
+        
         # Extract textarea content
         textarea = wait.until(EC.presence_of_element_located((By.ID, "detail-text")))
         text = textarea.get_attribute("value")
+        network_bytes += browser_transfer_bytes(driver)
         
         # Extract URL
-        urls = re.findall(r'https?://[^\s"]+', text)
-        if not urls:
-            raise RuntimeError("No URL found in textarea")
-        
-        target_url = urls[0]
+        target_url = extract_target_url(text)
         activity_name = extract_activity_name(activity_url)
         
         print(f"✓ Check {check_id}: {activity_name}")
         
-        # Check link status
-        status_code, reason = check_link(target_url)
-        
-        # Inject defect if applicable
-        injected_defect = defect_injector.get_defect(check_id, activity_name)
-        
-        if injected_defect:
-            # Override with injected defect
-            original_status_code = status_code
-            status_code = injected_defect.get("status_code")
-            reason = injected_defect.get("message")
-            is_simulated = True
-        else:
-            original_status_code = status_code
-            is_simulated = False
-        
-        response_time = time.time() - check_start_time
-        
-        # Create rich alert event
-        alert_event = {
-            "alert_id": str(uuid.uuid4()),
-            "execution_id": execution_id,
-            "timestamp": datetime.now().isoformat(),
-            "check_id": check_id,
-            "activity_name": activity_name,
-            "url": target_url,
-            "status": "success" if status_code == 200 else "failure",
-            "response_code": status_code,
-            "original_response_code": original_status_code,
-            "response_time": response_time,
-            "error_message": reason if status_code != 200 else "",
-            "is_simulated": is_simulated,
-            "severity": injected_defect.get("severity", 5) if is_simulated else 5,
-            "retry_count": 0,
-            "source": "selenium"
-        }
-        
-        alert_events.append(alert_event)
-        report_data.append([target_url, status_code, "Checked" if status_code == 200 else "Failed", reason])
-        
-        # Open URL in new tab and take screenshot
-        driver.execute_script("window.open(arguments[0], '_blank');", target_url)
-        driver.switch_to.window(driver.window_handles[-1])
-        wait.until(lambda d: d.title is not None)
-        time.sleep(1)
-        
-        screenshot_path = f"screenshots/screenshot_{check_id}.png"
-        os.makedirs(os.path.dirname(screenshot_path), exist_ok=True)
-        driver.save_screenshot(screenshot_path)
+        # Check link status, confirming failures before they become alerts
+        alert_event, report_row = probe_target(
+            target_url, check_id, activity_name, execution_id, defect_injector, check_start_time,
+            probe, retry_queue=retry_queue, content_assertions=content_assertions
+        )
+        status = alert_event["status"]
+        status_code = alert_event["response_code"]
+        pending.append((alert_event, report_row))
         
-        # Switch back
-        driver.switch_to.window(driver.window_handles[0])
+        # Take a new screenshot only when the capture policy asks for one;
+        # otherwise the form gets the cached last-good screenshot, unless its
+        # image has gone (pruned or deleted) since the policy was consulted
+        capture = screenshot_store is None or screenshot_store.should_capture(check_id, alert_event["status"])
+        screenshot_version = None if capture else screenshot_store.last_good(check_id)
+        capture = capture or screenshot_version is None
+        screenshot_future = None
         
-        # Fill form
-        screenshot_element = wait.until(EC.presence_of_element_located((By.ID, "screenshot")))
-        screenshot_element.send_keys(os.path.abspath(screenshot_path))
+        if capture:
+            # Open URL in new tab and take screenshot
+            if rate_limiter is not None:
+                rate_limiter.acquire(target_url)
+            driver.execute_script("window.open(arguments[0], '_blank');", target_url)
+            driver.switch_to.window(driver.window_handles[-1])
+            wait.until(lambda d: d.title is not None)
+            time.sleep(1)
+            
+            if screenshot_store is not None:
+                # Hashing and writing run in the background while the form is filled
+                screenshot_future = screenshot_store.put_async(
+                    check_id, driver.get_screenshot_as_png(), alert_event["status"]
+                )
+            else:
+                screenshot_path = f"screenshots/screenshot_{check_id}.png"
+                os.makedirs(os.path.dirname(screenshot_path), exist_ok=True)
+                driver.save_screenshot(screenshot_path)
+            network_bytes += browser_transfer_bytes(driver)
+            
+            # Switch back
+            driver.switch_to.window(driver.window_handles[0])
         
         # Select radio button based on status
-        radio_id = "green" if status_code == 200 else "red"
+        radio_id = "green" if status == "success" else "red"
         radio_btn = wait.until(EC.element_to_be_clickable((By.ID, radio_id)))
         driver.execute_script("arguments[0].click();", radio_btn)
         
@@ -159,58 +209,143 @@ def run_check(activity_url, check_id, report_data, alert_events, execution_id, d
         name_field = wait.until(EC.presence_of_element_located((By.ID, "name")))
         name_field.send_keys("PyBot-AlertEngine")
         
+        # Attach screenshot
+        if screenshot_future is not None:
+            screenshot_version = screenshot_future.result()
+        if screenshot_version is not None:
+            screenshot_path = screenshot_version["path"]
+        screenshot_element = wait.until(EC.presence_of_element_located((By.ID, "screenshot")))
+        screenshot_element.send_keys(os.path.abspath(screenshot_path))
+        
         # Submit
         driver.execute_script("document.querySelector('.submit-btn').classList.add('enabled');")
         submit_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(@class, 'submit-btn')]")))
         driver.execute_script("arguments[0].click();", submit_btn)
         
         print(f"  ├─ Status: {status_code}")
-        print(f"  ├─ Time: {response_time:.2f}s")
-        print(f"  └─ Simulated: {'✓ Yes' if is_simulated else '✗ No'}")
+        print(f"  ├─ Time: {alert_event['response_time']:.2f}s")
+        print(f"  ├─ Retries: {alert_event['retry_count']}")
+        if not capture:
+            print(f"  ├─ Screenshot: cached ({screenshot_version['hash'][:12]})")
+        elif screenshot_version is not None:
+            print(f"  ├─ Screenshot: {'unchanged' if screenshot_version['visually_unchanged'] else 'changed'}"
+                  f" ({screenshot_version['hash'][:12]})")
+        print(f"  └─ Simulated: {'✓ Yes' if alert_event['is_simulated'] else '✗ No'}")
         
     except Exception as e:
         print(f"✗ Check {check_id} Error: {e}")
-        alert_event = {
-            "alert_id": str(uuid.uuid4()),
-            "execution_id": execution_id,
-            "timestamp": datetime.now().isoformat(),
-            "check_id": check_id,
-            "activity_name": "Unknown",
-            "url": target_url or "N/A",
-            "status": "error",
-            "response_code": None,
-            "response_time": time.time() - check_start_time,
-            "error_message": str(e),
-            "is_simulated": False,
-            "severity": 7,
-            "retry_count": 0,
-            "source": "selenium"
-        }
-        alert_events.append(alert_event)
-        report_data.append([target_url or "N/A", None, "Error", str(e)])
+        pending.append(error_event(execution_id, check_id, target_url, e, check_start_time))
     
     finally:
+        usage = sampler.stop() if sampler is not None else {}
         driver.quit()
+        
+        for event, row in pending:
+            event.update(usage)
+            event["network_bytes"] = network_bytes
+            sink.put(event, row)
+        if usage:
+            print(f"  ⚙️  Check {check_id} resources: {usage['cpu_time']:.1f}s CPU, "
+                  f"{usage['peak_rss_mb']:.0f} MB peak RSS, {usage['child_processes']} processes, "
+                  f"{network_bytes / 1024:.0f} KB transferred")
 
 
-def extract_activity_name(activity_url):
-    """Extract activity name from URL"""
-    
-    mapping = {
-        "activity1.html": "Account Verification",
-        "activity2.html": "Transaction Review",
-        "activity3.html": "Loan Application Check",
-        "activity4.html": "Customer Service Check",
-        "activity5.html": "Compliance Audit",
-        "activity6.html": "Security Scan",
-        "activity7.html": "Performance Metrics"
+def build_check_components():
+    """
+    Probe layer shared by a process's checks
+    
+    main() and work-queue worker processes build the same components, so a
+    queued check is probed, retried, throttled and captured like a local one.
+    
+    Returns:
+        Dict with resolver, circuit_breakers, rate_limiter, probe, retry_queue,
+        screenshot_store and content_assertions
+    """
+    
+    # Probe DNS lookups (and only those) go through an in-process TTL cache
+    resolver = dns_cache.install()
+    
+    # Hosts that keep failing are short-circuited across cycles
+    circuit_breakers = CircuitBreakerRegistry.from_env()
+    
+    # Probes and browser navigation share per-domain rate limits
+    rate_limiter = DomainRateLimiter.from_config()
+    probe = partial(check_link, breakers=circuit_breakers, rate_limiter=rate_limiter)
+    
+    return {
+        "resolver": resolver,
+        "circuit_breakers": circuit_breakers,
+        "rate_limiter": rate_limiter,
+        "probe": probe,
+        # Failed probes are retried with backoff before they are reported
+        "retry_queue": RetryQueue(probe, RetryPolicy.from_env()),
+        # Screenshots are stored once per distinct image, with a per-check version index
+        "screenshot_store": ScreenshotStore.from_env(),
+        # Per-activity checks on the probed page body
+        "content_assertions": ContentAssertionRegistry.from_config()
     }
+
+
+def build_backend(backend_name, components):
+    """Check backend wired to the probe components"""
+    
+    return BACKENDS[backend_name](
+        components["probe"], retry_queue=components["retry_queue"],
+        rate_limiter=components["rate_limiter"],
+        content_assertions=components["content_assertions"],
+        screenshot_store=components["screenshot_store"]
+    )
+
+
+def close_check_components(components):
+    """Finish pending retries and screenshot writes, persist breaker state, restore DNS"""
+    
+    components["retry_queue"].close()
+    components["circuit_breakers"].save()
+    components["screenshot_store"].close()
+    dns_cache.uninstall()
+
+
+def run_queued_checks(activity_urls, execution_id, sink, critical_services, scheduled_at=None):
+    """
+    Run checks through the durable work queue and feed the results into the sink
+    
+    Workers are started locally when WORKER_PROCESSES > 0; otherwise they are
+    expected to run elsewhere (python work_queue.py worker) against WORK_QUEUE_DB.
+    Local workers still running when WORK_QUEUE_TIMEOUT expires are terminated.
     
-    for key, value in mapping.items():
-        if key in activity_url:
-            return value
+    scheduled_at is the cycle time the workers plan their defects for, so a
+    DEFECT_SEED run injects the same defects as an in-process cycle.
+    """
+    
+    queue = WorkQueue.from_env()
+    jobs = [
+        {"check_id": i, "activity_url": url,
+         "priority": 1 if is_critical_activity(url, critical_services) else 0}
+        for i, url in enumerate(activity_urls, start=1)
+    ]
+    print(f"  ├─ Queued {queue.enqueue(execution_id, jobs, enqueued_at=scheduled_at)} jobs in {queue.db_path}")
+    
+    local_workers = start_local_workers(
+        queue.db_path, int(os.getenv('WORKER_PROCESSES', '0')),
+        lease_seconds=queue.lease_seconds
+    )
+    
+    finished = queue.wait_until_done(execution_id, timeout=float(os.getenv('WORK_QUEUE_TIMEOUT', '900')))
+    # Idle workers exit on their own shortly after the queue drains
+    stop_local_workers(local_workers, timeout=2 * DEFAULT_IDLE_TIMEOUT if finished else 0)
+    if not finished:
+        print(f"  ⚠️  Work queue timed out: {queue.get_counts(execution_id)}")
+    
+    for record in queue.collect_results(execution_id):
+        sink.put(record["alert"], record["report_row"])
+
+
+def is_critical_activity(activity_url, critical_services):
+    """Check if activity covers one of the critical services (account-server -> Account ...)"""
     
-    return "Unknown Activity"
+    activity_name = extract_activity_name(activity_url).lower()
+    return any(service.split("-")[0] in activity_name for service in critical_services)
 
 
 def main():
@@ -234,7 +369,7 @@ def main():
     start_time = time.time()
     
     # Initialize components
-    defect_injector = DefectInjector(enabled=defects_enabled)
+    defect_injector = DefectInjector.from_env()
     db = AlertDatabase()
     
     print(f"\n⚙️  Defect Configuration:")
@@ -304,60 +439,108 @@ def main():
     
     print(f"  ├─ Found {len(activity_urls)} activities")
     
-    # Shared data structures
-    report_data = []
-    alert_events = []
+    # Completed checks stream straight to the database, raw alert journal,
+    # Excel report and a live engine feed
+    cycle_stats = CycleStats()
+    sink = ResultSink([
+        DatabaseWriter(db),
+        RawAlertFileWriter("raw_alerts.json"),
+        ExcelRowWriter("link_check_report.xlsx"),
+        LiveEngineFeed(AlertEngine(), EngineState.from_env()),
+        cycle_stats
+    ])
     
     # Run checks in parallel
     print(f"\n▶️  Running {len(activity_urls)} health checks...")
     print("=" * 60)
     
-    threads = []
-    for i, url in enumerate(activity_urls, start=1):
-        t = threading.Thread(
-            target=run_check,
-            args=(url, i, report_data, alert_events, execution_id, defect_injector)
-        )
-        threads.append(t)
-        t.start()
+    critical_services = ActionabilityScorer().critical_services
+    
+    if os.getenv('WORK_QUEUE_DB'):
+        # Work-queue mode: checks run in worker processes, possibly on other machines.
+        # Workers build their own probe components and save breaker and
+        # screenshot state, which is loaded afterwards for the summary
+        run_queued_checks(activity_urls, execution_id, sink, critical_services, scheduled_at=start_time)
+        components = build_check_components()
+    else:
+        components = build_check_components()
+        
+        # Each activity runs on the backend its rule declares (selenium by default)
+        activity_backends = load_activity_backends()
+        backends = {}
+        
+        # The cycle's defects are drawn up front from per-check streams, so a
+        # DEFECT_SEED run injects the same defects whatever the thread timing
+        names = [extract_activity_name(url) for url in activity_urls]
+        defect_injector.plan_batch(list(range(1, len(activity_urls) + 1)), names, start_time)
+        
+        # CASSETTE_RECORD captures pages, probes, retries and defects for offline replay
+        cassette_file = os.getenv('CASSETTE_RECORD')
+        recorder = None
+        check_injector = defect_injector
+        if cassette_file:
+            from cassette import CassetteRecorder
+            recorder = CassetteRecorder(execution_id)
+            check_injector = recorder.wrap_injector(defect_injector)
+        
+        # Critical services run in a priority lane with reserved workers;
+        # jobs are grouped by backend so cheap checks never wait for browser slots
+        scheduler = CheckScheduler.from_env(default_workers=len(activity_urls))
+        for i, (url, name) in enumerate(zip(activity_urls, names), start=1):
+            backend_name = activity_backends.get(name, SELENIUM)
+            if backend_name not in backends:
+                backends[backend_name] = build_backend(backend_name, components)
+                if recorder is not None:
+                    backends[backend_name] = recorder.wrap_backend(backends[backend_name])
+            scheduler.submit(
+                backends[backend_name].run_check,
+                args=(url, i, sink, execution_id, check_injector),
+                critical=is_critical_activity(url, critical_services),
+                name=name,
+                group=backend_name
+            )
+        
+        # Wait for completion
+        scheduler.run()
+        for backend in backends.values():
+            backend.close()
+        
+        for lane, lane_stats in scheduler.get_lane_stats().items():
+            print(f"\n🚦 {lane.capitalize()} lane: {lane_stats['count']} checks, "
+                  f"last finished after {lane_stats['last_finished_after']:.1f}s")
+        for group, count in scheduler.get_group_counts().items():
+            print(f"  ├─ {group}: {count} checks")
+        
+        if recorder is not None:
+            cassette_summary = recorder.save(cassette_file)
+            print(f"\n📼 Recorded {cassette_summary['checks']} checks to {cassette_file} "
+                  f"({cassette_summary['distinct_pages']} distinct pages)")
+    
+    close_check_components(components)
+    resolver = components["resolver"]
+    circuit_breakers = components["circuit_breakers"]
     
-    # Wait for completion
-    for t in threads:
-        t.join()
+    removed = components["screenshot_store"].prune()
+    if removed:
+        print(f"\n🖼️  Pruned {removed} unreferenced screenshots")
+    
+    print(f"\n🌐 DNS cache: {resolver.stats['hits']} hits, {resolver.stats['stale_hits']} stale, "
+          f"{resolver.stats['misses']} misses, {resolver.stats['negative_hits']} negative")
+    
+    open_hosts = circuit_breakers.get_open_hosts()
+    if open_hosts:
+        print(f"\n⚡ Open circuit breakers: {', '.join(open_hosts)}")
     
     print("\n" + "=" * 60)
     print(f"✓ All {len(activity_urls)} checks completed")
     print("=" * 60)
     
-    # Save alerts to database
+    # Flush remaining results (database, Excel report, raw_alerts.json)
     print(f"\n💾 Saving results...")
-    for alert in alert_events:
-        db.add_alert(alert)
-    
-    # Generate Excel report
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Link Check Report"
-    ws.append(["Site Name", "Response Code", "Status", "Reason"])
-    
-    for row in report_data:
-        ws.append(row)
-    
-    try:
-        wb.save("link_check_report.xlsx")
-        print(f"  ├─ Excel report: ✓")
-    except PermissionError:
-        wb.save("link_check_report_new.xlsx")
-        print(f"  ├─ Excel report (alternate): ✓")
-    
-    # Save alert events to JSON
-    print(f"\n📝 Saving raw alerts ({len(alert_events)} alerts)...")
-    try:
-        with open("raw_alerts.json", "w") as f:
-            json.dump(alert_events, f, indent=2)
-        print(f"  ✓ raw_alerts.json saved successfully")
-    except Exception as e:
-        print(f"  ✗ Error saving raw_alerts.json: {e}")
+    sink.close()
+    if sink.spilled:
+        print(f"  ├─ Spilled to disk: {sink.spilled} results")
+    print(f"  ├─ Database, Excel report and raw alerts ({cycle_stats.total} alerts): ✓")
     
     # Verify file exists
     if os.path.exists("raw_alerts.json"):
@@ -372,7 +555,7 @@ def main():
     # Summary statistics
     print(f"\n📈 Summary Statistics:")
     stats = db.get_alert_statistics(hours=24)
-    total_alerts = stats.get('total', len(alert_events))
+    total_alerts = stats.get('total', cycle_stats.total)
     by_status = stats.get('by_status', {})
     high_score = stats.get('high_score_alerts', 0)
     simulated = stats.get('simulated_defects', 0)
@@ -396,10 +579,13 @@ def main():
         "timestamp": datetime.now().isoformat(),
         "status": "success",
         "total_checks": len(activity_urls),
-        "total_alerts": len(alert_events),
-        "success_count": sum(1 for a in alert_events if a.get('status') == 'success'),
-        "failure_count": sum(1 for a in alert_events if a.get('status') == 'failure'),
-        "simulated_defects": sum(1 for a in alert_events if a.get('is_simulated', False)),
+        "total_alerts": cycle_stats.total,
+        "success_count": cycle_stats.by_status.get('success', 0),
+        "failure_count": cycle_stats.by_status.get('failure', 0),
+        "content_violation_count": cycle_stats.by_status.get('content_violation', 0),
+        "simulated_defects": cycle_stats.simulated,
+        "avg_dns_time": cycle_stats.avg_dns_time,
+        "resource_usage": cycle_stats.resource_usage,
         "report_file": "link_check_report.xlsx",
         "alerts_file": "raw_alerts.json",
         "duration_seconds": time.time() - start_time if 'start_time' in locals() else 0
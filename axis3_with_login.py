@@ -1,3 +1,11 @@
+"""
+Link checker for the activity pages behind the login page, reusing a saved
+login session in every check driver
+Runs its own original run_check and writes the legacy report and dashboard
+data; the scheduled health check (axis3_enhanced.py) runs activity checks
+through check_backends.BACKENDS instead
+"""
+
 import re
 import time
 import threading
@@ -12,6 +20,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 
+from session_state import SessionStateManager
+
 def check_link(url):
     try:
         response = requests.get(url, timeout=10)
@@ -19,13 +29,17 @@ def check_link(url):
     except requests.exceptions.RequestException as e:
         return None, str(e)
 
-def run_check(activity_url, check_id, report_data, dashboard_data):
+def run_check(activity_url, check_id, report_data, dashboard_data, session=None):
     # Create a new headless Chrome driver for each check
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     driver = webdriver.Chrome(options=chrome_options)
+
+    # Reuse the main driver's login instead of starting with empty storage
+    if session is not None:
+        session.inject(driver)
     driver.get(activity_url)
 
     wait = WebDriverWait(driver, 10)
@@ -159,6 +173,11 @@ def main():
     main_driver.maximize_window()
     wait = WebDriverWait(main_driver, 20)
 
+    # Saved session state skips the UI login until it expires
+    session = SessionStateManager.from_env()
+    if session.inject(main_driver):
+        print("Reusing saved session state...")
+
     # Open index.html as the initial page
     main_driver.get("https://kingnstarpancard-code.github.io/nvs_automation/index.html")
 
@@ -166,10 +185,14 @@ def main():
     current_url = main_driver.current_url
     if "login.html" in current_url:
         print("Login page detected, performing login automation...")
+        session.invalidate()
         automate_login(main_driver, wait)
         # After login, the driver should already be on index.html or will be redirected
+        session.capture(main_driver)
     else:
         print("Already logged in, proceeding with activity checks...")
+        if not session.is_valid():
+            session.capture(main_driver)
 
     # Proceed to automate activity checking as before
 
@@ -184,7 +207,7 @@ def main():
     # Run all checks in parallel using threads (headless)
     threads = []
     for i, url in enumerate(activity_urls, start=1):
-        t = threading.Thread(target=run_check, args=(url, i, report_data, dashboard_data))
+        t = threading.Thread(target=run_check, args=(url, i, report_data, dashboard_data, session))
         threads.append(t)
         t.start()
 
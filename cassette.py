@@ -0,0 +1,374 @@
+"""
+Cassette Module
+Records a real health-check cycle (activity pages, probe responses and
+timings, defect decisions) into a compact gzip cassette and replays it
+offline through the check pipeline, at full speed or at the recorded pace
+
+Usage:
+    CASSETTE_RECORD=cycle.cassette python axis3_enhanced.py
+    python cassette.py replay cycle.cassette [--realtime] [--output raw_alerts.json]
+    python cassette.py info cycle.cassette
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from check_backends import CheckBackend, HttpBackend, error_event, extract_activity_name, extract_target_url
+from sim_clock import SYSTEM_CLOCK
+
+
+CASSETTE_VERSION = 1
+REPLAY = "replay"
+
+
+class Cassette:
+    """Recorded cycle: pages by content hash, then per check its probe, retries, defect and timing"""
+
+    def __init__(self, data: Dict = None):
+        self.data = data or {
+            "version": CASSETTE_VERSION,
+            "recorded_at": datetime.now().isoformat(),
+            "execution_id": None,
+            "blobs": {},      # sha1 -> page HTML, stored once
+            "pages": {},      # activity URL -> sha1
+            "checks": []      # in start order
+        }
+        self._by_id = {c["check_id"]: c for c in self.data["checks"]}
+
+    @staticmethod
+    def load(filepath: str) -> "Cassette":
+        with gzip.open(filepath, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version: {data.get('version')}")
+        return Cassette(data)
+
+    def save(self, filepath: str):
+        with gzip.open(filepath, "wt", encoding="utf-8") as f:
+            json.dump(self.data, f, separators=(",", ":"), default=str)
+
+    def page(self, activity_url: str) -> str:
+        digest = self.data["pages"].get(activity_url)
+        if digest is None:
+            raise KeyError(f"Activity page not in cassette: {activity_url}")
+        return self.data["blobs"][digest]
+
+    def check(self, check_id: int) -> Dict:
+        return self._by_id.get(check_id, {})
+
+    def add_check(self, record: Dict):
+        self.data["checks"].append(record)
+        self._by_id[record["check_id"]] = record
+
+    def summary(self) -> Dict:
+        checks = self.data["checks"]
+        return {
+            "recorded_at": self.data["recorded_at"],
+            "execution_id": self.data["execution_id"],
+            "checks": len(checks),
+            "distinct_pages": len(self.data["blobs"]),
+            "retried": sum(1 for c in checks if (c.get("confirmed") or {}).get("attempts", 1) > 1),
+            "defects": sum(1 for c in checks if c.get("defect")),
+            "duration_seconds": max((c["started_after"] + c["duration"] for c in checks), default=0)
+        }
+
+
+class CassetteRecorder:
+    """Captures a cycle while it runs; wrap the injector and every backend with it"""
+
+    def __init__(self, execution_id: str = None):
+        self.cassette = Cassette()
+        self.cassette.data["execution_id"] = execution_id
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._local = threading.local()  # Record of the check running on this thread
+
+    def wrap_injector(self, injector) -> "RecordingInjector":
+        return RecordingInjector(injector, self)
+
+    def wrap_backend(self, backend: CheckBackend) -> "RecordingBackend":
+        return RecordingBackend(backend, self)
+
+    @property
+    def current(self) -> Optional[Dict]:
+        return getattr(self._local, "record", None)
+
+    def record_page(self, activity_url: str, page: str):
+        digest = hashlib.sha1(page.encode("utf-8")).hexdigest()
+        with self._lock:
+            self.cassette.data["blobs"].setdefault(digest, page)
+            self.cassette.data["pages"][activity_url] = digest
+
+    def save(self, filepath: str) -> Dict:
+        with self._lock:
+            self.cassette.data["checks"].sort(key=lambda c: c["started_after"])
+            self.cassette.save(filepath)
+            return self.cassette.summary()
+
+
+class RecordingInjector:
+    """DefectInjector proxy recording each decision on the running check"""
+
+    def __init__(self, injector, recorder: CassetteRecorder):
+        self._injector = injector
+        self._recorder = recorder
+
+    def get_defect(self, check_id: int, activity_name: str, *args, **kwargs) -> Optional[Dict]:
+        defect = self._injector.get_defect(check_id, activity_name, *args, **kwargs)
+        if self._recorder.current is not None:
+            self._recorder.current["defect"] = defect
+        return defect
+
+    def __getattr__(self, name):
+        return getattr(self._injector, name)
+
+
+class _RecordingRetries:
+    """RetryQueue proxy recording each check's confirmed result"""
+
+    def __init__(self, retry_queue, recorder: CassetteRecorder):
+        self._retry_queue = retry_queue
+        self._recorder = recorder
+
+    def confirm(self, url, status_code, reason, assertions=None):
+        started = time.monotonic()
+        result = self._retry_queue.confirm(url, status_code, reason, assertions)
+        if self._recorder.current is not None:
+            self._recorder.current["confirmed"] = {
+                "status_code": result[0], "reason": result[1], "attempts": result[2],
+                "duration": round(time.monotonic() - started, 4)
+            }
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._retry_queue, name)
+
+
+class RecordingBackend(CheckBackend):
+    """Runs checks on another backend, recording pages, probe responses and timings"""
+
+    def __init__(self, backend: CheckBackend, recorder: CassetteRecorder):
+        super().__init__(backend.probe, backend.retry_queue, backend.rate_limiter,
+                         backend.content_assertions, backend.screenshot_store)
+        self.backend = backend
+        self.recorder = recorder
+        self.name = backend.name
+
+        probe = backend.probe
+
+        def recording_probe(url, *args, metrics=None, **kwargs):
+            own_metrics = {} if metrics is None else metrics
+            started = time.monotonic()
+            status_code, reason = probe(url, *args, metrics=own_metrics, **kwargs)
+            if recorder.current is not None:
+                recorder.current["probe"] = {
+                    "url": url, "status_code": status_code, "reason": reason,
+                    "metrics": dict(own_metrics), "duration": round(time.monotonic() - started, 4)
+                }
+            return status_code, reason
+
+        backend.probe = recording_probe
+        if backend.retry_queue is not None:
+            backend.retry_queue = _RecordingRetries(backend.retry_queue, recorder)
+
+        # Pages are read over HTTP; an HTTP backend's own fetch is recorded as-is
+        if isinstance(backend, HttpBackend):
+            fetch = backend._fetch
+
+            def recording_fetch(activity_url):
+                page = fetch(activity_url)
+                recorder.record_page(activity_url, page)
+                return page
+
+            backend._fetch = recording_fetch
+            self._pages = None
+        else:
+            self._pages = HttpBackend(probe, rate_limiter=backend.rate_limiter)
+
+    def run_check(self, activity_url, check_id, sink, execution_id, defect_injector):
+        record = {"check_id": check_id, "activity_url": activity_url,
+                  "probe": None, "confirmed": None, "defect": None}
+        self.recorder._local.record = record
+        started = time.monotonic()
+        try:
+            if self._pages is not None:
+                try:
+                    self.recorder.record_page(activity_url, self._pages._fetch(activity_url))
+                except Exception as e:
+                    print(f"⚠️  Could not record page {activity_url}: {e}")
+            self.backend.run_check(activity_url, check_id, sink, execution_id, defect_injector)
+        finally:
+            self.recorder._local.record = None
+            record["started_after"] = round(started - self.recorder._started, 4)
+            record["duration"] = round(time.monotonic() - started, 4)
+            with self.recorder._lock:
+                self.recorder.cassette.add_check(record)
+
+    def close(self):
+        self.backend.close()
+
+
+class ReplayInjector:
+    """Returns the recorded defect decision of each check"""
+
+    enabled = True
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def get_defect(self, check_id: int, activity_name: str, previous_status: str = "success") -> Optional[Dict]:
+        return self.cassette.check(check_id).get("defect")
+
+
+class ReplayBackend(CheckBackend):
+    """
+    Runs checks from a cassette: recorded pages, probe responses and confirmed
+    retries, no network
+
+    Content assertions are not re-evaluated; their verdicts are part of the
+    recorded probe reasons.
+    """
+
+    name = REPLAY
+
+    def __init__(self, cassette: Cassette, realtime: bool = False, clock=None):
+        """
+        Args:
+            cassette: Recorded cycle
+            realtime: Take as long as the recorded probes, retries and checks did
+            clock: Clock used for real-time pacing
+        """
+        super().__init__(self._replay_probe)
+        self.retry_queue = self
+        self.cassette = cassette
+        self.realtime = realtime
+        self.clock = clock or SYSTEM_CLOCK
+        self._local = threading.local()
+
+    def run_check(self, activity_url, check_id, sink, execution_id, defect_injector):
+        check_start_time = time.time()
+        started = self.clock.monotonic()
+        target_url = None
+        self._local.record = self.cassette.check(check_id)
+
+        try:
+            text = HttpBackend._detail_text(self.cassette.page(activity_url))
+            target_url = extract_target_url(text)
+            alert_event, row = self._probe_target(target_url, check_id, extract_activity_name(activity_url),
+                                                  execution_id, defect_injector, check_start_time)
+            if self.realtime:
+                # The rest of the recorded check (page load, screenshot, form)
+                elapsed = self.clock.monotonic() - started
+                self.clock.sleep(max(0.0, self._local.record.get("duration", 0) - elapsed))
+            sink.put(alert_event, row)
+            self._print_result(check_id, alert_event)
+        except Exception as e:
+            print(f"✗ Check {check_id} Error: {e}")
+            sink.put(*error_event(execution_id, check_id, target_url, e, check_start_time, self.name))
+
+    def confirm(self, url, status_code, reason, assertions=None):
+        """Recorded retry outcome (RetryQueue interface)"""
+
+        confirmed = self._local.record.get("confirmed")
+        if not confirmed:
+            return status_code, reason, 1
+        if self.realtime:
+            self.clock.sleep(confirmed["duration"])
+        return confirmed["status_code"], confirmed["reason"], confirmed["attempts"]
+
+    def _replay_probe(self, url, *args, metrics=None, **kwargs):
+        recorded = self._local.record.get("probe")
+        if not recorded or recorded["url"] != url:
+            return None, f"Not in cassette: {url}"
+        if self.realtime:
+            self.clock.sleep(recorded["duration"])
+        if metrics is not None:
+            metrics.update(recorded["metrics"])
+        return recorded["status_code"], recorded["reason"]
+
+
+def replay_cycle(cassette: Cassette, sink, realtime: bool = False, workers: int = None,
+                 execution_id: str = None, clock=None) -> List[Dict]:
+    """
+    Replay every recorded check through a ReplayBackend into sink
+
+    At real-time pace each check starts at its recorded offset; at full
+    speed checks run as fast as the workers allow.
+
+    Returns:
+        Completed scheduler jobs
+    """
+
+    from check_scheduler import CheckScheduler
+
+    clock = clock or SYSTEM_CLOCK
+    backend = ReplayBackend(cassette, realtime=realtime, clock=clock)
+    injector = ReplayInjector(cassette)
+    execution_id = execution_id or f"replay-{cassette.data['execution_id']}"
+    checks = cassette.data["checks"]
+    scheduler = CheckScheduler(max_workers=workers or max(1, len(checks)), reserved_workers=0, clock=clock)
+    started = clock.monotonic()
+
+    def run(check):
+        if realtime:
+            clock.sleep(max(0.0, check["started_after"] - (clock.monotonic() - started)))
+        backend.run_check(check["activity_url"], check["check_id"], sink, execution_id, injector)
+
+    for check in checks:
+        scheduler.submit(run, args=(check,), name=str(check["check_id"]), group=REPLAY)
+    completed = scheduler.run()
+    backend.close()
+    return completed
+
+
+def main():
+    """Command line entry point"""
+
+    parser = argparse.ArgumentParser(description="Inspect or replay a recorded health-check cycle")
+    parser.add_argument("command", choices=["replay", "info"])
+    parser.add_argument("cassette")
+    parser.add_argument("--realtime", action="store_true", help="Replay at the recorded pace")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--output", help="Also write raw alerts to this file (e.g. raw_alerts.json)")
+    args = parser.parse_args()
+
+    cassette = Cassette.load(args.cassette)
+    summary = cassette.summary()
+
+    print(f"📼 Cassette {args.cassette}")
+    print(f"  ├─ Recorded: {summary['recorded_at']} ({summary['execution_id']})")
+    print(f"  ├─ Checks: {summary['checks']} ({summary['distinct_pages']} distinct pages, "
+          f"{summary['retried']} retried, {summary['defects']} defects)")
+    print(f"  └─ Recorded duration: {summary['duration_seconds']:.1f}s")
+    if args.command == "info":
+        return
+
+    from alert_engine import AlertEngine
+    from result_sink import CycleStats, LiveEngineFeed, RawAlertFileWriter, ResultSink
+
+    stats = CycleStats()
+    feed = LiveEngineFeed(AlertEngine(), verbose=False)
+    consumers = [stats, feed]
+    if args.output:
+        consumers.append(RawAlertFileWriter(args.output, args.output + ".jsonl"))
+    sink = ResultSink(consumers, spill_file="replay.spill.jsonl")
+
+    started = time.monotonic()
+    replay_cycle(cassette, sink, realtime=args.realtime, workers=args.workers)
+    sink.close()
+    elapsed = time.monotonic() - started
+
+    print(f"\n⏯️  Replayed {stats.total} checks in {elapsed:.2f}s ({'real-time' if args.realtime else 'full speed'})")
+    print(f"  ├─ By status: {stats.by_status}")
+    print(f"  ├─ Simulated defects: {stats.simulated}")
+    print(f"  └─ Ticket candidates: {feed.ticket_candidates}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,480 @@
+"""
+Check Backends Module
+Interchangeable engines for running an activity check: plain HTTP, Selenium,
+or a lightweight headless Chrome driven directly over the DevTools protocol
+Every backend emits the same alert event schema and timing fields
+"""
+
+import base64
+import html
+import json
+import os
+import re
+import select
+import shutil
+import subprocess
+import threading
+import time
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from circuit_breaker import CIRCUIT_OPEN_REASON
+from content_assertions import CONTENT_VIOLATION_REASON
+from utils import ConfigLoader
+
+
+HTTP = "http"
+SELENIUM = "selenium"
+DEVTOOLS = "devtools"
+
+URL_PATTERN = re.compile(r'https?://[^\s"<]+')
+DETAIL_TEXT_PATTERN = re.compile(r'<textarea[^>]*\bid=["\']detail-text["\'][^>]*>(.*?)</textarea>',
+                                 re.IGNORECASE | re.DOTALL)
+
+
+def extract_activity_name(activity_url):
+    """Extract activity name from URL"""
+
+    mapping = {
+        "activity1.html": "Account Verification",
+        "activity2.html": "Transaction Review",
+        "activity3.html": "Loan Application Check",
+        "activity4.html": "Customer Service Check",
+        "activity5.html": "Compliance Audit",
+        "activity6.html": "Security Scan",
+        "activity7.html": "Performance Metrics"
+    }
+
+    for key, value in mapping.items():
+        if key in activity_url:
+            return value
+
+    return "Unknown Activity"
+
+
+def extract_target_url(text: str) -> str:
+    """First URL in an activity's detail text"""
+
+    urls = URL_PATTERN.findall(text or "")
+    if not urls:
+        raise RuntimeError("No URL found in textarea")
+    return urls[0]
+
+
+def probe_target(target_url: str, check_id: int, activity_name: str, execution_id: str,
+                 defect_injector, check_start_time: float, probe: Callable,
+                 retry_queue=None, content_assertions=None,
+                 source: str = SELENIUM) -> Tuple[Dict, List]:
+    """
+    Probe an activity's target link and build its alert event
+
+    Failures are confirmed through the retry queue, then the defect injector
+    may override the result.
+
+    Returns:
+        Tuple of (alert event, Excel report row)
+    """
+
+    probe_metrics = {}
+    assertions = content_assertions.for_activity(activity_name) if content_assertions else None
+    if assertions is not None:
+        status_code, reason = probe(target_url, metrics=probe_metrics, assertions=assertions)
+    else:
+        status_code, reason = probe(target_url, metrics=probe_metrics)
+    attempts = 1
+    if retry_queue is not None and not reason.startswith(CIRCUIT_OPEN_REASON):
+        status_code, reason, attempts = retry_queue.confirm(target_url, status_code, reason, assertions)
+
+    # Inject defect if applicable
+    injected_defect = defect_injector.get_defect(check_id, activity_name)
+
+    original_status_code = status_code
+    is_simulated = bool(injected_defect)
+    if is_simulated:
+        status_code = injected_defect.get("status_code")
+        reason = injected_defect.get("message")
+
+    # HTTP 200 with a broken page body
+    if status_code == 200 and reason.startswith(CONTENT_VIOLATION_REASON):
+        status = "content_violation"
+    else:
+        status = "success" if status_code == 200 else "failure"
+
+    alert_event = {
+        "alert_id": str(uuid.uuid4()),
+        "execution_id": execution_id,
+        "timestamp": datetime.now().isoformat(),
+        "check_id": check_id,
+        "activity_name": activity_name,
+        "url": target_url,
+        "status": status,
+        "response_code": status_code,
+        "original_response_code": original_status_code,
+        "response_time": time.time() - check_start_time,
+        "dns_time": probe_metrics.get("dns_time"),
+        "probe_bytes": probe_metrics.get("probe_bytes"),
+        "error_message": reason if status != "success" else "",
+        "is_simulated": is_simulated,
+        "severity": injected_defect.get("severity", 5) if is_simulated else 5,
+        "retry_count": attempts - 1,
+        "source": source
+    }
+
+    report_status = {"success": "Checked", "content_violation": "Content Violation"}.get(status, "Failed")
+    return alert_event, [target_url, status_code, report_status, reason]
+
+
+def error_event(execution_id: str, check_id: int, target_url: Optional[str], error: Exception,
+                check_start_time: float, source: str = SELENIUM) -> Tuple[Dict, List]:
+    """Alert event and report row for a check that could not complete"""
+
+    alert_event = {
+        "alert_id": str(uuid.uuid4()),
+        "execution_id": execution_id,
+        "timestamp": datetime.now().isoformat(),
+        "check_id": check_id,
+        "activity_name": "Unknown",
+        "url": target_url or "N/A",
+        "status": "error",
+        "response_code": None,
+        "response_time": time.time() - check_start_time,
+        "error_message": str(error),
+        "is_simulated": False,
+        "severity": 7,
+        "retry_count": 0,
+        "source": source
+    }
+    return alert_event, [target_url or "N/A", None, "Error", str(error)]
+
+
+def load_activity_backends(filepath: str = "alert_rules.yaml") -> Dict[str, str]:
+    """Backend declared by each rule in alert_rules.yaml (activity name -> backend)"""
+
+    rules = (ConfigLoader.load_yaml(filepath) or {}).get("rules", [])
+    backends = {}
+    for rule in rules:
+        backend = rule.get("backend", SELENIUM).lower()
+        if backend not in BACKENDS:
+            print(f"⚠️  Unknown backend '{backend}' for {rule.get('activity_name')}, using {SELENIUM}")
+            backend = SELENIUM
+        backends[rule.get("activity_name")] = backend
+    return backends
+
+
+class CheckBackend(ABC):
+    """Runs one activity check and publishes its alert event to a sink"""
+
+    name = None
+
+    def __init__(self, probe: Callable, retry_queue=None, rate_limiter=None,
+                 content_assertions=None, screenshot_store=None):
+        """
+        Args:
+            probe: Link probe function (check_link with breakers/rate limits bound)
+            retry_queue: Optional RetryQueue used to confirm failed probes
+            rate_limiter: Optional DomainRateLimiter for page loads
+            content_assertions: Optional ContentAssertionRegistry
+            screenshot_store: Optional ScreenshotStore (browser backends only)
+        """
+        self.probe = probe
+        self.retry_queue = retry_queue
+        self.rate_limiter = rate_limiter
+        self.content_assertions = content_assertions
+        self.screenshot_store = screenshot_store
+
+    @abstractmethod
+    def run_check(self, activity_url, check_id, sink, execution_id, defect_injector):
+        """Check one activity; results go to sink.put(alert_event, report_row)"""
+
+    def close(self):
+        """Release resources held across checks"""
+
+        pass
+
+    def _probe_target(self, target_url, check_id, activity_name, execution_id,
+                      defect_injector, check_start_time) -> Tuple[Dict, List]:
+        return probe_target(target_url, check_id, activity_name, execution_id, defect_injector,
+                            check_start_time, self.probe, retry_queue=self.retry_queue,
+                            content_assertions=self.content_assertions, source=self.name)
+
+    def _print_result(self, check_id, alert_event):
+        print(f"✓ Check {check_id}: {alert_event['activity_name']} [{self.name}]")
+        print(f"  ├─ Status: {alert_event['response_code']}")
+        print(f"  ├─ Time: {alert_event['response_time']:.2f}s")
+        print(f"  └─ Simulated: {'✓ Yes' if alert_event['is_simulated'] else '✗ No'}")
+
+
+class HttpBackend(CheckBackend):
+    """Reads the activity page with a plain HTTP request; no browser, no form submission"""
+
+    name = HTTP
+
+    def run_check(self, activity_url, check_id, sink, execution_id, defect_injector):
+        check_start_time = time.time()
+        target_url = None
+
+        try:
+            text = self._detail_text(self._fetch(activity_url))
+            target_url = extract_target_url(text)
+            alert_event, row = self._probe_target(target_url, check_id, extract_activity_name(activity_url),
+                                                  execution_id, defect_injector, check_start_time)
+            sink.put(alert_event, row)
+            self._print_result(check_id, alert_event)
+        except Exception as e:
+            print(f"✗ Check {check_id} Error: {e}")
+            sink.put(*error_event(execution_id, check_id, target_url, e, check_start_time, self.name))
+
+    def _fetch(self, activity_url: str) -> str:
+        """Activity page source (http(s) or file URL)"""
+
+        if not activity_url.startswith(("http://", "https://")):
+            with urllib.request.urlopen(activity_url, timeout=10) as f:
+                return f.read().decode("utf-8", errors="replace")
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(activity_url)
+        response = requests.get(activity_url, timeout=10)
+        response.raise_for_status()
+        return response.text
+
+    @staticmethod
+    def _detail_text(page: str) -> str:
+        match = DETAIL_TEXT_PATTERN.search(page)
+        if not match:
+            raise RuntimeError("detail-text not found on activity page")
+        return html.unescape(match.group(1))
+
+
+class SeleniumBackend(CheckBackend):
+    """Full browser check: reads the page, screenshots the target and submits the form"""
+
+    name = SELENIUM
+
+    def run_check(self, activity_url, check_id, sink, execution_id, defect_injector):
+        import axis3_enhanced as crawler
+
+        crawler.run_check(
+            activity_url, check_id, sink, execution_id, defect_injector,
+            retry_queue=self.retry_queue, probe=self.probe, rate_limiter=self.rate_limiter,
+            screenshot_store=self.screenshot_store, content_assertions=self.content_assertions
+        )
+
+
+class DevToolsBackend(CheckBackend):
+    """
+    Headless Chrome driven over --remote-debugging-pipe, without chromedriver
+
+    Each worker thread keeps one browser and opens a tab per check. The
+    activity page is read and the target screenshotted into the screenshot
+    store; the upload form is not submitted.
+    """
+
+    name = DEVTOOLS
+
+    def __init__(self, *args, chrome_binary: str = None, page_timeout: float = 15, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chrome_binary = chrome_binary or os.getenv('CHROME_BINARY') or _find_chrome()
+        self.page_timeout = page_timeout
+        self._local = threading.local()
+        self._sessions: List["DevToolsSession"] = []
+        self._lock = threading.Lock()
+
+    def run_check(self, activity_url, check_id, sink, execution_id, defect_injector):
+        check_start_time = time.time()
+        target_url = None
+
+        try:
+            session = self._session()
+
+            if self.rate_limiter is not None and activity_url.startswith(("http://", "https://")):
+                self.rate_limiter.acquire(activity_url)
+            with session.tab(activity_url, self.page_timeout) as tab:
+                text = tab.evaluate("(document.getElementById('detail-text') || {}).value || ''")
+            target_url = extract_target_url(text)
+
+            alert_event, row = self._probe_target(target_url, check_id, extract_activity_name(activity_url),
+                                                  execution_id, defect_injector, check_start_time)
+            sink.put(alert_event, row)
+
+            store = self.screenshot_store
+            if store is not None and store.should_capture(check_id, alert_event["status"]):
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(target_url)
+                with session.tab(target_url, self.page_timeout) as tab:
+                    store.put(check_id, tab.screenshot(), alert_event["status"])
+
+            self._print_result(check_id, alert_event)
+        except Exception as e:
+            print(f"✗ Check {check_id} Error: {e}")
+            sink.put(*error_event(execution_id, check_id, target_url, e, check_start_time, self.name))
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+
+    def _session(self) -> "DevToolsSession":
+        """This thread's browser, started on first use"""
+
+        session = getattr(self._local, "session", None)
+        if session is None or not session.alive():
+            if not self.chrome_binary:
+                raise RuntimeError("Chrome not found; set CHROME_BINARY")
+            session = DevToolsSession(self.chrome_binary)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+
+class DevToolsSession:
+    """Minimal Chrome DevTools Protocol client over the remote-debugging pipe"""
+
+    def __init__(self, chrome_binary: str, timeout: float = 30):
+        self.timeout = timeout
+        self._next_id = 0
+        self._buffer = b""
+        self._events: List[Dict] = []
+
+        # Chrome reads commands from fd 3 and writes replies to fd 4
+        chrome_in, self._writer = os.pipe()
+        self._reader, chrome_out = os.pipe()
+        args = [chrome_binary, "--headless=new", "--remote-debugging-pipe", "--no-sandbox",
+                "--disable-gpu", "--disable-dev-shm-usage", "--no-first-run", "about:blank"]
+        self.process = subprocess.Popen(
+            ["/bin/sh", "-c", f'exec "$@" 3<&{chrome_in} 4>&{chrome_out}', "sh"] + args,
+            pass_fds=(chrome_in, chrome_out),
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        os.close(chrome_in)
+        os.close(chrome_out)
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def send(self, method: str, params: Dict = None, session_id: str = None,
+             timeout: float = None) -> Dict:
+        """Send a command and wait for its result"""
+
+        self._next_id += 1
+        message = {"id": self._next_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        os.write(self._writer, json.dumps(message).encode("utf-8") + b"\0")
+
+        deadline = time.monotonic() + (timeout or self.timeout)
+        while True:
+            reply = self._read_message(deadline)
+            if reply.get("id") == self._next_id:
+                if "error" in reply:
+                    raise RuntimeError(f"{method}: {reply['error'].get('message')}")
+                return reply.get("result", {})
+            if "method" in reply:
+                self._events.append(reply)
+
+    def wait_for_event(self, method: str, session_id: str, timeout: float) -> Dict:
+        """Wait for an event from a tab, keeping unrelated events out of the way"""
+
+        deadline = time.monotonic() + timeout
+        while True:
+            for i, event in enumerate(self._events):
+                if event["method"] == method and event.get("sessionId") == session_id:
+                    return self._events.pop(i)
+            self._events.append(self._read_message(deadline))
+
+    def tab(self, url: str, timeout: float = 15) -> "DevToolsTab":
+        return DevToolsTab(self, url, timeout)
+
+    def close(self):
+        try:
+            self.send("Browser.close", timeout=5)
+        except Exception:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        os.close(self._writer)
+        os.close(self._reader)
+
+    def _read_message(self, deadline: float) -> Dict:
+        """Next NUL-terminated JSON message from Chrome"""
+
+        while b"\0" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("DevTools response timed out")
+            ready, _, _ = select.select([self._reader], [], [], remaining)
+            if ready:
+                chunk = os.read(self._reader, 65536)
+                if not chunk:
+                    raise RuntimeError("Chrome closed the DevTools pipe")
+                self._buffer += chunk
+
+        message, self._buffer = self._buffer.split(b"\0", 1)
+        return json.loads(message)
+
+
+class DevToolsTab:
+    """A tab opened on a URL for the duration of a with-block"""
+
+    def __init__(self, session: DevToolsSession, url: str, timeout: float):
+        self.session = session
+        self.url = url
+        self.timeout = timeout
+        self.target_id = None
+        self.session_id = None
+
+    def __enter__(self) -> "DevToolsTab":
+        self.target_id = self.session.send("Target.createTarget", {"url": "about:blank"})["targetId"]
+        self.session_id = self.session.send("Target.attachToTarget",
+                                            {"targetId": self.target_id, "flatten": True})["sessionId"]
+        self.session.send("Page.enable", session_id=self.session_id)
+        navigation = self.session.send("Page.navigate", {"url": self.url}, session_id=self.session_id)
+        if navigation.get("errorText"):
+            raise RuntimeError(f"Navigation failed: {navigation['errorText']}")
+        self.session.wait_for_event("Page.loadEventFired", self.session_id, self.timeout)
+        return self
+
+    def evaluate(self, expression: str):
+        result = self.session.send("Runtime.evaluate", {"expression": expression, "returnByValue": True},
+                                   session_id=self.session_id)
+        return result.get("result", {}).get("value")
+
+    def screenshot(self) -> bytes:
+        data = self.session.send("Page.captureScreenshot", {"format": "png"}, session_id=self.session_id)
+        return base64.b64decode(data["data"])
+
+    def __exit__(self, *exc):
+        if self.target_id:
+            try:
+                self.session.send("Target.closeTarget", {"targetId": self.target_id})
+            except Exception:
+                pass
+        # Drop leftover events of this tab so they do not pile up across checks
+        self.session._events = [
+            event for event in self.session._events
+            if event.get("sessionId") != self.session_id and not event["method"].startswith("Target.")
+        ]
+        return False
+
+
+def _find_chrome() -> Optional[str]:
+    for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+BACKENDS = {
+    HTTP: HttpBackend,
+    SELENIUM: SeleniumBackend,
+    DEVTOOLS: DevToolsBackend
+}
@@ -0,0 +1,189 @@
+"""
+Check Scheduler Module
+Runs activity checks on a bounded worker pool with a priority lane
+Critical activities are served first and have workers reserved for them
+Jobs can be grouped (e.g. by check backend) with a concurrency cap per group
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Tuple
+
+from sim_clock import SYSTEM_CLOCK
+
+
+CRITICAL = "critical"
+NORMAL = "normal"
+
+
+class CheckScheduler:
+    """Bounded worker pool with a critical lane and a normal lane"""
+
+    def __init__(self, max_workers: int = 7, reserved_workers: int = 2,
+                 group_limits: Dict[str, int] = None, clock=None):
+        """
+        Args:
+            max_workers: Total number of concurrent checks
+            reserved_workers: Workers that only ever run critical checks, so
+                critical activities are never starved by a saturated pool
+            group_limits: Max concurrent jobs per group; jobs of a group at its
+                limit are skipped in favour of other groups. Limits must be at
+                least 1, a group that can never run would hang the run
+            clock: Time source for lane timings (SystemClock by default)
+        """
+        for group, limit in (group_limits or {}).items():
+            if limit < 1:
+                raise ValueError(f"Concurrency limit for group '{group}' must be at least 1, got {limit}")
+        self.clock = clock or SYSTEM_CLOCK
+        self.group_limits = group_limits or {}
+        self._running_by_group: Dict[str, int] = {}
+        self.reserved_workers = max(0, min(reserved_workers, max_workers - 1))
+        self.general_workers = max(1, max_workers - self.reserved_workers)
+        self.lanes = {CRITICAL: deque(), NORMAL: deque()}
+        self.completed: List[Dict] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._threads: List[threading.Thread] = []
+        self._started_at = None
+
+    @staticmethod
+    def from_env(default_workers: int = 7) -> "CheckScheduler":
+        """Build scheduler from CHECK_WORKERS / CRITICAL_RESERVED_WORKERS / CHECK_GROUP_LIMITS"""
+
+        # CHECK_GROUP_LIMITS="selenium=3,devtools=2"
+        group_limits = {}
+        for item in os.getenv('CHECK_GROUP_LIMITS', '').split(','):
+            if '=' in item:
+                group, limit = item.split('=', 1)
+                group_limits[group.strip()] = int(limit)
+
+        return CheckScheduler(
+            max_workers=int(os.getenv('CHECK_WORKERS', str(default_workers))),
+            reserved_workers=int(os.getenv('CRITICAL_RESERVED_WORKERS', '2')),
+            group_limits=group_limits
+        )
+
+    def submit(self, target: Callable, args: Tuple = (), kwargs: Dict = None,
+               critical: bool = False, name: str = None, group: str = None):
+        """Queue a check; critical checks go to the priority lane"""
+
+        lane = CRITICAL if critical else NORMAL
+        job = {"target": target, "args": args, "kwargs": kwargs or {},
+               "lane": lane, "name": name, "group": group, "queued_at": self.clock.monotonic()}
+
+        with self._cond:
+            self.lanes[lane].append(job)
+            self._cond.notify_all()
+
+    def start(self):
+        """Start worker threads"""
+
+        self._started_at = self.clock.monotonic()
+        for lanes in [(CRITICAL,)] * self.reserved_workers + [(CRITICAL, NORMAL)] * self.general_workers:
+            t = threading.Thread(target=self._worker_loop, args=(lanes,), daemon=True)
+            self._threads.append(t)
+            t.start()
+
+    def join(self) -> List[Dict]:
+        """Wait until every queued check has run, then stop the workers"""
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        for t in self._threads:
+            t.join()
+
+        return self.completed
+
+    def run(self) -> List[Dict]:
+        """Start workers and block until all queued checks are done"""
+
+        self.start()
+        return self.join()
+
+    def get_lane_stats(self) -> Dict[str, Dict]:
+        """Completion latency per lane, measured from scheduler start"""
+
+        stats = {}
+        for lane in (CRITICAL, NORMAL):
+            finished = [job["finished_after"] for job in self.completed if job["lane"] == lane]
+            if finished:
+                stats[lane] = {
+                    "count": len(finished),
+                    "last_finished_after": max(finished),
+                    "avg_finished_after": sum(finished) / len(finished)
+                }
+        return stats
+
+    def get_group_counts(self) -> Dict[str, int]:
+        """Completed jobs per group"""
+
+        counts = {}
+        for job in self.completed:
+            if job["group"] is not None:
+                counts[job["group"]] = counts.get(job["group"], 0) + 1
+        return counts
+
+    def _next_job(self, lanes: Tuple[str, ...], last_group: str = None):
+        """
+        Pop the next runnable job from the first lane that has one, or None when done
+
+        Within a lane, a job of the worker's previous group is preferred so a
+        worker keeps running one kind of check (and its warm resources).
+        """
+
+        with self._cond:
+            while True:
+                for lane in lanes:
+                    job = self._pick(self.lanes[lane], last_group)
+                    if job is not None:
+                        if job["group"] is not None:
+                            self._running_by_group[job["group"]] = self._running_by_group.get(job["group"], 0) + 1
+                        return job
+                if self._closed and not any(self.lanes[lane] for lane in lanes):
+                    return None
+                self._cond.wait()
+
+    def _pick(self, queue: deque, last_group: str = None):
+        """Remove and return the job to run next from a lane (caller holds the lock)"""
+
+        first = None
+        for job in queue:
+            group = job["group"]
+            if group is not None and self._running_by_group.get(group, 0) >= self.group_limits.get(group, float("inf")):
+                continue
+            if last_group is None or group == last_group:
+                first = job
+                break
+            if first is None:
+                first = job
+        if first is not None:
+            queue.remove(first)
+        return first
+
+    def _worker_loop(self, lanes: Tuple[str, ...]):
+        """Run jobs from the given lanes in priority order"""
+
+        last_group = None
+        while True:
+            job = self._next_job(lanes, last_group)
+            if job is None:
+                return
+            last_group = job["group"]
+
+            job["started_after"] = self.clock.monotonic() - self._started_at
+            try:
+                job["target"](*job["args"], **job["kwargs"])
+            except Exception as e:
+                job["error"] = str(e)
+                print(f"✗ Scheduled check {job['name'] or ''} failed: {e}")
+            job["finished_after"] = self.clock.monotonic() - self._started_at
+
+            with self._cond:
+                if job["group"] is not None:
+                    self._running_by_group[job["group"]] -= 1
+                    self._cond.notify_all()
+                self.completed.append({key: job[key] for key in job
+                                       if key not in ("target", "args", "kwargs")})
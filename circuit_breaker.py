@@ -0,0 +1,183 @@
+"""
+Circuit Breaker Module
+Per-host circuit breakers that short-circuit probes to hosts known to be down
+State is persisted to JSON so breakers survive across health check cycles
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process state lock
+    fcntl = None
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+CIRCUIT_OPEN_REASON = "Circuit open"
+
+# Health checks run every 10 minutes: a breaker opened during one run stays
+# open through the next one and gets its trial probe in the run after
+DEFAULT_RESET_TIMEOUT = 900
+
+
+class CircuitBreakerRegistry:
+    """Thread-safe registry of per-host circuit breakers"""
+
+    def __init__(self, state_file: str = "circuit_breakers.json",
+                 failure_threshold: int = 5, reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 trial_timeout: float = 60):
+        """
+        Args:
+            state_file: JSON file holding breaker state between cycles
+            failure_threshold: Consecutive failures that open a breaker
+            reset_timeout: Seconds a breaker stays open before a half-open
+                trial probe is allowed
+            trial_timeout: Seconds after which an unanswered trial probe
+                no longer blocks a new one
+        """
+        self.state_file = state_file
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.trial_timeout = trial_timeout
+        self._lock = threading.Lock()
+        self._trial_done = threading.Condition(self._lock)
+        self.breakers = self._load_state()
+
+    @staticmethod
+    def from_env(state_file: str = "circuit_breakers.json") -> "CircuitBreakerRegistry":
+        """Build registry from BREAKER_* environment variables"""
+
+        return CircuitBreakerRegistry(
+            state_file=state_file,
+            failure_threshold=int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5')),
+            reset_timeout=float(os.getenv('BREAKER_RESET_TIMEOUT', str(DEFAULT_RESET_TIMEOUT)))
+        )
+
+    def allow(self, url: str) -> Tuple[bool, str]:
+        """
+        Check whether a probe to this URL's host may be sent
+
+        While a half-open trial probe is running, other probes to the host
+        wait for its outcome instead of being reported as failures.
+
+        Returns:
+            Tuple of (allowed, reason); reason explains a short-circuit
+        """
+
+        host = _host_of(url)
+
+        with self._lock:
+            while True:
+                now = time.time()
+                breaker = self.breakers.get(host)
+                if not breaker or breaker["state"] == CLOSED:
+                    return True, ""
+
+                if breaker["state"] == OPEN:
+                    remaining = breaker["opened_at"] + self.reset_timeout - now
+                    if remaining > 0:
+                        return False, (f"{CIRCUIT_OPEN_REASON} for {host} "
+                                       f"({breaker['failures']} consecutive failures, "
+                                       f"next trial in {remaining:.0f}s)")
+                    breaker["state"] = HALF_OPEN
+                    breaker["trial_started"] = breaker["updated_at"] = now
+                    return True, ""
+
+                # Half-open: only one trial probe at a time
+                waited = now - breaker.get("trial_started", 0)
+                if waited > self.trial_timeout:
+                    breaker["trial_started"] = now
+                    return True, ""
+                self._trial_done.wait(self.trial_timeout - waited)
+
+    def record(self, url: str, status_code: Optional[int]):
+        """Record a probe outcome for this URL's host"""
+
+        host = _host_of(url)
+        failed = status_code is None or status_code >= 500
+
+        with self._lock:
+            breaker = self.breakers.setdefault(host, {"state": CLOSED, "failures": 0})
+
+            breaker["updated_at"] = time.time()
+            if not failed:
+                breaker.update({"state": CLOSED, "failures": 0})
+                breaker.pop("opened_at", None)
+                breaker.pop("trial_started", None)
+                self._trial_done.notify_all()
+                return
+
+            breaker["failures"] += 1
+            if breaker["state"] == HALF_OPEN or breaker["failures"] >= self.failure_threshold:
+                breaker["state"] = OPEN
+                breaker["opened_at"] = breaker["updated_at"]
+                breaker.pop("trial_started", None)
+                self._trial_done.notify_all()
+
+    def get_open_hosts(self) -> Dict[str, Dict]:
+        """Get breakers that are currently not closed"""
+
+        with self._lock:
+            return {
+                host: dict(breaker) for host, breaker in self.breakers.items()
+                if breaker["state"] != CLOSED
+            }
+
+    def save(self):
+        """
+        Atomically persist breaker state to file
+
+        Work-queue worker processes share the file: under a lock, breakers
+        another process changed more recently are taken from disk first, so
+        one worker's save does not reset a breaker another has just opened.
+        """
+
+        try:
+            with open(f"{self.state_file}.lock", 'w') as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                saved = self._load_state()
+                with self._lock:
+                    for host, breaker in saved.items():
+                        current = self.breakers.get(host)
+                        if current is None or breaker.get("updated_at", 0) > current.get("updated_at", 0):
+                            self.breakers[host] = breaker
+                    snapshot = {host: dict(breaker) for host, breaker in self.breakers.items()}
+
+                tmp_path = f"{self.state_file}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(snapshot, f, indent=2)
+                os.replace(tmp_path, self.state_file)
+        except Exception as e:
+            print(f"Error saving circuit breaker state: {e}")
+
+    def _load_state(self) -> Dict[str, Dict]:
+        """Load breaker state from file"""
+
+        if Path(self.state_file).exists():
+            try:
+                with open(self.state_file, 'r') as f:
+                    breakers = json.load(f)
+                # A trial interrupted by the previous run must not block this one
+                for breaker in breakers.values():
+                    if breaker.get("state") == HALF_OPEN:
+                        breaker["state"] = OPEN
+                        breaker.pop("trial_started", None)
+                return breakers
+            except Exception as e:
+                print(f"Error loading circuit breaker state: {e}")
+
+        return {}
+
+
+def _host_of(url: str) -> str:
+    return (urlsplit(url).hostname or url).lower()
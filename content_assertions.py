@@ -0,0 +1,172 @@
+"""
+Content Assertions Module
+Per-activity checks on the body of probed pages (expected keywords, absent
+error banners, size range), evaluated while the response streams in
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils import ConfigLoader
+
+
+CONTENT_VIOLATION_REASON = "Content violation"
+
+
+class ContentAssertion:
+    """Compiled content assertions for one activity"""
+
+    def __init__(self, must_contain: List[str] = None, must_not_contain: List[str] = None,
+                 min_bytes: Optional[int] = None, max_bytes: Optional[int] = None,
+                 case_sensitive: bool = False, max_read_bytes: int = 2 * 1024 * 1024):
+        """
+        Args:
+            must_contain: Keywords that must appear in the body
+            must_not_contain: Keywords (e.g. error banners) that must not appear
+            min_bytes: Minimum body size
+            max_bytes: Maximum body size
+            case_sensitive: Match keywords case-sensitively
+            max_read_bytes: Stop reading after this many bytes; keywords not
+                seen by then count as missing
+        """
+        self.must_contain = list(must_contain or [])
+        self.must_not_contain = list(must_not_contain or [])
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+        self.max_read_bytes = max_read_bytes
+
+        # One pattern per keyword: a single alternation consumes the text it
+        # matches, so a keyword overlapping another (e.g. "Error" and
+        # "Error 500") would never be seen
+        keywords = self.must_contain + self.must_not_contain
+        flags = 0 if case_sensitive else re.IGNORECASE
+        self._patterns = [re.compile(re.escape(k.encode("utf-8")), flags) for k in keywords]
+        # Bytes kept between chunks so keywords split across chunks still match
+        self._overlap = max((len(k.encode("utf-8")) for k in keywords), default=1) - 1
+
+    @staticmethod
+    def from_dict(config: Dict) -> "ContentAssertion":
+        """Build from a rule's content_assertions block"""
+
+        return ContentAssertion(
+            must_contain=config.get("must_contain"),
+            must_not_contain=config.get("must_not_contain"),
+            min_bytes=config.get("min_bytes"),
+            max_bytes=config.get("max_bytes"),
+            case_sensitive=config.get("case_sensitive", False),
+            max_read_bytes=config.get("max_read_bytes", 2 * 1024 * 1024)
+        )
+
+    def evaluate(self, chunks: Iterable[bytes], content_length: Optional[int] = None) -> Tuple[List[str], int]:
+        """
+        Evaluate a streamed body, reading only until every assertion is decided
+
+        Args:
+            chunks: Body chunks (e.g. response.iter_content())
+            content_length: Declared body size, used to decide size bounds early
+
+        Returns:
+            Tuple of (violation messages, bytes read)
+        """
+
+        found = [False] * (len(self.must_contain) + len(self.must_not_contain))
+        missing = len(self.must_contain)
+        banner = None
+        size = 0
+        tail = b""
+
+        for chunk in chunks:
+            if not chunk:
+                continue
+            size += len(chunk)
+
+            if self._patterns:
+                window = tail + chunk
+                for index, pattern in enumerate(self._patterns):
+                    if found[index] or not pattern.search(window):
+                        continue
+                    found[index] = True
+                    if index < len(self.must_contain):
+                        missing -= 1
+                    elif banner is None:
+                        banner = self.must_not_contain[index - len(self.must_contain)]
+                tail = window[-self._overlap:] if self._overlap else b""
+
+            if banner is not None or (self.max_bytes is not None and size > self.max_bytes):
+                break  # Violation is certain
+            if size >= self.max_read_bytes:
+                break
+            if self._decided(missing, size, content_length):
+                break
+
+        return self._violations(found, missing, banner, size), size
+
+    def _decided(self, missing: int, size: int, content_length: Optional[int]) -> bool:
+        """True once reading more bytes cannot change the outcome"""
+
+        if missing or self.must_not_contain:
+            return False
+        if self.min_bytes is not None and size < self.min_bytes:
+            return False
+        if self.max_bytes is not None:
+            return content_length is not None and content_length <= self.max_bytes
+        return True
+
+    def _violations(self, found: List[bool], missing: int, banner: Optional[str], size: int) -> List[str]:
+        """Describe every failed assertion"""
+
+        violations = []
+        if banner is not None:
+            violations.append(f"found '{banner}'")
+        if missing:
+            absent = [k for k, hit in zip(self.must_contain, found) if not hit]
+            violations.append(f"missing {', '.join(repr(k) for k in absent)}")
+        if self.max_bytes is not None and size > self.max_bytes:
+            violations.append(f"body larger than {self.max_bytes} bytes")
+        elif self.min_bytes is not None and size < self.min_bytes:
+            violations.append(f"body {size} bytes, expected at least {self.min_bytes}")
+        return violations
+
+
+class ContentAssertionRegistry:
+    """Content assertions by activity name, loaded from alert_rules.yaml"""
+
+    def __init__(self, assertions: Dict[str, ContentAssertion] = None):
+        self.assertions = assertions or {}
+
+    @staticmethod
+    def from_config(filepath: str = "alert_rules.yaml") -> "ContentAssertionRegistry":
+        """Compile the content_assertions block of every rule"""
+
+        rules = (ConfigLoader.load_yaml(filepath) or {}).get("rules", [])
+        return ContentAssertionRegistry({
+            rule["activity_name"]: ContentAssertion.from_dict(rule["content_assertions"])
+            for rule in rules
+            if rule.get("activity_name") and rule.get("content_assertions")
+        })
+
+    def for_activity(self, activity_name: str) -> Optional[ContentAssertion]:
+        return self.assertions.get(activity_name)
+
+
+def check_response(response, assertion: ContentAssertion) -> Tuple[bool, str, int]:
+    """
+    Stream a requests response through an assertion, closing it afterwards
+
+    Returns:
+        Tuple of (passed, reason, body bytes read)
+    """
+
+    try:
+        # Content-Length counts encoded bytes; only trust it for identity bodies
+        declared = response.headers.get("Content-Length")
+        content_length = None
+        if declared and declared.isdigit() and not response.headers.get("Content-Encoding"):
+            content_length = int(declared)
+        violations, size = assertion.evaluate(response.iter_content(chunk_size=16384), content_length)
+    finally:
+        response.close()
+
+    if violations:
+        return False, f"{CONTENT_VIOLATION_REASON}: {'; '.join(violations)}", size
+    return True, "Success", size
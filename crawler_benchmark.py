@@ -0,0 +1,327 @@
+"""
+Crawler Benchmark Harness
+Generates synthetic activity pages modelled on activity1.html, serves them with
+configurable target endpoints from a local HTTP server and runs the crawler
+against them, reporting throughput, latency percentiles and peak memory
+
+Usage:
+    python crawler_benchmark.py --sizes 7,50,200,1000 --backend http
+    python crawler_benchmark.py --sizes 200 --fault-config defect_config.yaml
+"""
+
+import argparse
+import contextlib
+import html
+import io
+import json
+import math
+import os
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from check_backends import BACKENDS, DETAIL_TEXT_PATTERN, HTTP
+from check_scheduler import CheckScheduler
+from defect_injector import DefectInjector
+from fault_server import FaultServer
+from resource_accounting import ProcessTreeSampler
+from result_sink import ResultSink, CycleStats
+
+
+class TargetProfile:
+    """Behaviour of the synthetic target endpoints"""
+
+    def __init__(self, latency_ms: float = 50, latency_sigma: float = 0.5,
+                 error_rate: float = 0.05, error_codes: List[int] = None,
+                 body_bytes: int = 4096, large_body_rate: float = 0.02,
+                 large_body_bytes: int = 2 * 1024 * 1024):
+        """
+        Args:
+            latency_ms: Median response latency (log-normal distribution)
+            latency_sigma: Spread of the log-normal latency (0 = constant)
+            error_rate: Share of targets answering with an error code
+            error_codes: Error codes to pick from
+            body_bytes: Normal body size
+            large_body_rate: Share of targets returning a large body
+            large_body_bytes: Large body size
+        """
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.error_codes = error_codes or [500, 502, 503]
+        self.body_bytes = body_bytes
+        self.large_body_rate = large_body_rate
+        self.large_body_bytes = large_body_bytes
+
+    def plan(self, rng: random.Random) -> Dict:
+        """Draw the response for one request"""
+
+        latency = self.latency_ms * rng.lognormvariate(0, self.latency_sigma) if self.latency_sigma else self.latency_ms
+        status = rng.choice(self.error_codes) if rng.random() < self.error_rate else 200
+        size = self.large_body_bytes if rng.random() < self.large_body_rate else self.body_bytes
+        return {"latency": latency / 1000, "status": status, "size": size}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # The default backlog of 5 drops connections under load
+
+
+class BenchmarkServer:
+    """Local server for activity pages (/activities/...) and targets (/target/<n>)"""
+
+    def __init__(self, pages_dir: str, profile: TargetProfile = None, seed: int = 0,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.pages_dir = pages_dir
+        self.profile = profile or TargetProfile()
+        self.seed = seed
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "BenchmarkServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if self.path.startswith("/activities/"):
+                    self._serve_page(os.path.basename(self.path))
+                elif self.path.startswith("/target/"):
+                    self._serve_target()
+                else:
+                    self._respond(404, b"Not found")
+
+            def _serve_page(self, name):
+                path = os.path.join(server.pages_dir, name)
+                if not os.path.isfile(path):
+                    self._respond(404, b"Not found")
+                    return
+                with open(path, "rb") as f:
+                    self._respond(200, f.read(), "text/html; charset=utf-8")
+
+            def _serve_target(self):
+                # Same path, same behaviour: outcomes are reproducible per seed
+                plan = server.profile.plan(random.Random(f"{server.seed}:{self.path}"))
+                time.sleep(plan["latency"])
+
+                self.send_response(plan["status"])
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(plan["size"]))
+                self.end_headers()
+                chunk = b"<p>synthetic target</p>".ljust(8192, b" ")
+                remaining = plan["size"]
+                while remaining > 0:
+                    self.wfile.write(chunk[:remaining])
+                    remaining -= len(chunk)
+
+            def _respond(self, status, body, content_type="text/plain"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def generate_activity_pages(count: int, target_base_url: str, out_dir: str,
+                            template: str = "activity1.html") -> List[str]:
+    """
+    Write count activity pages based on template, each pointing at its own target
+
+    Returns:
+        Page file names
+    """
+
+    with open(template, "r", encoding="utf-8") as f:
+        source = f.read()
+
+    os.makedirs(out_dir, exist_ok=True)
+    names = []
+    for i in range(1, count + 1):
+        detail = html.escape(f"Synthetic benchmark activity {i}. Reference: {target_base_url}/target/{i}")
+        match = DETAIL_TEXT_PATTERN.search(source)
+        page = source[:match.start(1)] + detail + source[match.end(1):]
+        page = re.sub(r"<title>.*?</title>", f"<title>Benchmark Activity {i}</title>", page, count=1)
+
+        name = f"bench_activity_{i}.html"
+        with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+            f.write(page)
+        names.append(name)
+    return names
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class _LatencyCollector:
+    """Consumer keeping per-check latency"""
+
+    def __init__(self):
+        self.latencies = []
+
+    def consume(self, record: Dict):
+        self.latencies.append(record["alert"].get("response_time", 0))
+
+    def close(self):
+        pass
+
+
+def run_benchmark(count: int, backend: str = HTTP, workers: int = 8,
+                  profile: TargetProfile = None, seed: int = 0,
+                  work_dir: str = None, verbose: bool = False,
+                  fault_config: str = None, fault_time_scale: float = 1.0) -> Dict:
+    """
+    Crawl count synthetic activities once and measure the run
+
+    Per-check console output is discarded unless verbose is set. With
+    fault_config, targets are served by a FaultServer following that defect
+    configuration ("" for the defaults) instead of the target profile.
+
+    Returns:
+        Dict with checks_per_sec, p50/p95/p99 latency, peak memory and status counts
+    """
+
+    from axis3_enhanced import check_link
+
+    own_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="crawler_benchmark_")
+    pages_dir = os.path.join(work_dir, "activities")
+    server = BenchmarkServer(pages_dir, profile, seed).start()
+    faults = None
+    if fault_config is not None:
+        faults = FaultServer.from_config(fault_config or None, seed=seed, time_scale=fault_time_scale).start()
+
+    try:
+        target_base_url = faults.base_url if faults is not None else server.base_url
+        pages = generate_activity_pages(count, target_base_url, pages_dir)
+        activity_urls = [f"{server.base_url}/activities/{name}" for name in pages]
+
+        latencies = _LatencyCollector()
+        stats = CycleStats()
+        sink = ResultSink([latencies, stats], spill_file=os.path.join(work_dir, "spill.jsonl"))
+
+        screenshot_store = None
+        if backend != HTTP:
+            from screenshot_store import ScreenshotStore
+            screenshot_store = ScreenshotStore(os.path.join(work_dir, "screenshots"))
+        check_backend = BACKENDS[backend](check_link, screenshot_store=screenshot_store)
+        injector = DefectInjector(enabled=False)
+
+        # Memory of this process and every browser it starts
+        sampler = ProcessTreeSampler(os.getpid(), interval=0.1).start() if ProcessTreeSampler.available() else None
+
+        scheduler = CheckScheduler(max_workers=workers, reserved_workers=0)
+        for i, url in enumerate(activity_urls, start=1):
+            scheduler.submit(check_backend.run_check, args=(url, i, sink, "benchmark", injector),
+                             group=backend)
+
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with output:
+            started = time.monotonic()
+            scheduler.run()
+            elapsed = time.monotonic() - started
+
+        check_backend.close()
+        sink.close()
+        usage = sampler.stop() if sampler is not None else {}
+    finally:
+        server.stop()
+        if faults is not None:
+            faults.stop()
+        if own_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "activities": count,
+        "backend": backend,
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "checks_per_sec": round(count / elapsed, 2) if elapsed else 0,
+        "p50_latency": round(percentile(latencies.latencies, 50), 4),
+        "p95_latency": round(percentile(latencies.latencies, 95), 4),
+        "p99_latency": round(percentile(latencies.latencies, 99), 4),
+        "peak_rss_mb": usage.get("peak_rss_mb"),
+        "by_status": stats.by_status,
+        "faults": dict(faults.stats) if faults is not None else None
+    }
+
+
+def main():
+    """Command line entry point"""
+
+    parser = argparse.ArgumentParser(description="Benchmark the crawler against synthetic activities")
+    parser.add_argument("--sizes", default="7,50,200,1000", help="Comma-separated activity counts")
+    parser.add_argument("--backend", default=HTTP, choices=sorted(BACKENDS))
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--large-body-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fault-config", nargs="?", const="",
+                        help="Serve targets from the fault server (optional defect config YAML)")
+    parser.add_argument("--fault-time-scale", type=float, default=1.0, help="Multiplier for fault delays")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show per-check output")
+    args = parser.parse_args()
+
+    profile = TargetProfile(latency_ms=args.latency_ms, latency_sigma=args.latency_sigma,
+                            error_rate=args.error_rate, large_body_rate=args.large_body_rate)
+
+    print("=" * 78)
+    print(f"🏁 Crawler benchmark ({args.backend} backend, {args.workers} workers)")
+    print("=" * 78)
+    print(f"{'Activities':>10} {'Checks/s':>10} {'p50 (s)':>10} {'p95 (s)':>10} {'p99 (s)':>10} {'Peak MB':>10}")
+
+    results = []
+    for size in [int(n) for n in args.sizes.split(",") if n.strip()]:
+        result = run_benchmark(size, args.backend, args.workers, profile, args.seed, verbose=args.verbose,
+                               fault_config=args.fault_config, fault_time_scale=args.fault_time_scale)
+        results.append(result)
+        print(f"{size:>10} {result['checks_per_sec']:>10.2f} {result['p50_latency']:>10.3f} "
+              f"{result['p95_latency']:>10.3f} {result['p99_latency']:>10.3f} "
+              f"{result['peak_rss_mb'] or 0:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
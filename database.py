@@ -30,6 +30,17 @@ class AlertDatabase:
         
         self._save_database()
     
+    def add_alerts(self, alerts: List[Dict]):
+        """Add a batch of alerts to database, saving the file once"""
+        
+        if "alerts" not in self.data:
+            self.data["alerts"] = []
+        
+        stored_at = datetime.now().isoformat()
+        self.data["alerts"].extend({**alert, "stored_at": stored_at} for alert in alerts)
+        
+        self._save_database()
+    
     def add_ticket(self, ticket: Dict):
         """Add ticket to database"""
         
@@ -103,6 +114,7 @@ class AlertDatabase:
             "by_status": {
                 "success": len([a for a in alerts if a.get("status") == "success"]),
                 "failure": len([a for a in alerts if a.get("status") == "failure"]),
+                "content_violation": len([a for a in alerts if a.get("status") == "content_violation"]),
                 "error": len([a for a in alerts if a.get("status") == "error"])
             },
             "by_activity": self._group_by_activity(alerts),
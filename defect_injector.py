@@ -4,41 +4,96 @@ Intentionally injects simulated failures for testing the alert engine
 All defects are marked as "is_simulated: true"
 """
 
+import array
+import bisect
+import copy
+import hashlib
+import itertools
+import os
 import random
+import threading
 import time
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Sequence, Union
 from datetime import datetime, timedelta
 
+from sim_clock import SYSTEM_CLOCK
+
+
+# SplitMix64 constants: each check draws from its own counter-based stream,
+# so a draw depends only on (seed, check, timestamp, draw index)
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_MIX1 = 0xBF58476D1CE4E5B9
+_MIX2 = 0x94D049BB133111EB
+
+# Draw indexes within a check's stream
+_DRAW_TYPE = 0
+_DRAW_PARAMETER = 1
+
+# Priority of each defect type (reported in defect stats)
+DEFECT_PRIORITIES = {
+    "TIMEOUT": 75,
+    "SLOW_RESPONSE": 40,
+    "DUPLICATE_ALERT": 65,
+    "FALSE_POSITIVE": 30,
+    "ALERT_STORM": 85,
+    "CONNECTION_ERROR": 70
+}
+
+Timestamp = Union[datetime, float]
+
 
 class DefectInjector:
     """Injects random simulated defects for testing"""
     
-    def __init__(self, enabled: bool = True, seed: int = None):
+    def __init__(self, enabled: bool = True, seed: int = None, clock=None, config: Dict = None):
         """
         Initialize defect injector
         
         Args:
             enabled: Enable/disable defect injection
-            seed: Random seed for reproducibility
+            seed: Random seed for reproducibility (affects only this injector)
+            clock: Time source (SystemClock by default, VirtualClock in simulations)
+            config: DefectConfiguration dict whose percentages and activity,
+                day and hour restrictions are honoured (defaults to
+                DefectConfiguration.get_default_config())
         """
-        self.enabled = enabled
-        if seed:
-            random.seed(seed)
+        self.config = config or DefectConfiguration.get_default_config()
+        self.enabled = enabled and self.config.get("enabled", True)
+        self.clock = clock or SYSTEM_CLOCK
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(64)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._planned: Dict[int, Optional[Dict]] = {}
         
+        self.table = DefectEligibilityTable(self.config)
         self.defect_config = {
-            "TIMEOUT": {"percentage": 15, "priority": 75},
-            "SLOW_RESPONSE": {"percentage": 20, "priority": 40},
-            "DUPLICATE_ALERT": {"percentage": 10, "priority": 65},
-            "FALSE_POSITIVE": {"percentage": 8, "priority": 30},
-            "ALERT_STORM": {"percentage": 5, "priority": 85},
-            "CONNECTION_ERROR": {"percentage": 12, "priority": 70}
+            defect_type: {"percentage": settings.get("percentage", 0),
+                          "priority": DEFECT_PRIORITIES.get(defect_type, 50)}
+            for defect_type, settings in self.config.get("defects", {}).items()
         }
     
+    @staticmethod
+    def from_env(rules_file: str = "alert_rules.yaml") -> "DefectInjector":
+        """
+        Create from DEFECTS_ENABLED and DEFECT_SEED environment variables,
+        configured by the defect_injection block of the rules file
+        """
+        
+        seed = os.getenv('DEFECT_SEED')
+        return DefectInjector(
+            enabled=os.getenv('DEFECTS_ENABLED', 'true').lower() == 'true',
+            seed=int(seed) if seed else None,
+            config=DefectConfiguration.from_rules_file(rules_file)
+        )
+    
     def get_defect(self, check_id: int, activity_name: str, 
                    previous_status: str = "success") -> Optional[Dict]:
         """
         Determine if a defect should be injected for this check
         
+        A check planned with plan_batch gets its planned defect (once).
+        
         Args:
             check_id: Activity check ID
             activity_name: Name of activity being checked
@@ -51,20 +106,125 @@ class DefectInjector:
         if not self.enabled:
             return None
         
-        rand = random.random() * 100
-        cumulative = 0
+        with self._lock:
+            if check_id in self._planned:
+                return self._planned.pop(check_id)
+            rand = self._rng.random() * 100
+            draw = self._rng.random()
         
-        for defect_type, config in self.defect_config.items():
-            cumulative += config["percentage"]
-            
-            if rand < cumulative:
-                return self._create_defect(defect_type, check_id, activity_name, previous_status)
+        # Defects eligible for this activity at this day and hour
+        now = self.clock.now()
+        if activity_name in self.table.excluded_names:
+            return None
+        cumulative = self.table.distributions[self.table.cell(now.weekday(), now.hour, check_id)]
+        
+        index = bisect.bisect_right(cumulative, rand)
+        if index < len(self.table.types):
+            return self._create_defect(self.table.types[index], check_id, activity_name,
+                                       previous_status, draw, now)
         
         return None
     
+    def plan_batch(self, check_ids: Sequence[int], activities: Sequence[str],
+                   timestamps: Union[Timestamp, Sequence[Timestamp]] = None) -> List[Optional[Dict]]:
+        """
+        Plan the defects of a whole cycle at once
+        
+        Every check draws from its own stream derived from (seed, check_id,
+        timestamp), so the plan is identical across runs, thread schedules and
+        batch sizes. Sampling is vectorized with NumPy when it is installed;
+        both paths give bit-identical plans. The plan is kept, so get_defect
+        returns each planned check's defect instead of drawing a new one.
+        
+        Args:
+            check_ids: Activity check IDs
+            activities: Activity name for each check
+            timestamps: Scheduled time of each check, or one time for all
+                (datetime or epoch seconds; defaults to now)
+        
+        Returns:
+            Defect dict (or None) for each check, in order
+        """
+        
+        if timestamps is None or isinstance(timestamps, (datetime, int, float)):
+            timestamps = [timestamps if timestamps is not None else self.clock.now()] * len(check_ids)
+        if not (len(check_ids) == len(activities) == len(timestamps)):
+            raise ValueError("check_ids, activities and timestamps must have the same length")
+        
+        if not self.enabled:
+            return [None] * len(check_ids)
+        
+        moments = {}  # Checks of a cycle usually share their timestamp
+        for ts in timestamps:
+            if ts not in moments:
+                moments[ts] = ts if isinstance(ts, datetime) else datetime.fromtimestamp(ts)
+        
+        keys = [self._stream_key(check_id, ts) for check_id, ts in zip(check_ids, timestamps)]
+        cells = [self.table.cell(moments[ts].weekday(), moments[ts].hour, check_id)
+                 for check_id, ts in zip(check_ids, timestamps)]
+        types, params = self._sample(keys, cells)
+        
+        defect_types = self.table.types
+        plan = []
+        for check_id, name, ts, index, param in zip(check_ids, activities, timestamps, types, params):
+            if index >= len(defect_types) or name in self.table.excluded_names:
+                plan.append(None)
+                continue
+            plan.append(self._create_defect(defect_types[index], check_id, name, "success", param, moments[ts]))
+        
+        with self._lock:
+            self._planned.update(zip(check_ids, plan))
+        return plan
+    
+    def _stream_key(self, check_id: int, timestamp: Timestamp) -> int:
+        """64-bit stream key of one check"""
+        
+        stamp = timestamp.isoformat() if isinstance(timestamp, datetime) else f"{float(timestamp):.6f}"
+        digest = hashlib.blake2b(f"{self.seed}:{check_id}:{stamp}".encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+    
+    def _sample(self, keys: List[int], cells: List[int]):
+        """
+        Draw each check's defect type index and parameter
+        
+        Args:
+            keys: Stream key of each check
+            cells: Eligibility table cell of each check
+        
+        Returns:
+            Tuple of (type indexes, parameter draws in [0, 1)); an index equal
+            to the number of defect types means no defect
+        """
+        
+        distributions = self.table.distributions
+        
+        try:
+            import numpy as np
+        except ImportError:
+            rolls = [_uniform(key, _DRAW_TYPE) * 100 for key in keys]
+            params = [_uniform(key, _DRAW_PARAMETER) for key in keys]
+            return [bisect.bisect_right(distributions[c], roll) for c, roll in zip(cells, rolls)], params
+        
+        key_array = np.array(keys, dtype=np.uint64)
+        rolls = _uniform_array(np, key_array, _DRAW_TYPE) * 100
+        params = _uniform_array(np, key_array, _DRAW_PARAMETER)
+        # Row per distinct distribution; count of cumulative bounds <= roll
+        # equals bisect_right on that check's distribution
+        matrix = np.array(distributions, dtype=np.float64).reshape(len(distributions), len(self.table.types))
+        bounds = matrix[np.array(cells, dtype=np.intp)]
+        indexes = (bounds <= rolls[:, None]).sum(axis=1)
+        return indexes.tolist(), params.tolist()
+    
     def _create_defect(self, defect_type: str, check_id: int, 
-                       activity_name: str, previous_status: str) -> Dict:
-        """Create specific defect details"""
+                       activity_name: str, previous_status: str,
+                       draw: float, now: datetime = None) -> Dict:
+        """
+        Create specific defect details
+        
+        Args:
+            draw: Uniform [0, 1) value for the defect's random parameter
+            now: Time of the check (defaults to now)
+        """
         
         if defect_type == "TIMEOUT":
             return {
@@ -82,7 +242,7 @@ class DefectInjector:
                 "type": "SLOW_RESPONSE",
                 "message": "Response time exceeded threshold (>5s)",
                 "status_code": 200,
-                "response_time": random.uniform(5.5, 12.0),
+                "response_time": 5.5 + 6.5 * draw,
                 "error": None,
                 "is_simulated": True,
                 "severity": 40
@@ -110,7 +270,7 @@ class DefectInjector:
         
         elif defect_type == "FALSE_POSITIVE":
             # On maintenance window (Sunday 22:00-23:59)
-            now = datetime.now()
+            now = now or self.clock.now()
             is_maintenance_window = now.weekday() == 6 and now.hour >= 22
             
             return {
@@ -127,7 +287,7 @@ class DefectInjector:
             return {
                 "type": "ALERT_STORM",
                 "message": "Multiple alerts received in 5 minute window (50+)",
-                "alert_count": random.randint(50, 100),
+                "alert_count": 50 + int(draw * 51),
                 "time_window_seconds": 300,
                 "is_simulated": True,
                 "severity": 85
@@ -137,7 +297,7 @@ class DefectInjector:
     
     def should_suppress_on_maintenance(self) -> bool:
         """Check if currently in maintenance window"""
-        now = datetime.now()
+        now = self.clock.now()
         # Sunday 22:00-23:59
         return now.weekday() == 6 and now.hour >= 22
     
@@ -153,20 +313,46 @@ class DefectInjector:
         }
 
 
+def _uniform(key: int, index: int) -> float:
+    """index-th SplitMix64 output of the stream keyed by key, as a float in [0, 1)"""
+    
+    z = (key + (index + 1) * _GOLDEN) & _MASK64
+    z = ((z ^ (z >> 30)) * _MIX1) & _MASK64
+    z = ((z ^ (z >> 27)) * _MIX2) & _MASK64
+    z ^= z >> 31
+    return (z >> 11) * 2.0 ** -53
+
+
+def _uniform_array(np, keys, index: int):
+    """Vectorized _uniform over a uint64 key array (wrapping arithmetic)"""
+    
+    with np.errstate(over="ignore"):
+        z = keys + np.uint64(((index + 1) * _GOLDEN) & _MASK64)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(_MIX1)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(_MIX2)
+        z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
 class DefectSimulator:
-    """Simulate defects at the HTTP level"""
+    """
+    Simulate defects at the HTTP level
+    
+    Delays go through the given clock: a VirtualClock advances simulated
+    time instead of blocking the thread.
+    """
     
     @staticmethod
-    def simulate_timeout() -> None:
+    def simulate_timeout(clock=None) -> None:
         """Simulate network timeout"""
-        time.sleep(random.uniform(10, 15))
+        (clock or SYSTEM_CLOCK).sleep(random.uniform(10, 15))
         raise TimeoutError("Connection timeout after 10s")
     
     @staticmethod
-    def simulate_slow_response(base_time: float = 0.5) -> float:
+    def simulate_slow_response(base_time: float = 0.5, clock=None) -> float:
         """Add artificial delay to simulate slow response"""
         artificial_delay = random.uniform(5.5, 12.0)
-        time.sleep(artificial_delay - base_time)
+        (clock or SYSTEM_CLOCK).sleep(artificial_delay - base_time)
         return base_time + artificial_delay
     
     @staticmethod
@@ -263,6 +449,41 @@ class DefectConfiguration:
             }
         }
     
+    @staticmethod
+    def from_rules_file(filepath: str = "alert_rules.yaml", base: Dict = None) -> Dict:
+        """
+        Default configuration with the rules file's defect_injection block applied
+        
+        The block's distribution sets each type's weight; its percentage is
+        the overall injection rate the weights are scaled to. Its
+        exclude_days / exclude_hours apply to every defect type and
+        exclude_activities (IDs or names) to every activity.
+        """
+        
+        from utils import ConfigLoader
+        
+        config = copy.deepcopy(base or DefectConfiguration.get_default_config())
+        block = (ConfigLoader.load_yaml(filepath) or {}).get("defect_injection")
+        if not block:
+            return config
+        
+        defects = config.setdefault("defects", {})
+        config["enabled"] = block.get("enabled", config.get("enabled", True))
+        for defect_type, weight in (block.get("distribution") or {}).items():
+            defects.setdefault(defect_type.upper(), {})["percentage"] = weight
+        
+        total = sum(settings.get("percentage", 0) for settings in defects.values())
+        if block.get("percentage") is not None and total:
+            for settings in defects.values():
+                settings["percentage"] = settings.get("percentage", 0) * block["percentage"] / total
+        
+        for key in ("exclude_days", "exclude_hours"):
+            if block.get(key):
+                for settings in defects.values():
+                    settings[key] = sorted(set(settings.get(key, [])) | set(block[key]))
+        config["exclude_activities"] = list(block.get("exclude_activities") or [])
+        return config
+    
     @staticmethod
     def load_from_file(filepath: str) -> Dict:
         """Load configuration from YAML file"""
@@ -273,3 +494,83 @@ class DefectConfiguration:
         except Exception as e:
             print(f"Error loading config: {e}, using defaults")
             return DefectConfiguration.get_default_config()
+
+
+class DefectEligibilityTable:
+    """
+    Defect configuration compiled into a (weekday, hour, activity) lookup
+    
+    Each cell holds the index of a cumulative percentage distribution over
+    every defect type (ineligible types add 0), so picking a check's defect
+    is one table lookup plus a bisect. Identical distributions are shared.
+    """
+    
+    def __init__(self, config: Dict):
+        """
+        Args:
+            config: DefectConfiguration dict (defects with percentage,
+                activity_ids, exclude_days, exclude_hours, only_days,
+                only_hours; optional top-level exclude_activities)
+        """
+        defects = config.get("defects", {})
+        self.types = list(defects)
+        
+        excluded = config.get("exclude_activities", [])
+        excluded_ids = {a for a in excluded if isinstance(a, int)}
+        self.excluded_names = frozenset(a for a in excluded if isinstance(a, str))
+        
+        # Slot 0 is any activity ID outside 1..max_activity
+        ids = [i for settings in defects.values() for i in settings.get("activity_ids") or []]
+        self.max_activity = max(ids + list(excluded_ids) + [7])
+        self._slots = self.max_activity + 1
+        
+        self.distributions: List[tuple] = []
+        interned: Dict[tuple, int] = {}
+        self._cells = array.array("H")
+        for day in range(7):
+            for hour in range(24):
+                for slot in range(self._slots):
+                    activity_id = slot or None
+                    if activity_id in excluded_ids:
+                        weights = [0] * len(self.types)
+                    else:
+                        weights = [settings.get("percentage", 0)
+                                   if self._eligible(settings, day, hour, activity_id) else 0
+                                   for settings in defects.values()]
+                    cumulative = tuple(itertools.accumulate(weights))
+                    if cumulative not in interned:
+                        interned[cumulative] = len(self.distributions)
+                        self.distributions.append(cumulative)
+                    self._cells.append(interned[cumulative])
+    
+    def cell(self, weekday: int, hour: int, activity_id: Optional[int]) -> int:
+        """Distribution index for an activity at a weekday (0=Monday) and hour"""
+        
+        slot = activity_id if isinstance(activity_id, int) and 0 < activity_id <= self.max_activity else 0
+        return self._cells[(weekday * 24 + hour) * self._slots + slot]
+    
+    def lookup(self, weekday: int, hour: int, activity_id: Optional[int]) -> Dict[str, float]:
+        """Eligible defect types and their percentages"""
+        
+        cumulative = self.distributions[self.cell(weekday, hour, activity_id)]
+        previous = 0
+        eligible = {}
+        for defect_type, bound in zip(self.types, cumulative):
+            if bound > previous:
+                eligible[defect_type] = bound - previous
+            previous = bound
+        return eligible
+    
+    @staticmethod
+    def _eligible(settings: Dict, day: int, hour: int, activity_id: Optional[int]) -> bool:
+        """Check activity and day/hour restrictions of a defect entry"""
+        
+        if settings.get("activity_ids") and activity_id not in settings["activity_ids"]:
+            return False
+        if day in settings.get("exclude_days", []) or hour in settings.get("exclude_hours", []):
+            return False
+        if settings.get("only_days") and day not in settings["only_days"]:
+            return False
+        if settings.get("only_hours") and hour not in settings["only_hours"]:
+            return False
+        return True
@@ -0,0 +1,241 @@
+"""
+DNS Cache Module
+In-process DNS cache for the HTTP probe layer
+Respects record TTLs, caches NXDOMAIN answers and serves stale entries while
+refreshing them in the background
+
+Only lookups made inside DNSCache.active() use the cache; everything else in
+the process (chromedriver downloads, notifiers, API clients) keeps the
+system resolver.
+"""
+
+import ipaddress
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+# Errors that mean "this name does not exist" and are safe to cache
+NXDOMAIN_ERRORS = {socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)}
+
+_system_getaddrinfo = socket.getaddrinfo
+_installed_cache = None
+_scope = threading.local()  # Cache the calling thread's lookups go through, if any
+
+
+class DNSCache:
+    """Thread-safe TTL cache in front of getaddrinfo"""
+
+    def __init__(self, default_ttl: float = 300, negative_ttl: float = 30,
+                 stale_ttl: float = 600, min_ttl: float = 5):
+        """
+        Args:
+            default_ttl: TTL used when the record TTL is unknown (seconds)
+            negative_ttl: How long NXDOMAIN answers are cached (seconds)
+            stale_ttl: How long an expired answer may still be served while
+                it is refreshed in the background (seconds)
+            min_ttl: Floor applied to record TTLs (seconds)
+        """
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.min_ttl = min_ttl
+        self.entries: Dict[Tuple, Dict] = {}
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "negative_hits": 0}
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple, threading.Event] = {}
+        self._local = threading.local()
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """Drop-in replacement for socket.getaddrinfo"""
+
+        if not _is_cacheable(host):
+            return _system_getaddrinfo(host, port, family, type, proto, flags)
+
+        key = (host.lower(), port, family, type, proto, flags)
+        started = time.perf_counter()
+        try:
+            return self._lookup(key)
+        finally:
+            self._local.resolve_time = (getattr(self._local, "resolve_time", 0.0)
+                                        + time.perf_counter() - started)
+
+    @contextmanager
+    def active(self):
+        """Route the calling thread's socket.getaddrinfo lookups through this cache"""
+
+        previous = getattr(_scope, "cache", None)
+        _scope.cache = self
+        try:
+            yield self
+        finally:
+            _scope.cache = previous
+
+    def take_resolution_time(self) -> float:
+        """Return DNS time spent by the calling thread since the last call, then reset it"""
+
+        elapsed = getattr(self._local, "resolve_time", 0.0)
+        self._local.resolve_time = 0.0
+        return elapsed
+
+    def clear(self):
+        """Drop all cached entries"""
+
+        with self._lock:
+            self.entries.clear()
+
+    def _lookup(self, key: Tuple) -> List:
+        """Serve key from cache, resolving or refreshing it as needed"""
+
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                entry = self.entries.get(key)
+
+                if entry and now < entry["expires"]:
+                    if entry["error"]:
+                        self.stats["negative_hits"] += 1
+                        raise entry["error"]
+                    self.stats["hits"] += 1
+                    return entry["result"]
+
+                if entry and not entry["error"] and now < entry["expires"] + self.stale_ttl:
+                    # Stale-while-revalidate
+                    self.stats["stale_hits"] += 1
+                    if key not in self._inflight:
+                        self._inflight[key] = threading.Event()
+                        threading.Thread(target=self._refresh, args=(key,), daemon=True).start()
+                    return entry["result"]
+
+                pending = self._inflight.get(key)
+                if pending is None:
+                    self._inflight[key] = threading.Event()
+                    self.stats["misses"] += 1
+                    break
+
+            # Another thread is resolving the same name; wait for its answer
+            pending.wait()
+
+        self._refresh(key)
+
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            # Transient failure that was not cached: resolve uncached to surface the error
+            return _system_getaddrinfo(*key)
+        if entry["error"]:
+            raise entry["error"]
+        return entry["result"]
+
+    def _refresh(self, key: Tuple):
+        """Resolve key and store the answer; wakes up waiting threads"""
+
+        try:
+            result, ttl = _resolve(key, self.default_ttl)
+            entry = {"result": result, "error": None,
+                     "expires": time.monotonic() + max(self.min_ttl, ttl)}
+        except socket.gaierror as e:
+            if e.errno in NXDOMAIN_ERRORS:
+                entry = {"result": None, "error": e,
+                         "expires": time.monotonic() + self.negative_ttl}
+            else:
+                # Temporary resolver failure: keep serving any stale answer
+                entry = None
+        except Exception:
+            entry = None
+
+        with self._lock:
+            if entry is not None:
+                self.entries[key] = entry
+            event = self._inflight.pop(key, None)
+        if event:
+            event.set()
+
+
+def _resolve(key: Tuple, default_ttl: float) -> Tuple[List, float]:
+    """
+    Resolve a cache key, returning (addrinfo list, ttl)
+
+    Uses dnspython when installed so record TTLs are honoured, otherwise falls
+    back to the system resolver with the default TTL.
+    """
+
+    host, port, family, type, proto, flags = key
+
+    try:
+        import dns.resolver
+    except ImportError:
+        return _system_getaddrinfo(host, port, family, type, proto, flags), default_ttl
+
+    records = []
+    ttl = None
+    for rdtype, af in (("A", socket.AF_INET), ("AAAA", socket.AF_INET6)):
+        if family not in (0, socket.AF_UNSPEC, af):
+            continue
+        try:
+            answer = dns.resolver.resolve(host, rdtype)
+        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+            continue
+        except Exception:
+            # Resolver misconfigured or unreachable: let the system try
+            return _system_getaddrinfo(host, port, family, type, proto, flags), default_ttl
+        ttl = answer.rrset.ttl if ttl is None else min(ttl, answer.rrset.ttl)
+        for rdata in answer:
+            sockaddr = (rdata.address, port) if af == socket.AF_INET else (rdata.address, port, 0, 0)
+            records.append((af, type or socket.SOCK_STREAM, proto, "", sockaddr))
+
+    if not records:
+        raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+
+    return records, ttl
+
+
+def _is_cacheable(host) -> bool:
+    """IP literals and localhost go straight to the system resolver"""
+
+    if not host or not isinstance(host, str) or host == "localhost":
+        return False
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return False
+    except ValueError:
+        return True
+
+
+def _scoped_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    """socket.getaddrinfo hook: the active cache of the calling thread, else the system resolver"""
+
+    cache = getattr(_scope, "cache", None)
+    if cache is None:
+        return _system_getaddrinfo(host, port, family, type, proto, flags)
+    return cache.getaddrinfo(host, port, family, type, proto, flags)
+
+
+def install(cache: Optional[DNSCache] = None) -> DNSCache:
+    """
+    Hook socket.getaddrinfo (and thus requests/urllib3) for the probe cache
+
+    The hook only diverts lookups made inside cache.active(), so probes
+    use the cache and the rest of the process does not.
+    """
+
+    global _installed_cache
+    _installed_cache = cache or DNSCache()
+    socket.getaddrinfo = _scoped_getaddrinfo
+    return _installed_cache
+
+
+def uninstall():
+    """Restore the system resolver"""
+
+    global _installed_cache
+    socket.getaddrinfo = _system_getaddrinfo
+    _installed_cache = None
+
+
+def installed_cache() -> Optional[DNSCache]:
+    """Get the cache currently routed through socket.getaddrinfo, if any"""
+
+    return _installed_cache
@@ -0,0 +1,181 @@
+"""
+Engine State Module
+Persists alert engine state between runs: per-activity frequency windows,
+open incidents, activity baselines and known false-positive start times
+
+With the 10-minute schedule, open incidents (INCIDENT_WINDOW spans a cycle),
+baselines and false-positive start times carry over to the next run. Frequency windows cover 5 minutes,
+the unit of the rules' storm and deduplication thresholds, so they only count
+into a run that starts within 5 minutes of the last alert: a re-run or a
+backfill batch.
+
+File layout (little-endian):
+    header   magic, version, window seconds, activity count, trailer length, saved at
+    records  one fixed-size frequency window per activity: head, total, buckets
+    trailer  compact JSON: activity names, open incidents, baselines,
+             false-positive start times
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from alert_engine import FrequencyWindow
+
+
+MAGIC = b"AEST"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxIIQd")
+RECORD_PREFIX = struct.Struct("<qI4x")
+NO_HEAD = -(2 ** 63)
+
+
+class EngineState:
+    """Memory-mapped snapshot of an AlertEngine's cross-run state"""
+
+    def __init__(self, state_file: str = "engine_state.bin"):
+        """
+        Args:
+            state_file: Snapshot file read at startup and replaced at the end of a run
+        """
+        self.state_file = state_file
+
+    @staticmethod
+    def from_env() -> "EngineState":
+        """Build from the ENGINE_STATE_FILE environment variable"""
+
+        return EngineState(os.getenv('ENGINE_STATE_FILE', 'engine_state.bin'))
+
+    def load(self, engine) -> bool:
+        """
+        Restore engine state from the snapshot, if there is one
+
+        Returns:
+            True if a snapshot was loaded
+        """
+
+        path = Path(self.state_file)
+        if not path.exists() or path.stat().st_size < HEADER.size:
+            return False
+
+        # Everything is decoded before the engine is touched: a damaged
+        # snapshot leaves it exactly as it was
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                magic, version, window_seconds, count, trailer_length, _ = HEADER.unpack_from(view, 0)
+                if magic != MAGIC or version != VERSION:
+                    print(f"⚠️  Ignoring engine state {self.state_file}: unknown format")
+                    return False
+
+                record_size = RECORD_PREFIX.size + 4 * window_seconds
+                trailer_offset = HEADER.size + count * record_size
+                trailer = json.loads(view[trailer_offset:trailer_offset + trailer_length])
+
+                windows = {}
+                if window_seconds == FrequencyWindow().window_seconds:
+                    for i, activity in enumerate(trailer["activities"]):
+                        offset = HEADER.size + i * record_size
+                        head, total = RECORD_PREFIX.unpack_from(view, offset)
+                        window = FrequencyWindow(window_seconds)
+                        start = offset + RECORD_PREFIX.size
+                        window.buckets = array("I", view[start:start + 4 * window_seconds])
+                        if sys.byteorder == "big":
+                            window.buckets.byteswap()
+                        window.head = None if head == NO_HEAD else head
+                        window.total = total
+                        windows[activity] = window
+                else:
+                    print(f"⚠️  Engine state window is {window_seconds}s, frequency windows not restored")
+
+            baselines = dict(trailer["baselines"])
+            incidents = self._parse_incidents(trailer["incidents"])
+            false_positive_since = {(activity, pattern): second for activity, pattern, second
+                                    in trailer.get("false_positive_since", [])}
+        except Exception as e:
+            print(f"Error loading engine state: {e}")
+            return False
+
+        engine.assessor.alert_frequency.update(windows)
+        engine.assessor.baselines.update(baselines)
+        self._restore_incidents(engine.incident_correlator, *incidents)
+        engine.rule_engine.false_positive_since.update(false_positive_since)
+        return True
+
+    def save(self, engine):
+        """Atomically replace the snapshot with the engine's current state"""
+
+        windows = engine.assessor.alert_frequency
+        activities = list(windows)
+        window_seconds = FrequencyWindow().window_seconds
+        trailer = json.dumps({
+            "activities": activities,
+            "baselines": engine.assessor.baselines,
+            "incidents": self._dump_incidents(engine.incident_correlator),
+            "false_positive_since": [[activity, pattern, second] for (activity, pattern), second
+                                     in engine.rule_engine.false_positive_since.items()]
+        }, separators=(",", ":")).encode("utf-8")
+
+        tmp_path = self.state_file + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, window_seconds, len(activities), len(trailer), time.time()))
+                for activity in activities:
+                    window = windows[activity]
+                    buckets = window.buckets
+                    if sys.byteorder == "big":
+                        buckets = array("I", buckets)
+                        buckets.byteswap()
+                    head = NO_HEAD if window.head is None else window.head
+                    f.write(RECORD_PREFIX.pack(head, window.total))
+                    f.write(buckets.tobytes())
+                f.write(trailer)
+            os.replace(tmp_path, self.state_file)
+        except Exception as e:
+            print(f"Error saving engine state: {e}")
+
+    @staticmethod
+    def _dump_incidents(correlator) -> Dict:
+        return {
+            "watermark": correlator.watermark.isoformat() if correlator.watermark else None,
+            "open": [dict(incident,
+                          first_seen=incident["first_seen"].isoformat(),
+                          last_seen=incident["last_seen"].isoformat(),
+                          activities=sorted(incident["activities"], key=str),
+                          signals=sorted(incident["signals"]))
+                     for incident in correlator.incidents.values()],
+            "index": [[list(key), incident_id, seen.isoformat()]
+                      for key, (incident_id, seen) in correlator._index.items()]
+        }
+
+    @staticmethod
+    def _parse_incidents(state: Dict) -> Tuple[Optional[datetime], List[Dict], List[Tuple]]:
+        """Watermark, open incidents and match index of a saved correlator"""
+
+        watermark = datetime.fromisoformat(state["watermark"]) if state["watermark"] else None
+        incidents = [dict(incident,
+                          first_seen=datetime.fromisoformat(incident["first_seen"]),
+                          last_seen=datetime.fromisoformat(incident["last_seen"]),
+                          activities=set(incident["activities"]),
+                          signals=set(incident["signals"]))
+                     for incident in state["open"]]
+        index = [(tuple(key), incident_id, datetime.fromisoformat(seen))
+                 for key, incident_id, seen in state["index"]]
+        return watermark, incidents, index
+
+    @staticmethod
+    def _restore_incidents(correlator, watermark: Optional[datetime], incidents: List[Dict],
+                           index: List[Tuple]):
+        if watermark is not None and (correlator.watermark is None or watermark > correlator.watermark):
+            correlator.watermark = watermark
+        for incident in incidents:
+            correlator.restore(incident)
+        for key, incident_id, seen in index:
+            if incident_id in correlator.incidents:
+                correlator._index[key] = (incident_id, seen)
@@ -0,0 +1,254 @@
+"""
+Fault Server Module
+Local HTTP stand-in that reproduces the simulated defects at the network
+layer: real slow responses, black-holed and reset connections, 5xx answers
+and truncated bodies, scheduled by a DefectConfiguration
+
+Usage:
+    python fault_server.py --port 8099 [--config defect_config.yaml] [--time-scale 0.1]
+
+Targets are addressed as http://host:port/activity/<activity_id>; the
+crawler benchmark's /target/<n> paths cycle through the seven activities
+"""
+
+import argparse
+import bisect
+import random
+import re
+import socket
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from defect_injector import DefectConfiguration, DefectEligibilityTable, DefectSimulator
+from sim_clock import SYSTEM_CLOCK
+
+
+# Network behaviours
+OK = "ok"
+SLOW = "slow"                  # Real delay before a 200
+BLACK_HOLE = "black_hole"      # Accept, read the request, never answer
+RESET = "reset"                # Close with a TCP RST
+HTTP_ERROR = "http_error"      # 5xx from DefectSimulator.get_mock_error_response
+PARTIAL_BODY = "partial_body"  # Declared length not delivered
+
+# Defect type -> network behaviour (a defect entry may override with `fault:`)
+DEFAULT_FAULTS = {
+    "TIMEOUT": BLACK_HOLE,
+    "SLOW_RESPONSE": SLOW,
+    "CONNECTION_ERROR": RESET,
+    "FALSE_POSITIVE": HTTP_ERROR,   # Reported as 503 during maintenance
+    "ALERT_STORM": HTTP_ERROR,
+    "DUPLICATE_ALERT": PARTIAL_BODY
+}
+
+ACTIVITY_PATH = re.compile(r"^/activity/(\d+)")
+TARGET_PATH = re.compile(r"^/target/(\d+)")
+ACTIVITY_COUNT = 7
+
+
+class FaultSchedule:
+    """Picks the fault for a request from a DefectConfiguration dict"""
+
+    def __init__(self, config: Dict = None, seed: int = None, clock=None):
+        """
+        Args:
+            config: DefectConfiguration-style dict (enabled + defects)
+            seed: Random seed for reproducible schedules
+            clock: Time source for day/hour windows (SystemClock by default)
+        """
+        self.config = config or DefectConfiguration.get_default_config()
+        self.enabled = self.config.get("enabled", True)
+        self.defects = self.config.get("defects", {})
+        self.table = DefectEligibilityTable(self.config)
+        self.clock = clock or SYSTEM_CLOCK
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def pick(self, activity_id: Optional[int]) -> Dict:
+        """
+        Choose the fault for one request to an activity's target
+
+        Returns:
+            Dict with defect type (None for a normal response), fault and its settings
+        """
+
+        if not self.enabled:
+            return {"defect": None, "fault": OK, "settings": {}}
+
+        now = self.clock.now()
+        with self._lock:
+            roll = self._rng.random() * 100
+
+        cumulative = self.table.distributions[self.table.cell(now.weekday(), now.hour, activity_id)]
+        index = bisect.bisect_right(cumulative, roll)
+        if index < len(self.table.types):
+            defect_type = self.table.types[index]
+            settings = self.defects[defect_type]
+            fault = settings.get("fault", DEFAULT_FAULTS.get(defect_type, HTTP_ERROR))
+            return {"defect": defect_type, "fault": fault, "settings": settings}
+
+        return {"defect": None, "fault": OK, "settings": {}}
+
+    def random(self) -> random.Random:
+        """Shared RNG for fault parameters (delays, error codes)"""
+
+        return self._rng
+
+
+class FaultServer:
+    """Threaded HTTP server answering each request according to a FaultSchedule"""
+
+    def __init__(self, schedule: FaultSchedule = None, host: str = "127.0.0.1", port: int = 0,
+                 time_scale: float = 1.0, black_hole_seconds: float = 30,
+                 body_bytes: int = 4096):
+        """
+        Args:
+            schedule: FaultSchedule deciding the faults
+            host: Bind address
+            port: Bind port (0 = any free port)
+            time_scale: Multiplier for every delay (e.g. 0.01 for fast tests)
+            black_hole_seconds: How long a black-holed connection is held
+            body_bytes: Size of normal response bodies
+        """
+        self.schedule = schedule or FaultSchedule()
+        self.time_scale = time_scale
+        self.black_hole_seconds = black_hole_seconds
+        self.body_bytes = body_bytes
+        self.stats: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._server = _Server((host, port), self._handler())
+        self._thread = None
+
+    @staticmethod
+    def from_config(filepath: str = None, **kwargs) -> "FaultServer":
+        """Build a server scheduled by a defect config file (defaults if omitted)"""
+
+        config = DefectConfiguration.load_from_file(filepath) if filepath else None
+        seed = kwargs.pop("seed", None)
+        return FaultServer(FaultSchedule(config, seed=seed), **kwargs)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, activity_id: int) -> str:
+        return f"{self.base_url}/activity/{activity_id}"
+
+    def start(self) -> "FaultServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()  # Releases black-holed connections
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, fault: str):
+        with self._lock:
+            self.stats[fault] = self.stats.get(fault, 0) + 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                plan = server.schedule.pick(self._activity_id())
+                fault = plan["fault"]
+                server._count(fault)
+                rng = server.schedule.random()
+
+                if fault == BLACK_HOLE:
+                    server._stopping.wait(server.black_hole_seconds * server.time_scale)
+                    self.close_connection = True
+                elif fault == RESET:
+                    # SO_LINGER with zero timeout turns close() into a RST
+                    self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                    self.connection.close()
+                    self.close_connection = True
+                elif fault == HTTP_ERROR:
+                    code = str(plan["settings"].get("status_code") or
+                               ("503" if plan["defect"] == "FALSE_POSITIVE" else rng.choice(["500", "502", "504"])))
+                    mock = DefectSimulator.get_mock_error_response(code)
+                    self._respond(mock["status_code"], mock["text"].encode("utf-8"), mock["reason"])
+                elif fault == PARTIAL_BODY:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html")
+                    self.send_header("Content-Length", str(server.body_bytes))
+                    self.end_headers()
+                    self.wfile.write(self._body(server.body_bytes // 2))
+                    self.wfile.flush()
+                    self.close_connection = True
+                else:
+                    if fault == SLOW:
+                        # Same range as DefectSimulator.simulate_slow_response
+                        low = max(plan["settings"].get("threshold_ms", 5000) / 1000 + 0.5, 0)
+                        time.sleep(rng.uniform(low, max(low, 12.0)) * server.time_scale)
+                    self._respond(200, self._body(server.body_bytes))
+
+            def _activity_id(self) -> Optional[int]:
+                parts = urlsplit(self.path)
+                match = ACTIVITY_PATH.match(parts.path)
+                if match:
+                    return int(match.group(1))
+                match = TARGET_PATH.match(parts.path)
+                if match:
+                    return (int(match.group(1)) - 1) % ACTIVITY_COUNT + 1
+                values = parse_qs(parts.query).get("activity")
+                return int(values[0]) if values and values[0].isdigit() else None
+
+            @staticmethod
+            def _body(size: int) -> bytes:
+                return b"<html><body>fault server</body></html>".ljust(size, b" ")[:size]
+
+            def _respond(self, status, body, reason=None):
+                self.send_response(status, reason)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def main():
+    """Command line entry point"""
+
+    parser = argparse.ArgumentParser(description="Serve targets that fail like the simulated defects")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--config", help="Defect configuration YAML (defaults to DefectConfiguration)")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiplier for delays")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = FaultServer.from_config(args.config, host=args.host, port=args.port,
+                                     time_scale=args.time_scale, seed=args.seed).start()
+    print(f"💥 Fault server listening on {server.base_url}/activity/<id>")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"  ├─ Faults served: {server.stats}")
+    except KeyboardInterrupt:
+        server.stop()
+        print(f"  └─ Stopped. Faults served: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ import json
 import os
 from datetime import datetime
 from alert_engine import AlertEngine
+from engine_state import EngineState
 from database import AlertDatabase
 from utils import Logger, DataProcessor
 
@@ -19,18 +20,32 @@ def main():
     logger.info("🔄 Starting Alert Engine Processing")
     logger.info("=" * 60)
     
-    # Load raw alerts
-    if not os.path.exists("raw_alerts.json"):
+    # Load raw alerts (fall back to the streaming journal if the cycle crashed)
+    if os.path.exists("raw_alerts.json"):
+        with open("raw_alerts.json", "r") as f:
+            raw_alerts = json.load(f)
+    elif os.path.exists("raw_alerts.jsonl"):
+        logger.warning("raw_alerts.json not found, recovering from raw_alerts.jsonl journal")
+        raw_alerts = []
+        with open("raw_alerts.jsonl", "r") as f:
+            for line in f:
+                try:
+                    raw_alerts.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass  # Partially written last line
+    else:
         logger.error("raw_alerts.json not found. Run health check first.")
         return
     
-    with open("raw_alerts.json", "r") as f:
-        raw_alerts = json.load(f)
-    
     logger.info(f"📥 Loaded {len(raw_alerts)} raw alerts")
     
-    # Initialize engine
+    # Initialize engine; open incidents and baselines carry over from the
+    # previous run (frequency windows only into a run within 5 minutes)
     engine = AlertEngine()
+    engine_state = EngineState.from_env()
+    if engine_state.load(engine):
+        logger.info(f"🧠 Engine state restored from {engine_state.state_file} "
+                    f"({len(engine.incident_correlator.incidents)} open incidents)")
     db = AlertDatabase()
     
     # Process alerts
@@ -52,6 +67,13 @@ def main():
             logger.info(f"  ├─ Group {group['group_id']}: {group['count']} alerts")
             logger.info(f"  │   └─ Root Cause: {group['root_cause']}")
     
+    # Log incident lifecycle
+    opened = [e for e in results['incident_events'] if e['event'] == 'opened']
+    closed = [e for e in results['incident_events'] if e['event'] == 'closed']
+    if opened or closed:
+        logger.info(f"🧯 Incidents: {len(opened)} opened, {len(closed)} closed, "
+                    f"{len(engine.incident_correlator.incidents)} open")
+    
     # Categorize and display alerts
     logger.info(f"\n📊 Actionable Alerts ({len(results['actionable_alerts'])}):")
     for alert in results['actionable_alerts'][:5]:  # Show first 5
@@ -84,6 +106,9 @@ def main():
     
     logger.info(f"  ├─ Actionable alerts: ✓ ({len(actionable_alerts)} tickets to create)")
     
+    engine_state.save(engine)
+    logger.info(f"  ├─ Engine state: ✓ ({engine_state.state_file})")
+    
     # Statistics
     logger.info(f"\n📈 Engine Statistics:")
     stats = engine.get_statistics()
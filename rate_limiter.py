@@ -0,0 +1,139 @@
+"""
+Rate Limiter Module
+Per-domain token buckets shared by HTTP probes and Selenium navigation
+Keeps outbound traffic to each bank/regulator domain under a configured rate
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from utils import ConfigLoader
+
+
+class TokenBucket:
+    """Thread-safe token bucket with burst capacity"""
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate: Tokens added per second
+            burst: Maximum number of tokens held
+        """
+        _check_rate(rate, "token bucket")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> Tuple[bool, float]:
+        """
+        Take one token, sleeping until it is available
+
+        Tokens are reserved before sleeping, so concurrent callers queue up
+        fairly instead of racing for the next refill.
+
+        Args:
+            timeout: Give up if the wait would exceed this many seconds
+
+        Returns:
+            Tuple of (acquired, seconds waited)
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if timeout is not None and wait > timeout:
+                return False, 0.0
+            self.tokens -= 1
+
+        if wait > 0:
+            time.sleep(wait)
+        return True, wait
+
+
+class DomainRateLimiter:
+    """Registry of token buckets keyed by domain"""
+
+    def __init__(self, default_rate: float = 2.0, default_burst: int = 4,
+                 domain_limits: Dict[str, Dict] = None):
+        """
+        Args:
+            default_rate: Requests per second for domains without a limit
+            default_burst: Burst size for domains without a limit
+            domain_limits: {domain: {"rate": float, "burst": int}}; a domain
+                also covers its subdomains (rbi.org.in covers www.rbi.org.in)
+        """
+        # Checked up front: a bad limit must fail the run, not each probe to the domain
+        _check_rate(default_rate, "default")
+        for domain, limits in (domain_limits or {}).items():
+            if "rate" in limits:
+                _check_rate(limits["rate"], domain)
+
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.domain_limits = {
+            domain.lower(): limits for domain, limits in (domain_limits or {}).items()
+        }
+        self.buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def from_config(filepath: str = "alert_rules.yaml") -> "DomainRateLimiter":
+        """Build limiter from the rate_limits block of the rules file"""
+
+        config = (ConfigLoader.load_yaml(filepath) or {}).get("rate_limits", {})
+        default = config.get("default", {})
+
+        return DomainRateLimiter(
+            default_rate=default.get("rate", 2.0),
+            default_burst=default.get("burst", 4),
+            domain_limits=config.get("domains", {})
+        )
+
+    def acquire(self, url: str, timeout: Optional[float] = None) -> Tuple[bool, float]:
+        """
+        Wait for permission to send a request to this URL's domain
+
+        Returns:
+            Tuple of (acquired, seconds waited)
+        """
+
+        return self._bucket_for(url).acquire(timeout)
+
+    def _bucket_for(self, url: str) -> TokenBucket:
+        """Get or create the bucket that governs this URL"""
+
+        key, rate, burst = self._limits_for((urlsplit(url).hostname or url).lower())
+
+        with self._lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = TokenBucket(rate, burst)
+            return bucket
+
+    def _limits_for(self, host: str) -> Tuple[str, float, int]:
+        """Resolve the most specific configured domain for a host"""
+
+        labels = host.split(".")
+        for i in range(len(labels)):
+            domain = ".".join(labels[i:])
+            limits = self.domain_limits.get(domain)
+            if limits:
+                return (domain,
+                        limits.get("rate", self.default_rate),
+                        limits.get("burst", self.default_burst))
+
+        return host, self.default_rate, self.default_burst
+
+
+def _check_rate(rate, name: str):
+    """Reject rates a token bucket cannot refill at"""
+
+    if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not rate > 0:
+        raise ValueError(f"Invalid rate limit {rate!r} for {name}, expected requests per second > 0")
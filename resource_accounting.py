@@ -0,0 +1,157 @@
+"""
+Resource Accounting Module
+Measures what a check costs: CPU time, peak RSS and process count of the
+browser process tree (sampled from /proc), plus bytes the browser transferred
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+
+PROC_ROOT = "/proc"
+
+# Sum of transfer sizes for every resource the page loaded (including the document)
+TRANSFER_BYTES_SCRIPT = """
+return performance.getEntriesByType('navigation')
+    .concat(performance.getEntriesByType('resource'))
+    .reduce(function(total, entry) { return total + (entry.transferSize || 0); }, 0);
+"""
+
+
+class ProcessTreeSampler:
+    """Background sampler for a process and all its descendants"""
+
+    def __init__(self, root_pid: int, interval: float = 0.25):
+        """
+        Args:
+            root_pid: Root of the tree (e.g. chromedriver, whose children are Chrome)
+            interval: Seconds between samples
+        """
+        self.root_pid = root_pid
+        self.interval = interval
+        self.cpu_time = 0.0
+        self.peak_rss = 0
+        self.peak_processes = 0
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        """True where /proc can be read (Linux)"""
+
+        return os.path.exists(os.path.join(PROC_ROOT, "self", "stat"))
+
+    @staticmethod
+    def for_driver(driver, interval: float = 0.25) -> Optional["ProcessTreeSampler"]:
+        """Start a sampler on a Selenium driver's chromedriver process, if possible"""
+
+        try:
+            pid = driver.service.process.pid
+        except AttributeError:
+            return None
+        if not ProcessTreeSampler.available():
+            return None
+        return ProcessTreeSampler(pid, interval).start()
+
+    def start(self) -> "ProcessTreeSampler":
+        self.sample()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Dict:
+        """Take a final sample, stop sampling and return the usage"""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sample()
+        return self.usage()
+
+    def usage(self) -> Dict:
+        with self._lock:
+            return {
+                "cpu_time": round(self.cpu_time, 3),
+                "peak_rss_mb": round(self.peak_rss / (1024 * 1024), 1),
+                "child_processes": max(0, self.peak_processes - 1)
+            }
+
+    def sample(self):
+        """Record one snapshot of the tree"""
+
+        tree = read_process_tree(self.root_pid)
+        if not tree:
+            return
+
+        # utime+stime+cutime+cstime only grows (reaped children fold into their
+        # parent), so the largest total seen is the tree's CPU time so far
+        cpu = sum(stats[0] for stats in tree.values())
+        rss = sum(stats[1] for stats in tree.values())
+        with self._lock:
+            self.cpu_time = max(self.cpu_time, cpu)
+            self.peak_rss = max(self.peak_rss, rss)
+            self.peak_processes = max(self.peak_processes, len(tree))
+            self.samples += 1
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+
+def read_process_tree(root_pid: int) -> Dict[int, Tuple[float, int]]:
+    """
+    CPU seconds and RSS bytes of a process and its descendants
+
+    Returns:
+        Dict of pid -> (cpu seconds incl. reaped children, rss bytes); empty if
+        the root is gone or /proc is unavailable
+    """
+
+    ticks = os.sysconf("SC_CLK_TCK")
+    page_size = os.sysconf("SC_PAGE_SIZE")
+
+    stats = {}
+    children = {}
+    try:
+        entries = os.listdir(PROC_ROOT)
+    except OSError:
+        return {}
+
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(os.path.join(PROC_ROOT, entry, "stat"), "rb") as f:
+                raw = f.read().decode("ascii", errors="replace")
+        except OSError:
+            continue  # Process exited while scanning
+
+        # The command name may contain spaces or parentheses; fields resume after the last ')'
+        fields = raw[raw.rfind(")") + 2:].split()
+        pid, ppid = int(entry), int(fields[1])
+        cpu = sum(int(value) for value in fields[11:15]) / ticks
+        stats[pid] = (cpu, int(fields[21]) * page_size)
+        children.setdefault(ppid, []).append(pid)
+
+    if root_pid not in stats:
+        return {}
+
+    tree = {}
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        tree[pid] = stats[pid]
+        pending.extend(children.get(pid, []))
+    return tree
+
+
+def browser_transfer_bytes(driver) -> int:
+    """Bytes transferred by the page in the driver's current tab (0 if unknown)"""
+
+    try:
+        return int(driver.execute_script(TRANSFER_BYTES_SCRIPT) or 0)
+    except Exception:
+        return 0
@@ -0,0 +1,268 @@
+"""
+Result Sink Module
+Streams completed check results from worker threads to consumers
+Results are persisted as soon as each check finishes; when consumers fall
+behind, pending results spill to disk instead of growing memory
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class ResultSink:
+    """Thread-safe queue delivering check results to consumers in order"""
+
+    def __init__(self, consumers: List = None, max_in_memory: int = 1000,
+                 spill_file: str = "check_results.spill.jsonl"):
+        """
+        Args:
+            consumers: Objects with consume(record) and close() methods
+            max_in_memory: Pending results kept in memory before spilling
+            spill_file: JSONL file holding spilled results
+        """
+        self.consumers = consumers or []
+        self.max_in_memory = max(1, max_in_memory)
+        self.spill_file = spill_file
+        self.spilled = 0
+        self._memory = deque()
+        self._spill_writer = None
+        self._spill_reader = None
+        self._spill_pending = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+
+    def put(self, alert_event: Dict, report_row: List = None):
+        """Publish a completed check (called from worker threads)"""
+
+        record = {"alert": alert_event, "report_row": report_row}
+
+        with self._cond:
+            if self._spill_pending or len(self._memory) >= self.max_in_memory:
+                # Keep FIFO order: once spilling, everything goes to disk until drained
+                if self._spill_writer is None:
+                    self._spill_writer = open(self.spill_file, 'w')
+                    self._spill_reader = open(self.spill_file, 'r')
+                self._spill_writer.write(json.dumps(record, default=str) + "\n")
+                self._spill_writer.flush()
+                self._spill_pending += 1
+                self.spilled += 1
+            else:
+                self._memory.append(record)
+            self._cond.notify()
+
+    def close(self):
+        """Deliver all pending results, then close consumers"""
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._dispatcher.join()
+
+        for consumer in self.consumers:
+            try:
+                consumer.close()
+            except Exception as e:
+                print(f"✗ Error closing {type(consumer).__name__}: {e}")
+
+        if self._spill_writer is not None:
+            self._spill_writer.close()
+            self._spill_reader.close()
+            os.remove(self.spill_file)
+
+    def _next_record(self) -> Optional[Dict]:
+        """Pop the oldest pending record, or None once closed and drained"""
+
+        with self._cond:
+            while True:
+                if self._memory:
+                    return self._memory.popleft()
+                if self._spill_pending:
+                    self._spill_pending -= 1
+                    return json.loads(self._spill_reader.readline())
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def _dispatch_loop(self):
+        """Hand each record to every consumer"""
+
+        while True:
+            record = self._next_record()
+            if record is None:
+                return
+
+            for consumer in self.consumers:
+                try:
+                    consumer.consume(record)
+                except Exception as e:
+                    print(f"✗ {type(consumer).__name__} failed: {e}")
+
+
+class DatabaseWriter:
+    """Store each alert in the AlertDatabase as it arrives"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def consume(self, record: Dict):
+        self.db.add_alert(record["alert"])
+
+    def close(self):
+        pass
+
+
+class RawAlertFileWriter:
+    """Append alerts to a JSONL journal; write the JSON array on close"""
+
+    def __init__(self, filepath: str = "raw_alerts.json",
+                 journal_path: str = "raw_alerts.jsonl"):
+        self.filepath = filepath
+        self.journal_path = journal_path
+        self.count = 0
+        self._journal = open(journal_path, 'w')
+
+    def consume(self, record: Dict):
+        self._journal.write(json.dumps(record["alert"], default=str) + "\n")
+        self._journal.flush()
+        self.count += 1
+
+    def close(self):
+        """Convert the journal into raw_alerts.json without loading it all at once"""
+
+        self._journal.close()
+
+        tmp_path = self.filepath + ".tmp"
+        with open(self.journal_path, 'r') as journal, open(tmp_path, 'w') as f:
+            f.write("[")
+            for i, line in enumerate(journal):
+                if i:
+                    f.write(",")
+                f.write("\n  " + line.rstrip("\n"))
+            f.write("\n]\n")
+        os.replace(tmp_path, self.filepath)
+
+
+class ExcelRowWriter:
+    """Append report rows to the Excel report, saving periodically"""
+
+    HEADER = ["Site Name", "Response Code", "Status", "Reason"]
+
+    def __init__(self, filepath: str = "link_check_report.xlsx", save_every: int = 10):
+        from openpyxl import Workbook
+
+        self.filepath = filepath
+        self.save_every = max(1, save_every)
+        self.rows = 0
+        self.wb = Workbook()
+        self.ws = self.wb.active
+        self.ws.title = "Link Check Report"
+        self.ws.append(self.HEADER)
+
+    def consume(self, record: Dict):
+        if record.get("report_row") is None:
+            return
+        self.ws.append(record["report_row"])
+        self.rows += 1
+        if self.rows % self.save_every == 0:
+            self._save()
+
+    def close(self):
+        self._save()
+
+    def _save(self):
+        try:
+            self.wb.save(self.filepath)
+        except PermissionError:
+            root, ext = os.path.splitext(self.filepath)
+            self.filepath = f"{root}_new{ext}"
+            self.wb.save(self.filepath)
+
+
+class LiveEngineFeed:
+    """Run each alert through an AlertEngine as soon as it arrives"""
+
+    def __init__(self, engine, engine_state=None, verbose: bool = True):
+        """
+        Args:
+            engine: AlertEngine that previews verdicts during the cycle
+            engine_state: EngineState snapshot to start from, so the preview
+                agrees with process_alerts.py, which resumes from the same
+                snapshot. The feed only reads it: process_alerts.py owns saving
+            verbose: Print each actionable alert as it is found
+        """
+        self.engine = engine
+        self.verbose = verbose
+        self.ticket_candidates = 0
+        if engine_state is not None:
+            engine_state.load(engine)
+
+    def consume(self, record: Dict):
+        results = self.engine.process_alerts([record["alert"]])
+        for processed in results["actionable_alerts"]:
+            if processed["should_create_ticket"]:
+                self.ticket_candidates += 1
+                if self.verbose:
+                    alert = processed["alert"]
+                    print(f"  ⚡ Live: {alert['activity_name']} actionable (Score: {processed['score']})")
+
+    def close(self):
+        pass
+
+
+class CycleStats:
+    """Running counters for the cycle summary"""
+
+    def __init__(self):
+        self.total = 0
+        self.by_status: Dict[str, int] = {}
+        self.simulated = 0
+        self.dns_time_total = 0.0
+        self.dns_samples = 0
+        self.by_activity: Dict[str, Dict] = {}
+
+    def consume(self, record: Dict):
+        alert = record["alert"]
+        self.total += 1
+        status = alert.get("status", "unknown")
+        self.by_status[status] = self.by_status.get(status, 0) + 1
+        if alert.get("is_simulated", False):
+            self.simulated += 1
+        if alert.get("dns_time") is not None:
+            self.dns_time_total += alert["dns_time"]
+            self.dns_samples += 1
+        if alert.get("cpu_time") is not None:
+            usage = self.by_activity.setdefault(alert.get("activity_name", "Unknown"), {
+                "checks": 0, "cpu_time": 0.0, "peak_rss_mb": 0.0, "child_processes": 0, "network_bytes": 0
+            })
+            usage["checks"] += 1
+            usage["cpu_time"] += alert["cpu_time"]
+            usage["peak_rss_mb"] = max(usage["peak_rss_mb"], alert.get("peak_rss_mb", 0))
+            usage["child_processes"] = max(usage["child_processes"], alert.get("child_processes", 0))
+            usage["network_bytes"] += alert.get("network_bytes", 0)
+
+    @property
+    def avg_dns_time(self) -> float:
+        return self.dns_time_total / self.dns_samples if self.dns_samples else 0
+
+    @property
+    def resource_usage(self) -> Dict:
+        """Cycle totals and per-activity usage of the browser process trees"""
+
+        activities = self.by_activity.values()
+        checks = sum(a["checks"] for a in activities)
+        return {
+            "checks_measured": checks,
+            "cpu_time_total": round(sum(a["cpu_time"] for a in activities), 3),
+            "cpu_time_avg": round(sum(a["cpu_time"] for a in activities) / checks, 3) if checks else 0,
+            "peak_rss_mb_max": max((a["peak_rss_mb"] for a in activities), default=0),
+            "network_bytes_total": sum(a["network_bytes"] for a in activities),
+            "by_activity": self.by_activity
+        }
+
+    def close(self):
+        pass
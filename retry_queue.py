@@ -0,0 +1,196 @@
+"""
+Retry Queue Module
+Confirms failed link probes through a delayed retry queue before they are alerted
+Transient failures that recover on a retry are reported as successes
+"""
+
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Optional, Tuple
+
+
+ProbeResult = Tuple[Optional[int], str]
+
+
+class RetryPolicy:
+    """Backoff and hedging settings for failure confirmation"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0,
+                 max_delay: float = 8.0, jitter: float = 0.5,
+                 hedge_after: Optional[float] = None):
+        """
+        Args:
+            max_attempts: Total probes per URL, including the original one
+            base_delay: Delay before the first retry (seconds)
+            max_delay: Upper bound for the exponential backoff (seconds)
+            jitter: Relative jitter applied to each delay (0.5 = +/-50%)
+            hedge_after: Send a second, hedged probe if a retry is still
+                running after this many seconds (None disables hedging)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.hedge_after = hedge_after
+
+    def delay_for(self, attempt: int, rng: random.Random) -> float:
+        """Jittered exponential backoff before the given attempt (2 = first retry)"""
+
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 2)))
+        return max(0.0, delay * (1 + rng.uniform(-self.jitter, self.jitter)))
+
+    @staticmethod
+    def from_env() -> "RetryPolicy":
+        """Build policy from PROBE_* environment variables"""
+
+        hedge_after = os.getenv('PROBE_HEDGE_AFTER')
+        return RetryPolicy(
+            max_attempts=int(os.getenv('PROBE_MAX_ATTEMPTS', '3')),
+            base_delay=float(os.getenv('PROBE_RETRY_DELAY', '1.0')),
+            max_delay=float(os.getenv('PROBE_RETRY_MAX_DELAY', '8.0')),
+            hedge_after=float(hedge_after) if hedge_after else None
+        )
+
+
+class RetryQueue:
+    """Delayed retry queue shared by all check threads of a cycle"""
+
+    def __init__(self, probe: Callable[[str], ProbeResult],
+                 policy: RetryPolicy = None, workers: int = 4,
+                 seed: int = None):
+        """
+        Args:
+            probe: Function returning (status_code, reason) for a URL,
+                e.g. check_link
+            policy: RetryPolicy to apply
+            workers: Number of threads draining the queue
+            seed: Seed for the backoff jitter
+        """
+        self.probe = probe
+        self.policy = policy or RetryPolicy()
+        self._rng = random.Random(seed)
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._hedge_pool = ThreadPoolExecutor(max_workers=workers * 2) \
+            if self.policy.hedge_after is not None else None
+        self._workers = [
+            threading.Thread(target=self._worker_loop, daemon=True)
+            for _ in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def confirm(self, url: str, status_code: Optional[int], reason: str,
+                assertions=None) -> Tuple[Optional[int], str, int]:
+        """
+        Confirm a probe result, retrying failures with backoff
+
+        Blocks until the failure is confirmed or a retry succeeds.
+
+        Args:
+            url: Probed URL
+            status_code: Status code of the first probe
+            reason: Reason of the first probe
+            assertions: Content assertions the first probe checked; retries
+                check them too, so a recovered status with a broken body is
+                still reported as a content violation
+
+        Returns:
+            Tuple of (status_code, reason, attempts)
+        """
+
+        if _is_success(status_code) or self.policy.max_attempts <= 1:
+            return status_code, reason, 1
+
+        future = Future()
+        self._schedule({"url": url, "attempt": 2, "future": future, "assertions": assertions})
+        return future.result()
+
+    def close(self):
+        """Stop worker threads once all pending retries are drained"""
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        for worker in self._workers:
+            worker.join()
+
+        if self._hedge_pool:
+            self._hedge_pool.shutdown(wait=False)
+
+    def _schedule(self, job: Dict):
+        """Push job onto the delay heap"""
+
+        with self._cond:
+            due = time.monotonic() + self.policy.delay_for(job["attempt"], self._rng)
+            heapq.heappush(self._heap, (due, next(self._seq), job))
+            self._cond.notify()
+
+    def _worker_loop(self):
+        """Pop due jobs and probe them again"""
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._heap:
+                        wait_time = self._heap[0][0] - time.monotonic()
+                        if wait_time <= 0:
+                            break
+                        self._cond.wait(wait_time)
+                    elif self._closed:
+                        return
+                    else:
+                        self._cond.wait()
+                _, _, job = heapq.heappop(self._heap)
+
+            status_code, reason = self._attempt(job["url"], job["assertions"])
+
+            if _is_success(status_code) or job["attempt"] >= self.policy.max_attempts:
+                job["future"].set_result((status_code, reason, job["attempt"]))
+            else:
+                job["attempt"] += 1
+                self._schedule(job)
+
+    def _attempt(self, url: str, assertions=None) -> ProbeResult:
+        """Run a single retry, hedging it if it is slow"""
+
+        if self._hedge_pool is None:
+            return self._safe_probe(url, assertions)
+
+        pending = {self._hedge_pool.submit(self._safe_probe, url, assertions)}
+        done, pending = wait(pending, timeout=self.policy.hedge_after)
+        if not done:
+            pending.add(self._hedge_pool.submit(self._safe_probe, url, assertions))
+
+        # First success wins, otherwise report the last failure
+        result = None
+        while True:
+            for future in done:
+                result = future.result()
+                if _is_success(result[0]):
+                    return result
+            if not pending:
+                return result
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+    def _safe_probe(self, url: str, assertions=None) -> ProbeResult:
+        """Probe URL, turning unexpected exceptions into a failed result"""
+
+        try:
+            if assertions is not None:
+                return self.probe(url, assertions=assertions)
+            return self.probe(url)
+        except Exception as e:
+            return None, str(e)
+
+
+def _is_success(status_code: Optional[int]) -> bool:
+    return status_code == 200
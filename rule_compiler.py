@@ -0,0 +1,229 @@
+"""
+Rule Compiler Module
+Compiles alert_rules.yaml once into an indexed rule set: rules by activity
+name with a URL-pattern fallback, precompiled regexes, condition predicates
+and per-hour lookup tables for false-positive and maintenance windows, so
+RuleEngine and ActionabilityScorer evaluate an alert with a few lookups
+"""
+
+import operator
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils import ConfigLoader
+
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne
+}
+
+# Alert field each condition reads, with a conversion to the rule's unit
+CONDITION_FIELDS = {
+    "response_time_threshold": lambda alert: (alert.get("response_time") or 0) * 1000,  # seconds -> ms
+    "status_code": lambda alert: alert.get("response_code")
+}
+
+# "exists" conditions: the error message mentions the failure
+EXISTS_KEYWORDS = {
+    "connection_timeout": ("timeout",),
+    "connection_error": ("connection", "refused")
+}
+
+CATCH_ALL_PATTERNS = {".*", ".+", ""}
+
+_cache: Dict[Tuple[str, float], "CompiledRules"] = {}
+
+
+class CompiledRule:
+    """One activity's rule, ready to evaluate"""
+
+    def __init__(self, rule: Dict):
+        self.id = rule.get("id")
+        self.activity_name = rule.get("activity_name")
+        self.url_pattern = rule.get("url_pattern") or ".*"
+        self.conditions = [c for c in (_compile_condition(c) for c in rule.get("conditions", [])) if c]
+
+        # (weekday, hour) -> (reason, suppress); the first window listed wins
+        self.false_positive_windows: Dict[Tuple[int, int], Tuple[str, bool]] = {}
+        for window in rule.get("false_positives", []):
+            for day in window.get("days", range(7)):
+                for hour in window.get("hours", range(24)):
+                    self.false_positive_windows.setdefault(
+                        (day, hour), (window.get("reason", "False positive window"), bool(window.get("suppress")))
+                    )
+
+        # Escalation band for every integer score 0-100
+        bands = [_compile_band(band) for band in rule.get("escalation", [])]
+        self.escalation: Tuple[Optional[Dict], ...] = tuple(
+            next(({"action": band["action"], "notify": band["notify"]}
+                  for band in bands if band["matches"](score)), None)
+            for score in range(101)
+        )
+
+        threshold = rule.get("frequency_threshold")
+        self.max_alerts_5_min = None
+        if threshold and threshold.get("action", "deduplicate").startswith("deduplicate"):
+            if threshold.get("window_minutes", 5) == 5:
+                self.max_alerts_5_min = threshold.get("max_alerts")
+            else:
+                print(f"⚠️  {self.id}: only 5-minute frequency thresholds are supported, ignoring")
+
+        self.known_false_positives: List[Tuple[re.Pattern, str, Optional[int]]] = []
+
+    def matched_conditions(self, alert: Dict) -> List[Tuple[str, int]]:
+        """Names and severities of the conditions the alert meets"""
+
+        return [(name, severity) for name, predicate, severity in self.conditions if predicate(alert)]
+
+
+class CompiledRules:
+    """Indexed rule set compiled from alert_rules.yaml"""
+
+    def __init__(self, config: Dict = None):
+        config = config or {}
+        self.rules = [CompiledRule(rule) for rule in config.get("rules", [])]
+        self.by_activity: Dict[str, CompiledRule] = {r.activity_name: r for r in self.rules}
+
+        # URL fallback in file order; catch-all patterns only match as a last resort
+        specific = [r for r in self.rules if r.url_pattern not in CATCH_ALL_PATTERNS]
+        self.url_patterns = [(re.compile(r.url_pattern, re.IGNORECASE), r) for r in specific]
+        self.catch_all = next((r for r in self.rules if r.url_pattern in CATCH_ALL_PATTERNS), None)
+        self._by_url: Dict[str, Optional[CompiledRule]] = {}
+        self._critical: Dict[str, bool] = {}
+
+        # URLs of services with a dedicated pattern get the critical-service boost
+        self.critical_url = re.compile("|".join(f"(?:{r.url_pattern})" for r in specific), re.IGNORECASE) \
+            if specific else None
+
+        for entry in config.get("known_false_positives", []):
+            rule = self.by_activity.get(entry.get("activity"))
+            if rule is not None and entry.get("pattern"):
+                rule.known_false_positives.append((
+                    re.compile(entry["pattern"], re.IGNORECASE),
+                    entry.get("reason", "Known false positive"),
+                    entry.get("exclude_after_minutes")
+                ))
+
+        global_rules = config.get("global_rules", {})
+        self.maintenance_windows: Dict[Tuple[int, int], Dict] = {}
+        for window in global_rules.get("maintenance_windows", []):
+            for day in window.get("days", []):
+                for hour in window.get("hours", []):
+                    self.maintenance_windows.setdefault((day, hour), {
+                        "name": window.get("name", "Maintenance window"),
+                        "suppress": bool(window.get("suppress_all_alerts")),
+                        "reduce_score_by": window.get("reduce_severity_by", 0)
+                    })
+
+        storms = [s for s in global_rules.get("alert_storms", []) if s.get("window_minutes", 5) == 5]
+        self.storm_threshold = min((s.get("threshold", 50) for s in storms), default=50)
+        self.ticket_minimum_score = config.get("ticket_creation", {}).get("minimum_score", 60)
+
+    def for_alert(self, alert: Dict) -> Optional[CompiledRule]:
+        """Rule for an alert: by activity name, else the first matching URL pattern"""
+
+        rule = self.by_activity.get(alert.get("activity_name"))
+        if rule is not None:
+            return rule
+
+        url = alert.get("url", "")
+        if url not in self._by_url:
+            self._by_url[url] = next((r for pattern, r in self.url_patterns if pattern.search(url)),
+                                     self.catch_all)
+        return self._by_url[url]
+
+    def is_critical_url(self, url: str) -> bool:
+        critical = self._critical.get(url)
+        if critical is None:
+            critical = self._critical[url] = bool(self.critical_url and self.critical_url.search(url))
+        return critical
+
+
+def load_rules(filepath: str = "alert_rules.yaml") -> CompiledRules:
+    """
+    Compiled rules for a rules file, recompiled only when the file changes
+
+    A missing file gives an empty rule set (built-in behaviour only).
+    """
+
+    if not os.path.exists(filepath):
+        return CompiledRules()
+
+    key = (os.path.abspath(filepath), os.path.getmtime(filepath))
+    if key not in _cache:
+        _cache.clear()
+        _cache[key] = CompiledRules(ConfigLoader.load_yaml(filepath) or {})
+    return _cache[key]
+
+
+def weekday_hour(alert: Dict) -> Optional[Tuple[int, int]]:
+    """(weekday, hour) of the alert's timestamp, the key of every window table"""
+
+    stamp = alert.get("timestamp")
+    return _weekday_hour(stamp) if isinstance(stamp, str) else None
+
+
+@lru_cache(maxsize=4096)
+def _weekday_hour(stamp: str) -> Optional[Tuple[int, int]]:
+    try:
+        timestamp = datetime.fromisoformat(stamp)
+    except ValueError:
+        return None
+    return timestamp.weekday(), timestamp.hour
+
+
+def _compile_condition(condition: Dict) -> Optional[Tuple[str, Callable[[Dict], bool], int]]:
+    """(name, predicate, severity) for a condition, or None if it cannot be evaluated"""
+
+    name = condition.get("name")
+    severity = condition.get("severity", 5)
+    op = condition.get("operator")
+
+    if op == "exists":
+        keywords = EXISTS_KEYWORDS.get(name)
+        if keywords is None:
+            return None
+        return name, lambda alert: any(k in (alert.get("error_message") or "").lower() for k in keywords), severity
+
+    field = CONDITION_FIELDS.get(name)
+    compare = OPERATORS.get(op)
+    if field is None or compare is None:
+        print(f"⚠️  Unsupported rule condition: {name} {op}")
+        return None
+
+    value = condition.get("value")
+
+    def predicate(alert):
+        actual = field(alert)
+        if actual is None:
+            return compare is operator.ne  # No response is never equal to a value
+        return compare(actual, value)
+
+    return name, predicate, severity
+
+
+def _compile_band(band: Dict) -> Dict:
+    """Escalation band with a score predicate for ">85", "70-85" or "60" """
+
+    spec = str(band.get("score", "")).strip()
+    if spec.startswith(">="):
+        low = float(spec[2:])
+        matches = lambda score: score >= low
+    elif spec.startswith(">"):
+        low = float(spec[1:])
+        matches = lambda score: score > low
+    elif "-" in spec:
+        low, high = (float(part) for part in spec.split("-", 1))
+        matches = lambda score: low <= score <= high
+    else:
+        low = float(spec or 0)
+        matches = lambda score: score >= low
+    return {"matches": matches, "action": band.get("action", "create_ticket"), "notify": band.get("notify", [])}
@@ -0,0 +1,342 @@
+"""
+Screenshot Store Module
+Content-addressed screenshot storage with a per-check version index
+Identical images are stored once, and a perceptual hash records screenshots
+that are visually unchanged without keeping another copy
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process index lock
+    fcntl = None
+
+
+# Capture policies: when run_check takes a new screenshot
+CAPTURE_ALWAYS = "always"
+CAPTURE_FAILURES = "failures"            # Failures only
+CAPTURE_SAMPLED = "sampled"              # Failures and every Nth success
+CAPTURE_STATUS_CHANGE = "status_change"  # First check after the status changed
+CAPTURE_POLICIES = (CAPTURE_ALWAYS, CAPTURE_FAILURES, CAPTURE_SAMPLED, CAPTURE_STATUS_CHANGE)
+
+
+class ScreenshotStore:
+    """Stores screenshot blobs by content hash and tracks versions per check"""
+
+    def __init__(self, root: str = "screenshots", image_format: str = "png",
+                 quality: int = 80, similarity_threshold: int = 2,
+                 max_versions: int = 50, capture_policy: str = CAPTURE_ALWAYS,
+                 sample_every: int = 10, background_workers: int = 2):
+        """
+        Args:
+            root: Directory holding blobs/ and index.json
+            image_format: Stored format (png, webp or jpeg; non-png needs Pillow)
+            quality: Compression quality for lossy formats
+            similarity_threshold: Max differing bits of the 64-bit perceptual
+                hash for a screenshot to count as visually unchanged
+                (negative disables perceptual matching)
+            max_versions: Version entries kept per check
+            capture_policy: One of CAPTURE_POLICIES
+            sample_every: Successes per capture for the sampled policy
+            background_workers: Threads hashing and writing put_async() screenshots
+        """
+        if capture_policy not in CAPTURE_POLICIES:
+            raise ValueError(f"Unknown capture policy '{capture_policy}', "
+                             f"expected one of {', '.join(CAPTURE_POLICIES)}")
+
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.index_file = self.root / "index.json"
+        self.image_format = image_format.lower()
+        self.quality = quality
+        self.similarity_threshold = similarity_threshold
+        self.max_versions = max_versions
+        self.capture_policy = capture_policy
+        self.sample_every = max(1, sample_every)
+        self.background_workers = max(1, background_workers)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._touched = set()  # Checks whose index entry this store changed
+        self.index = self._load_index()
+
+    @staticmethod
+    def from_env(root: str = "screenshots") -> "ScreenshotStore":
+        """Build store from SCREENSHOT_* environment variables"""
+
+        return ScreenshotStore(
+            root=root,
+            image_format=os.getenv('SCREENSHOT_FORMAT', 'png'),
+            quality=int(os.getenv('SCREENSHOT_QUALITY', '80')),
+            similarity_threshold=int(os.getenv('SCREENSHOT_SIMILARITY_THRESHOLD', '2')),
+            capture_policy=os.getenv('SCREENSHOT_CAPTURE', CAPTURE_ALWAYS).lower(),
+            sample_every=int(os.getenv('SCREENSHOT_SAMPLE_EVERY', '10'))
+        )
+
+    def should_capture(self, check_id, status: str) -> bool:
+        """
+        Decide whether a check needs a new screenshot, recording its status
+
+        A screenshot is always taken while the check has no stored image to
+        fall back on.
+        """
+
+        with self._lock:
+            self._touched.add(str(check_id))
+            check = self.index.setdefault(str(check_id), {"versions": []})
+            last_status = check.get("last_status")
+            check["last_status"] = status
+
+            if self._last_good(check) is None or self.capture_policy == CAPTURE_ALWAYS:
+                capture = True
+            elif self.capture_policy == CAPTURE_STATUS_CHANGE:
+                capture = status != last_status
+            elif status != "success":
+                capture = True
+            elif self.capture_policy == CAPTURE_SAMPLED:
+                check["successes_since_capture"] = check.get("successes_since_capture", 0) + 1
+                capture = check["successes_since_capture"] >= self.sample_every
+            else:
+                capture = False
+
+            if capture:
+                check["successes_since_capture"] = 0
+            self._save_index()
+
+        return capture
+
+    def last_good(self, check_id) -> Optional[Dict]:
+        """Newest stored version from a successful check (else the newest at all)"""
+
+        with self._lock:
+            return self._last_good(self.index.get(str(check_id), {"versions": []}))
+
+    def put_async(self, check_id, png_bytes: bytes, status: str = None) -> Future:
+        """put() on a background thread; the future resolves to the version entry"""
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.background_workers,
+                                                    thread_name_prefix="screenshot-store")
+        return self._executor.submit(self.put, check_id, png_bytes, status)
+
+    def close(self):
+        """Wait for background writes to finish"""
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def put(self, check_id, png_bytes: bytes, status: str = None) -> Dict:
+        """
+        Store a screenshot for a check
+
+        Args:
+            check_id: Check the screenshot belongs to
+            png_bytes: PNG image as returned by driver.get_screenshot_as_png()
+            status: Optional check status recorded with the version
+
+        Returns:
+            Version entry with hash, path (stored blob to upload) and change flags
+        """
+
+        digest = hashlib.sha256(png_bytes).hexdigest()
+        phash = perceptual_hash(png_bytes)
+
+        with self._lock:
+            self._touched.add(str(check_id))
+            versions = self.index.setdefault(str(check_id), {"versions": []})["versions"]
+            previous = versions[-1] if versions else None
+
+            entry = {
+                "hash": digest,
+                "phash": phash,
+                "timestamp": datetime.now().isoformat(),
+                "status": status,
+                "changed": True,
+                "visually_unchanged": False
+            }
+
+            if previous and previous["hash"] == digest:
+                entry.update(changed=False, visually_unchanged=True, path=previous["path"])
+                self._append_version(versions, entry)
+                return dict(entry)
+            elif (previous and phash is not None and previous.get("phash") is not None
+                  and previous.get("status") == status and self.similarity_threshold >= 0
+                  and hamming_distance(phash, previous["phash"]) <= self.similarity_threshold):
+                # Visually identical with the same status: record the version,
+                # keep the previous image. A capture whose status changed (a
+                # failure after a success) is always stored as taken.
+                # Later comparisons stay anchored to the stored image's hash so
+                # gradual drift still produces a new blob eventually.
+                entry.update(visually_unchanged=True, same_as=previous["hash"],
+                             hash=previous["hash"], phash=previous["phash"],
+                             observed_hash=digest, path=previous["path"])
+                self._append_version(versions, entry)
+                return dict(entry)
+
+        # A new image: encode and write it without holding up other checks
+        entry["path"] = self._write_blob(digest, png_bytes)
+
+        with self._lock:
+            versions = self.index.setdefault(str(check_id), {"versions": []})["versions"]
+            self._append_version(versions, entry)
+        return dict(entry)
+
+    def _append_version(self, versions: List[Dict], entry: Dict):
+        """Record a version entry and save the index (caller holds the lock)"""
+
+        versions.append(entry)
+        del versions[:-self.max_versions]
+        self._save_index()
+
+    def latest(self, check_id) -> Optional[Dict]:
+        """Most recent version entry for a check"""
+
+        with self._lock:
+            versions = self.index.get(str(check_id), {}).get("versions", [])
+            return dict(versions[-1]) if versions else None
+
+    def get_versions(self, check_id) -> List[Dict]:
+        """All kept version entries for a check, oldest first"""
+
+        with self._lock:
+            return [dict(v) for v in self.index.get(str(check_id), {}).get("versions", [])]
+
+    @staticmethod
+    def _last_good(check: Dict) -> Optional[Dict]:
+        """Newest version whose blob still exists, preferring successful checks"""
+
+        available = [v for v in check["versions"] if os.path.exists(v["path"])]
+        for version in reversed(available):
+            if version["status"] == "success":
+                return dict(version)
+        return dict(available[-1]) if available else None
+
+    def prune(self) -> int:
+        """Delete blobs no longer referenced by any version; returns count removed"""
+
+        with self._lock:
+            referenced = {
+                os.path.normpath(v["path"])
+                for check in self.index.values() for v in check["versions"]
+            }
+
+        removed = 0
+        for blob in self.blob_dir.glob("*/*"):
+            if os.path.normpath(str(blob)) not in referenced:
+                blob.unlink()
+                removed += 1
+        return removed
+
+    def _write_blob(self, digest: str, png_bytes: bytes) -> str:
+        """Write blob once, converting it to the configured format (without the lock)"""
+
+        data, ext = png_bytes, "png"
+        if self.image_format != "png":
+            converted = _convert(png_bytes, self.image_format, self.quality)
+            if converted is not None:
+                data, ext = converted, ("jpg" if self.image_format == "jpeg" else self.image_format)
+
+        path = self.blob_dir / digest[:2] / f"{digest}.{ext}"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Concurrent writers of the same image each use their own temp file
+            tmp_path = path.parent / f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        return str(path)
+
+    def _load_index(self) -> Dict:
+        """Load version index"""
+
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Error loading screenshot index: {e}")
+
+        return {}
+
+    def _save_index(self):
+        """
+        Atomically save the version index (caller holds the lock)
+
+        Work-queue worker processes share the index, each for its own checks:
+        entries this store did not change are refreshed from disk first, so
+        one worker's save does not drop another's versions.
+        """
+
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / "index.lock", 'w') as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                for check_id, check in self._load_index().items():
+                    if check_id not in self._touched:
+                        self.index[check_id] = check
+                tmp_path = self.index_file.with_suffix(f".json.{os.getpid()}.tmp")
+                with open(tmp_path, 'w') as f:
+                    json.dump(self.index, f, indent=2)
+                os.replace(tmp_path, self.index_file)
+        except Exception as e:
+            print(f"Error saving screenshot index: {e}")
+
+
+def perceptual_hash(image_bytes: bytes) -> Optional[int]:
+    """
+    64-bit difference hash (dHash) of an image
+
+    Returns None when Pillow is not installed; the store then only
+    deduplicates byte-identical screenshots.
+    """
+
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            pixels = image.convert("L").resize((9, 8)).tobytes()
+    except Exception:
+        return None
+
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _convert(png_bytes: bytes, image_format: str, quality: int) -> Optional[bytes]:
+    """Re-encode a PNG with Pillow, or None if Pillow is unavailable"""
+
+    try:
+        from PIL import Image
+    except ImportError:
+        print("⚠️ Pillow not installed, storing screenshots as PNG. Install with: pip install pillow")
+        return None
+
+    with Image.open(io.BytesIO(png_bytes)) as image:
+        if image_format == "jpeg":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, format=image_format.upper(), quality=quality)
+        return out.getvalue()
@@ -0,0 +1,178 @@
+"""
+Session State Module
+Captures an authenticated browser session (cookies + localStorage) after one
+login and injects it into worker drivers, so checks skip repeated logins
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+# Runs before any page script; seeds localStorage once per tab for the saved origin
+_LOCAL_STORAGE_SCRIPT = """
+(function(origin, items) {
+    if (window.location.origin !== origin) return;
+    try {
+        if (sessionStorage.getItem('__session_state_injected')) return;
+        for (const [key, value] of Object.entries(items)) {
+            if (localStorage.getItem(key) === null) localStorage.setItem(key, value);
+        }
+        sessionStorage.setItem('__session_state_injected', '1');
+    } catch (e) {}
+})(%s, %s);
+"""
+
+
+class SessionStateManager:
+    """Save, validate and replay browser session state"""
+
+    def __init__(self, state_file: str = "session_state.json", max_age: float = 3600,
+                 keys: List[str] = None):
+        """
+        Args:
+            state_file: JSON file the session state is kept in
+            max_age: Seconds a captured state is trusted (cookie expiry may
+                shorten this)
+            keys: localStorage keys to capture (None = all)
+        """
+        self.state_file = state_file
+        self.max_age = max_age
+        self.keys = keys
+        self._lock = threading.Lock()
+        self.state = self._load_state()
+
+    @staticmethod
+    def from_env(state_file: str = "session_state.json") -> "SessionStateManager":
+        """Build manager from SESSION_MAX_AGE"""
+
+        return SessionStateManager(state_file, max_age=float(os.getenv('SESSION_MAX_AGE', '3600')))
+
+    def is_valid(self) -> bool:
+        """True if a captured state exists and has not expired"""
+
+        with self._lock:
+            return bool(self.state) and time.time() < self.state.get("expires_at", 0)
+
+    def capture(self, driver) -> Dict:
+        """Export cookies and localStorage from a logged-in driver and save them"""
+
+        local_storage = driver.execute_script(
+            "const items = {};"
+            "for (let i = 0; i < localStorage.length; i++) {"
+            "  const key = localStorage.key(i); items[key] = localStorage.getItem(key);"
+            "}"
+            "return items;"
+        ) or {}
+        if self.keys is not None:
+            local_storage = {k: v for k, v in local_storage.items() if k in self.keys}
+
+        cookies = driver.get_cookies()
+        now = time.time()
+        expires_at = now + self.max_age
+        cookie_expiries = [c["expiry"] for c in cookies if c.get("expiry")]
+        if cookie_expiries:
+            expires_at = min(expires_at, min(cookie_expiries))
+
+        state = {
+            "origin": driver.execute_script("return window.location.origin;"),
+            "cookies": cookies,
+            "local_storage": local_storage,
+            "captured_at": now,
+            "expires_at": expires_at
+        }
+
+        with self._lock:
+            self.state = state
+        self._save_state(state)
+        return state
+
+    def inject(self, driver) -> bool:
+        """
+        Seed a fresh driver with the saved session before its first navigation
+
+        Uses Chrome DevTools commands so no extra page load is needed; other
+        browsers fall back to loading the origin and setting state directly.
+
+        Returns:
+            True if state was injected
+        """
+
+        if not self.is_valid():
+            return False
+
+        with self._lock:
+            state = self.state
+
+        if hasattr(driver, "execute_cdp_cmd"):
+            driver.execute_cdp_cmd("Network.enable", {})
+            for cookie in state["cookies"]:
+                driver.execute_cdp_cmd("Network.setCookie", _cdp_cookie(cookie, state["origin"]))
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+                "source": _LOCAL_STORAGE_SCRIPT % (json.dumps(state["origin"]),
+                                                   json.dumps(state["local_storage"]))
+            })
+            return True
+
+        driver.get(state["origin"] + "/")
+        for cookie in state["cookies"]:
+            driver.add_cookie({k: v for k, v in cookie.items() if k != "sameSite"})
+        for key, value in state["local_storage"].items():
+            driver.execute_script("localStorage.setItem(arguments[0], arguments[1]);", key, value)
+        return True
+
+    def invalidate(self):
+        """Forget the saved state (e.g. the site redirected to the login page)"""
+
+        with self._lock:
+            self.state = {}
+        try:
+            os.remove(self.state_file)
+        except FileNotFoundError:
+            pass
+
+    def _load_state(self) -> Dict:
+        """Load saved state from file"""
+
+        if Path(self.state_file).exists():
+            try:
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Error loading session state: {e}")
+
+        return {}
+
+    def _save_state(self, state: Dict):
+        """Save state to file, readable by the owner only (it holds session cookies)"""
+
+        try:
+            fd = os.open(self.state_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f, indent=2)
+        except Exception as e:
+            print(f"Error saving session state: {e}")
+
+
+def _cdp_cookie(cookie: Dict, origin: str) -> Dict:
+    """Convert a Selenium cookie dict into Network.setCookie parameters"""
+
+    params = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "path": cookie.get("path", "/"),
+        "secure": cookie.get("secure", False),
+        "httpOnly": cookie.get("httpOnly", False)
+    }
+    if cookie.get("domain"):
+        params["domain"] = cookie["domain"]
+    else:
+        params["url"] = origin
+    if cookie.get("expiry"):
+        params["expires"] = cookie["expiry"]
+    if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+        params["sameSite"] = cookie["sameSite"]
+    return params
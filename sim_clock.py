@@ -0,0 +1,215 @@
+"""
+Simulation Clock Module
+Pluggable clocks for the defect injector, simulator, alert assessor and check
+scheduler. SystemClock is real time; VirtualClock turns sleeps into jumps of
+virtual time, so simulated timeouts and slow responses cost no wall time
+
+Usage:
+    python sim_clock.py --days 7 --interval-minutes 10 --seed 42
+"""
+
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+
+class SystemClock:
+    """Real time"""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+class VirtualClock:
+    """
+    Simulated time that only moves when slept on or advanced
+
+    Sleeps never block: they advance the shared virtual time immediately.
+    Concurrent sleeps therefore add up, so simulations drive checks one
+    after another instead of on a thread pool.
+    """
+
+    def __init__(self, start: datetime = None):
+        """
+        Args:
+            start: Initial virtual time (defaults to the current time)
+        """
+        self._start = start or datetime.now()
+        self._elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        with self._lock:
+            return self._start + timedelta(seconds=self._elapsed)
+
+    def time(self) -> float:
+        return self.now().timestamp()
+
+    def monotonic(self) -> float:
+        with self._lock:
+            return self._elapsed
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+
+    def advance(self, seconds: float):
+        """Move virtual time forward"""
+
+        if seconds < 0:
+            raise ValueError("Virtual time cannot move backwards")
+        with self._lock:
+            self._elapsed += seconds
+
+    def set(self, moment: datetime):
+        """Jump forward to moment (no-op if it has already passed)"""
+
+        with self._lock:
+            self._elapsed = max(self._elapsed, (moment - self._start).total_seconds())
+
+
+def replay_cycles(days: float = 7, interval_minutes: int = 10, start: datetime = None,
+                  seed: int = 0, check_count: int = 7) -> Dict:
+    """
+    Replay monitoring cycles on a virtual clock, defects included
+
+    Every cycle plans its defects, plays each simulated delay and error
+    through DefectSimulator (in virtual time) and feeds the resulting alerts,
+    duplicates and storms included, to a fresh-history AlertEngine.
+
+    Args:
+        days: Simulated duration
+        interval_minutes: Time between cycles
+        start: Virtual start time (defaults to last Monday 00:00)
+        seed: Defect seed
+        check_count: Activities per cycle
+
+    Returns:
+        Dict with cycle, alert and outcome counts plus virtual and wall seconds
+    """
+
+    from alert_engine import AlertEngine
+    from check_backends import extract_activity_name
+    from defect_injector import DefectInjector, DefectSimulator
+
+    if start is None:
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = today - timedelta(days=today.weekday())
+
+    clock = VirtualClock(start)
+    injector = DefectInjector(enabled=True, seed=seed, clock=clock)
+    engine = AlertEngine(clock=clock)
+    check_ids = list(range(1, check_count + 1))
+    names = [extract_activity_name(f"activity{i}.html") for i in check_ids]
+
+    summary = {"cycles": 0, "alerts": 0, "actionable": 0, "suppressed": 0,
+               "deduplicated": 0, "tickets_to_create": 0, "defects": {}}
+    wall_started = time.monotonic()
+    cycle_time = start
+    end = start + timedelta(days=days)
+
+    while cycle_time < end:
+        clock.set(cycle_time)
+        plan = injector.plan_batch(check_ids, names, cycle_time)
+
+        alerts = []
+        for check_id, name, defect in zip(check_ids, names, plan):
+            alert, copies = _simulate_check(check_id, name, defect, clock, DefectSimulator)
+            alerts.extend(dict(alert) for _ in range(copies))
+            if defect:
+                summary["defects"][defect["type"]] = summary["defects"].get(defect["type"], 0) + 1
+
+        results = engine.process_alerts(alerts)
+        summary["cycles"] += 1
+        for key in ("actionable", "suppressed", "deduplicated", "tickets_to_create"):
+            summary[key] += results["summary"][key]
+        summary["alerts"] += results["summary"]["total_alerts"]
+        cycle_time += timedelta(minutes=interval_minutes)
+
+    summary["virtual_seconds"] = round(clock.monotonic(), 1)
+    summary["wall_seconds"] = round(time.monotonic() - wall_started, 3)
+    return summary
+
+
+def _simulate_check(check_id: int, name: str, defect: Dict, clock, simulator):
+    """
+    Raw alert for one simulated check and how many times it is sent
+
+    Returns:
+        Tuple of (alert dict, copies)
+    """
+
+    alert = {"check_id": check_id, "activity_name": name, "url": f"activity{check_id}.html",
+             "status": "success", "response_code": 200, "response_time": 0.5,
+             "error_message": "", "is_simulated": bool(defect)}
+    copies = 1
+
+    if defect:
+        alert["error_message"] = defect["message"]
+        alert["severity"] = defect["severity"] // 10
+        kind = defect["type"]
+        try:
+            if kind == "TIMEOUT":
+                simulator.simulate_timeout(clock=clock)
+            elif kind == "CONNECTION_ERROR":
+                simulator.simulate_connection_error()
+            elif kind == "SLOW_RESPONSE":
+                alert["response_time"] = simulator.simulate_slow_response(clock=clock)
+        except (TimeoutError, ConnectionError) as e:
+            alert.update(status="failure", response_code=None, error_message=str(e))
+
+        if kind == "FALSE_POSITIVE":
+            alert.update(status="failure", response_code=defect["reported_status_code"])
+        elif kind == "DUPLICATE_ALERT":
+            alert.update(status="failure", response_code=None)
+            copies = defect["duplicate_count"]
+        elif kind == "ALERT_STORM":
+            alert.update(status="failure", response_code=None)
+            copies = defect["alert_count"]
+
+    alert["timestamp"] = clock.now().isoformat()
+    return alert, copies
+
+
+def main():
+    """Command line entry point"""
+
+    parser = argparse.ArgumentParser(description="Replay monitoring cycles in virtual time")
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--interval-minutes", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the summary as JSON to this file")
+    args = parser.parse_args()
+
+    summary = replay_cycles(args.days, args.interval_minutes, seed=args.seed)
+
+    print(f"⏩ Replayed {summary['cycles']} cycles ({summary['virtual_seconds'] / 3600:.1f}h virtual) "
+          f"in {summary['wall_seconds']:.1f}s")
+    print(f"  ├─ Alerts: {summary['alerts']}")
+    print(f"  ├─ Actionable: {summary['actionable']} ({summary['tickets_to_create']} tickets)")
+    print(f"  ├─ Suppressed: {summary['suppressed']}")
+    print(f"  ├─ Deduplicated: {summary['deduplicated']}")
+    print(f"  └─ Defects: {summary['defects']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n💾 Summary saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Tests for the alert engine: correlation, frequency windows, engine state and
+compiled rules
+"""
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from alert_engine import AlertAssessor, AlertEngine, EventCorrelator, FrequencyWindow, StreamingEventCorrelator
+
+
+CYCLE = datetime(2024, 3, 4, 10, 0)
+
+MESSAGES = ["", "Service Unavailable", "Connection refused - server unreachable",
+            "Connection timeout after 10s", "Network unreachable - upstream gateway down",
+            "Internal Server Error", "Request Timeout"]
+
+
+def _random_alerts(rng, count, span_seconds=1200, activities=40):
+    alerts = []
+    for i in range(count):
+        moment = CYCLE + timedelta(seconds=rng.uniform(0, span_seconds))
+        stamp = moment.isoformat()
+        if rng.random() < 0.05:
+            stamp = moment.replace(tzinfo=timezone.utc).isoformat()
+        elif rng.random() < 0.03:
+            stamp = "not a timestamp"
+        alerts.append({"activity_name": f"Activity {rng.randint(1, activities)}", "timestamp": stamp,
+                       "error_message": rng.choice(MESSAGES)})
+    return alerts
+
+
+def _pairwise_groups(correlator, alerts):
+    """The original O(n²) grouping, as reference"""
+    groups = []
+    processed = set()
+    for i, alert in enumerate(alerts):
+        if i in processed:
+            continue
+        group = [i]
+        processed.add(i)
+        for j in range(i + 1, len(alerts)):
+            if j not in processed and correlator._are_correlated(alert, alerts[j]):
+                group.append(j)
+                processed.add(j)
+        groups.append(group)
+    return groups
+
+
+def test_indexed_correlation_matches_pairwise_groups():
+    correlator = EventCorrelator(time_window=300)
+    for seed in range(40):
+        rng = random.Random(seed)
+        alerts = _random_alerts(rng, rng.randint(1, 300), activities=rng.choice([5, 40, 400]))
+        groups = correlator.correlate(alerts)
+
+        expected = _pairwise_groups(correlator, alerts)
+        assert [[id(a) for a in g["alerts"]] for g in groups] == \
+            [[id(alerts[j]) for j in g] for g in expected]
+        assert [g["group_id"] for g in groups] == [f"group_{g[0]}" for g in expected]
+
+
+def test_correlation_window_boundary_is_exclusive():
+    correlator = EventCorrelator(time_window=300)
+    alerts = [{"activity_name": name, "timestamp": (CYCLE + timedelta(seconds=offset)).isoformat(),
+               "error_message": "Service Unavailable"}
+              for name, offset in [("A", 0), ("B", 300), ("C", 299.999999)]]
+    assert [g["count"] for g in correlator.correlate(alerts)] == [2, 1]
+
+
+def test_correlating_storm_is_near_linear():
+    rng = random.Random(1)
+    alerts = _random_alerts(rng, 50000, span_seconds=86400, activities=25000)
+    started = time.monotonic()
+    groups = EventCorrelator().correlate(alerts)
+    assert time.monotonic() - started < 10
+    assert sum(g["count"] for g in groups) == 50000
+
+
+def _alert(alert_id, activity, seconds, message="Service Unavailable"):
+    return {"alert_id": alert_id, "activity_name": activity, "error_message": message,
+            "timestamp": (CYCLE + timedelta(seconds=seconds)).isoformat()}
+
+
+def test_streaming_correlator_opens_updates_and_closes_incidents():
+    correlator = StreamingEventCorrelator(time_window=300)
+
+    events = correlator.add(_alert("a1", "Account Verification", 0))
+    assert [(e["event"], e["group_id"]) for e in events] == [("opened", "incident_a1")]
+    assert correlator.add(_alert("a2", "Account Verification", 200))[0]["event"] == "updated"
+
+    # A network outage cascades into an open incident: the two are merged into the older one
+    correlator.add(_alert("b1", "Loan Application Check", 250, "Internal Server Error"))
+    events = correlator.add(_alert("n1", "Fund Transfer", 260, "Network unreachable"))
+    assert events[0]["event"] == "opened"
+    events = correlator.add(_alert("c1", "Loan Application Check", 270, "Connection refused"))
+    assert [(e["event"], e["group_id"], e.get("merged_into")) for e in events] == \
+        [("closed", "incident_n1", "incident_b1"), ("updated", "incident_b1", None)]
+    assert events[-1]["group_id"] == "incident_b1" and events[-1]["count"] == 3
+    assert events[-1]["root_cause"] == "Connection/Connectivity issue"
+
+    # The window slides past the first incident, then past everything
+    events = correlator.add(_alert("d1", "Security Scan", 510, "Bad Gateway"))
+    assert [(e["event"], e["group_id"]) for e in events] == [("opened", "incident_d1"), ("closed", "incident_a1")]
+    closed = correlator.advance(CYCLE + timedelta(seconds=900))
+    assert {e["group_id"] for e in closed} == {"incident_b1", "incident_d1"}
+    assert correlator.incidents == {} and correlator._index == {} and correlator._expiry == []
+
+
+def test_streaming_correlator_memory_is_bounded_by_the_window():
+    correlator = StreamingEventCorrelator(time_window=60)
+    opened = closed = 0
+    for i in range(20000):
+        for event in correlator.add(_alert(str(i), f"Activity {i % 7}", i * 3, f"Error {i % 13}")):
+            opened += event["event"] == "opened"
+            closed += event["event"] == "closed"
+        assert len(correlator._expiry) <= 60 // 3 + 2
+    assert opened == closed + len(correlator.incidents)
+    assert len(correlator.incidents) == 1
+
+
+def test_engine_links_incidents_across_batches():
+    engine = AlertEngine(rules_config=None)
+    first = engine.process_alerts([_alert("x1", "Compliance Audit", 0)])
+    second = engine.process_alerts([_alert("x2", "Compliance Audit", 120)])
+
+    assert [e["event"] for e in first["incident_events"]] == ["opened"]
+    assert [(e["event"], e["group_id"], e["count"]) for e in second["incident_events"]] == \
+        [("updated", "incident_x1", 2)]
+
+
+def test_frequency_window_counts_match_brute_force():
+    rng = random.Random(5)
+    window = FrequencyWindow(300)
+    seen = []
+    second = 1_700_000_000
+    for _ in range(5000):
+        second += rng.choice([0, 0, 1, 2, 7, 40])
+        moment = second - (rng.randint(0, 400) if rng.random() < 0.1 else 0)   # Some late alerts
+        head = max(seen + [moment])
+        if moment <= head - 300:
+            expected = 0
+        else:
+            expected = sum(1 for t in seen if moment - 300 < t <= moment and t > head - 300)
+            seen.append(moment)
+        assert window.add(moment) == expected
+    assert len(window.buckets) == 300
+
+
+def test_storm_detection_during_backfill():
+    """A storm from last week is detected from its own timestamps, processed in any order"""
+    assessor = AlertAssessor()
+    storm = [_alert(str(i), "Fund Transfer", i * 2 - 604800) for i in range(60)]
+    random.Random(2).shuffle(storm)
+    checks = [assessor._check_frequency(alert) for alert in storm]
+    assert any(check["is_storm"] for check in checks)
+    assert not AlertAssessor()._check_frequency(storm[0])["exceeded"]
+
+
+def test_storm_threshold_comes_from_the_rules():
+    """The assessor's is_storm agrees with the rules' alert_storms threshold"""
+    from rule_compiler import CompiledRules
+
+    rules = CompiledRules({"global_rules": {"alert_storms": [{"threshold": 20, "window_minutes": 5}]}})
+    assessor = AlertAssessor(compiled_rules=rules)
+    checks = [assessor._check_frequency(_alert(str(i), "Fund Transfer", i)) for i in range(22)]
+    assert [check["is_storm"] for check in checks].index(True) == 21
+    assert AlertAssessor().storm_threshold == 50
+
+
+def test_engine_state_carries_incidents_to_the_next_scheduled_run(tmp_path):
+    from engine_state import EngineState
+
+    state = EngineState(str(tmp_path / "engine_state.bin"))
+    first = AlertEngine()
+    assert not state.load(first)
+    first.process_alerts([_alert(f"a{i}", "Fund Transfer", i) for i in range(30)])
+    state.save(first)
+    assert not (tmp_path / "engine_state.bin.tmp").exists()
+
+    # The next cron run, ten minutes later: the outage is still the same incident
+    second = AlertEngine()
+    started = time.monotonic()
+    assert state.load(second)
+    assert time.monotonic() - started < 0.5
+    results = second.process_alerts([_alert(f"b{i}", "Fund Transfer", 600 + i) for i in range(30)])
+
+    assert [(e["event"], e["group_id"], e["count"]) for e in results["incident_events"]] == \
+        [("updated", "incident_a0", 60)]
+    assert second.assessor.baselines["Fund Transfer"]["alerts"] == 60
+
+    # 5-minute frequency windows have expired by then and count afresh
+    assert second.assessor.alert_frequency["Fund Transfer"].total == 30
+    fresh = AlertEngine().process_alerts([_alert(f"b{i}", "Fund Transfer", 600 + i) for i in range(30)])
+    assert results["summary"]["deduplicated"] == fresh["summary"]["deduplicated"]
+
+
+def test_engine_state_carries_storms_into_a_rerun_within_the_window(tmp_path):
+    from engine_state import EngineState
+
+    state = EngineState(str(tmp_path / "engine_state.bin"))
+    first = AlertEngine()
+    first.process_alerts([_alert(f"a{i}", "Fund Transfer", i) for i in range(30)])
+    state.save(first)
+
+    # A manual re-run within 5 minutes of the last alert continues the storm count
+    second = AlertEngine()
+    assert state.load(second)
+    results = second.process_alerts([_alert(f"b{i}", "Fund Transfer", 100 + i) for i in range(30)])
+    assert second.assessor.alert_frequency["Fund Transfer"].total == 60
+
+    fresh = AlertEngine().process_alerts([_alert(f"b{i}", "Fund Transfer", 100 + i) for i in range(30)])
+    assert results["summary"]["deduplicated"] > fresh["summary"]["deduplicated"]
+
+
+def test_engine_state_load_leaves_engine_untouched_on_damaged_trailer(tmp_path):
+    from engine_state import EngineState
+
+    path = tmp_path / "engine_state.bin"
+    first = AlertEngine()
+    first.process_alerts([_alert(f"a{i}", "Fund Transfer", i) for i in range(30)])
+    EngineState(str(path)).save(first)
+    path.write_bytes(path.read_bytes().replace(b'"last_seen":"2024', b'"last_seen":"XXXX'))
+
+    engine = AlertEngine()
+    assert not EngineState(str(path)).load(engine)
+    assert dict(engine.assessor.alert_frequency) == {}
+    assert engine.assessor.baselines == {}
+    assert engine.incident_correlator.incidents == {}
+
+
+def test_engine_state_ignores_unreadable_snapshot(tmp_path):
+    from engine_state import EngineState
+
+    path = tmp_path / "engine_state.bin"
+    path.write_bytes(b"not an engine state file at all, just some bytes")
+    engine = AlertEngine()
+    assert not EngineState(str(path)).load(engine)
+    assert engine.incident_correlator.incidents == {}
+
+
+def test_engine_state_expires_known_false_positives_across_runs(tmp_path):
+    from engine_state import EngineState
+
+    state = EngineState(str(tmp_path / "engine_state.bin"))
+    timeout = "Connection timeout after 10s"
+    first = AlertEngine()
+    results = first.process_alerts([_alert("a1", "Transaction Review", 0, timeout)])
+    assert results["summary"]["suppressed"] == 1
+    state.save(first)
+
+    # Still timing out at the next cron run: past exclude_after_minutes, no longer a blip
+    second = AlertEngine()
+    assert state.load(second)
+    results = second.process_alerts([_alert("b1", "Transaction Review", 600, timeout)])
+    assert results["summary"]["suppressed"] == 0
+    fresh = AlertEngine().process_alerts([_alert("b1", "Transaction Review", 600, timeout)])
+    assert fresh["summary"]["suppressed"] == 1
+
+    # A clean check ends the outage; the next timeout is a blip again
+    results = second.process_alerts([_alert("c1", "Transaction Review", 1200, ""),
+                                     _alert("c2", "Transaction Review", 1800, timeout)])
+    assert [p["rule_result"]["reason"] for p in results["suppressed_alerts"]] == \
+        ["Network blip - auto-retries"]
+
+
+def test_rules_compile_from_alert_rules_yaml():
+    from rule_compiler import load_rules
+
+    rules = load_rules("alert_rules.yaml")
+    assert load_rules("alert_rules.yaml") is rules      # Compiled once
+    account = rules.by_activity["Account Verification"]
+    assert account.escalation[90]["action"] == "create_critical_ticket"
+    assert account.escalation[85] == {"action": "create_ticket", "notify": ["slack"]}
+    assert account.escalation[10] is None
+    assert account.false_positive_windows[(6, 22)] == ("Maintenance window", True)
+
+    slow_timeout = {"response_time": 6.0, "response_code": None, "error_message": "Connection timeout after 10s"}
+    assert [name for name, _ in account.matched_conditions(slow_timeout)] == \
+        ["response_time_threshold", "status_code", "connection_timeout"]
+
+    assert rules.for_alert({"activity_name": "New Check", "url": "https://loan-server.example/x"}).id == "activity_3"
+    assert rules.for_alert({"activity_name": "New Check", "url": "https://example.org"}).id == "activity_4"
+    assert rules.is_critical_url("https://transaction-server.example/")
+    assert rules.storm_threshold == 50 and rules.ticket_minimum_score == 60
+
+
+def test_rule_engine_applies_compiled_rules():
+    from alert_engine import RuleEngine
+
+    engine = RuleEngine()
+    quiet = {"frequency_check": {"count_5_min": 0, "is_storm": False},
+             "is_false_positive": False, "severity_score": 8}
+    tuesday_backup = {"activity_name": "Transaction Review", "url": "", "error_message": "Service Unavailable",
+                      "timestamp": datetime(2024, 3, 5, 15, 0).isoformat()}
+    assert engine.apply_rules(tuesday_backup, quiet)["reason"] == "Backup running"
+
+    blip = dict(tuesday_backup, timestamp=CYCLE.isoformat(), error_message="Connection timeout after 10s")
+    assert engine.apply_rules(blip, quiet)["reason"] == "Network blip - auto-retries"
+    repeated = dict(quiet, frequency_check={"count_5_min": 2, "is_storm": False})
+    assert engine.apply_rules(blip, repeated)["reason"] == "Network blip - auto-retries"
+    persisting = dict(blip, timestamp=(CYCLE + timedelta(minutes=10)).isoformat())
+    assert engine.apply_rules(persisting, quiet)["action"] == "ESCALATE"
+
+    account = {"activity_name": "Account Verification", "url": "", "error_message": "",
+               "timestamp": CYCLE.isoformat(), "response_time": 1.0, "response_code": 500}
+    result = engine.apply_rules(account, quiet)
+    assert result["action"] == "ESCALATE" and result["matched_conditions"] == ["status_code"]
+    busy = dict(quiet, frequency_check={"count_5_min": 11, "is_storm": False})
+    assert engine.apply_rules(account, busy)["reason"] == "Frequency threshold exceeded"
+    assert engine.escalation_for(account, 90)["notify"] == ["slack"]
+
+
+if __name__ == "__main__":
+    import inspect
+    import pathlib
+    import tempfile
+
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            if "tmp_path" in inspect.signature(func).parameters:
+                with tempfile.TemporaryDirectory() as tmp:
+                    func(pathlib.Path(tmp))
+            else:
+                func()
+            print(f"✅ {name}")
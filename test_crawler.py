@@ -0,0 +1,720 @@
+#!/usr/bin/env python3
+"""
+Test script for the crawler plumbing (scheduling, result delivery, work queue)
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from check_scheduler import CheckScheduler, CRITICAL, NORMAL
+from result_sink import ResultSink, RawAlertFileWriter, CycleStats, LiveEngineFeed
+from work_queue import WorkQueue, start_local_workers, stop_local_workers, DONE, QUEUED
+from session_state import SessionStateManager
+from screenshot_store import ScreenshotStore, CAPTURE_SAMPLED, CAPTURE_STATUS_CHANGE
+from check_backends import HttpBackend, load_activity_backends, HTTP, SELENIUM
+from defect_injector import DefectInjector
+from resource_accounting import ProcessTreeSampler, read_process_tree
+from crawler_benchmark import TargetProfile, run_benchmark, percentile
+from cassette import Cassette, CassetteRecorder, replay_cycle
+from retry_queue import RetryQueue, RetryPolicy
+
+
+def test_scheduler_runs_critical_lane_first():
+    """With a saturated pool, critical checks start before normal ones"""
+    order = []
+    lock = threading.Lock()
+
+    def check(name):
+        with lock:
+            order.append(name)
+        time.sleep(0.01)
+
+    scheduler = CheckScheduler(max_workers=1, reserved_workers=0)
+    for i in range(3):
+        scheduler.submit(check, args=(f"normal{i}",))
+    for i in range(2):
+        scheduler.submit(check, args=(f"critical{i}",), critical=True)
+    scheduler.run()
+
+    assert order[:2] == ["critical0", "critical1"]
+    assert len(scheduler.completed) == 5
+
+
+def test_scheduler_reserves_workers_for_critical_checks():
+    """A long normal backlog cannot starve a critical check"""
+    release = threading.Event()
+    finished = {}
+
+    def slow_normal():
+        release.wait(1)
+
+    def critical():
+        finished["critical"] = time.monotonic()
+
+    scheduler = CheckScheduler(max_workers=3, reserved_workers=1)
+    scheduler.start()
+    for _ in range(4):
+        scheduler.submit(slow_normal)
+    time.sleep(0.05)
+    scheduler.submit(critical, critical=True, name="critical")
+
+    deadline = time.monotonic() + 0.5
+    while "critical" not in finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    scheduler.join()
+
+    assert "critical" in finished
+    stats = scheduler.get_lane_stats()
+    assert stats[CRITICAL]["count"] == 1
+    assert stats[NORMAL]["count"] == 4
+
+
+def test_scheduler_caps_concurrency_per_group():
+    """A group at its limit does not block jobs of other groups"""
+    running = {"browser": 0}
+    peak = {"browser": 0}
+    lock = threading.Lock()
+    http_done = []
+
+    def browser_check():
+        with lock:
+            running["browser"] += 1
+            peak["browser"] = max(peak["browser"], running["browser"])
+        time.sleep(0.05)
+        with lock:
+            running["browser"] -= 1
+
+    scheduler = CheckScheduler(max_workers=4, reserved_workers=0, group_limits={"browser": 1})
+    for _ in range(3):
+        scheduler.submit(browser_check, group="browser")
+    for i in range(3):
+        scheduler.submit(lambda i=i: http_done.append(time.monotonic()), group="http")
+    started = time.monotonic()
+    scheduler.run()
+
+    assert peak["browser"] == 1
+    assert max(http_done) - started < 0.05  # Not queued behind the browser checks
+    assert scheduler.get_group_counts() == {"browser": 3, "http": 3}
+
+
+def test_scheduler_rejects_group_limits_below_one():
+    """A group limit of 0 would leave its jobs queued forever"""
+    for limit in (0, -1):
+        with pytest.raises(ValueError, match="browser"):
+            CheckScheduler(group_limits={"browser": limit})
+
+
+class _SlowCollector:
+    """Consumer that records what it receives, slowly"""
+
+    def __init__(self):
+        self.records = []
+        self.closed = False
+
+    def consume(self, record):
+        time.sleep(0.001)
+        self.records.append(record)
+
+    def close(self):
+        self.closed = True
+
+
+def test_result_sink_spills_and_keeps_order(tmp_path):
+    """Results past the memory bound spill to disk and arrive in order"""
+    collector = _SlowCollector()
+    stats = CycleStats()
+    spill_file = str(tmp_path / "spill.jsonl")
+    sink = ResultSink([collector, stats], max_in_memory=5, spill_file=spill_file)
+
+    for i in range(50):
+        sink.put({"check_id": i, "status": "success" if i % 2 else "failure"}, [i])
+    sink.close()
+
+    assert [r["alert"]["check_id"] for r in collector.records] == list(range(50))
+    assert sink.spilled > 0
+    assert collector.closed
+    assert stats.by_status == {"failure": 25, "success": 25}
+    assert not os.path.exists(spill_file)
+
+
+def test_raw_alert_writer_journals_each_alert(tmp_path):
+    """Alerts are journaled immediately and raw_alerts.json is a JSON array"""
+    raw_file = str(tmp_path / "raw_alerts.json")
+    journal = str(tmp_path / "raw_alerts.jsonl")
+    writer = RawAlertFileWriter(raw_file, journal)
+    sink = ResultSink([writer], spill_file=str(tmp_path / "spill.jsonl"))
+
+    sink.put({"alert_id": "a1"})
+    deadline = time.monotonic() + 1
+    while writer.count < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with open(journal) as f:
+        assert json.loads(f.readline()) == {"alert_id": "a1"}
+
+    sink.put({"alert_id": "a2"})
+    sink.close()
+    with open(raw_file) as f:
+        assert [a["alert_id"] for a in json.load(f)] == ["a1", "a2"]
+
+
+def test_live_engine_feed_resumes_from_persisted_engine_state(tmp_path):
+    """Live verdicts match process_alerts.py, which starts from the same snapshot"""
+    from alert_engine import AlertEngine
+    from engine_state import EngineState
+
+    def alerts(prefix, start):
+        return [{"alert_id": f"{prefix}{i}", "activity_name": "Fund Transfer", "status": "failed",
+                 "error_message": "Service Unavailable", "response_code": 503,
+                 "timestamp": f"2024-03-04T10:0{start}:{i:02d}"} for i in range(30)]
+
+    state = EngineState(str(tmp_path / "engine_state.bin"))
+    previous = AlertEngine()
+    previous.process_alerts(alerts("a", 0))
+    state.save(previous)
+
+    feed = LiveEngineFeed(AlertEngine(), state, verbose=False)
+    sink = ResultSink([feed], spill_file=str(tmp_path / "spill.jsonl"))
+    for alert in alerts("b", 2):
+        sink.put(alert)
+    sink.close()
+
+    batch = AlertEngine()
+    state.load(batch)
+    batch.process_alerts(alerts("b", 2))
+    live_actions = [p["rule_result"]["action"] for p in feed.engine.processed_alerts]
+    assert live_actions == [p["rule_result"]["action"] for p in batch.processed_alerts]
+    assert "DEDUPLICATE" in live_actions
+    assert feed.engine.assessor.alert_frequency["Fund Transfer"].total == 60
+    assert state.load(AlertEngine())    # The feed never overwrites the snapshot
+
+
+def _fake_runner(job):
+    """Stand-in for run_check used by worker processes"""
+    time.sleep(0.01)
+    return [{"alert": {"check_id": job["check_id"], "worker_pid": os.getpid()},
+             "report_row": [job["activity_url"], 200, "Checked", "Success"]}]
+
+
+def test_work_queue_runs_jobs_across_worker_processes(tmp_path):
+    """Several local worker processes drain the queue, each job exactly once"""
+    db_path = str(tmp_path / "queue.db")
+    queue = WorkQueue(db_path)
+    jobs = [{"check_id": i, "activity_url": f"http://local/activity{i}.html"} for i in range(1, 31)]
+    assert queue.enqueue("exec-1", jobs) == 30
+    assert queue.enqueue("exec-1", jobs) == 0
+
+    workers = start_local_workers(db_path, 3, runner=_fake_runner, idle_timeout=0.5)
+    assert queue.wait_until_done("exec-1", timeout=30, poll_interval=0.1)
+    for p in workers:
+        p.join()
+
+    records = queue.collect_results("exec-1")
+    assert [r["alert"]["check_id"] for r in records] == list(range(1, 31))
+    assert queue.get_counts("exec-1")[DONE] == 30
+
+
+def test_work_queue_requeues_expired_lease(tmp_path):
+    """A job whose worker stops heartbeating is leased again by another worker"""
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=0.05)
+    queue.enqueue("exec-1", [{"check_id": 1, "activity_url": "http://local/a.html"},
+                             {"check_id": 2, "activity_url": "http://local/b.html", "priority": 1}])
+
+    stuck = queue.lease("worker-a")
+    assert stuck["check_id"] == 2  # Higher priority first
+    time.sleep(0.1)
+
+    assert queue.get_counts("exec-1")[QUEUED] == 2
+    retried = queue.lease("worker-b")
+    assert retried["job_id"] == stuck["job_id"]
+    assert retried["attempts"] == 2
+
+    assert not queue.complete(stuck["job_id"], "worker-a", [])
+    assert queue.complete(retried["job_id"], "worker-b", [])
+
+
+def _stuck_runner(job):
+    """Runner that never finishes its job"""
+    time.sleep(60)
+    return []
+
+
+def test_work_queue_timeout_terminates_local_workers(tmp_path):
+    """Workers still busy when the queue times out are terminated, not waited for"""
+    db_path = str(tmp_path / "queue.db")
+    queue = WorkQueue(db_path)
+    queue.enqueue("exec-1", [{"check_id": 1, "activity_url": "http://local/a.html"}])
+
+    workers = start_local_workers(db_path, 1, runner=_stuck_runner, idle_timeout=0.5)
+    assert not queue.wait_until_done("exec-1", timeout=1, poll_interval=0.1)
+    started = time.monotonic()
+    stop_local_workers(workers, timeout=0.5)
+    assert time.monotonic() - started < 5
+    assert not any(p.is_alive() for p in workers)
+
+
+def test_worker_runner_probes_like_the_crawler(tmp_path, monkeypatch):
+    """Queued checks use the crawler's probe components and the cycle's defect plan"""
+    import atexit
+    import axis3_enhanced as crawler
+    import check_backends
+    import work_queue
+    from circuit_breaker import CircuitBreakerRegistry
+    from retry_queue import RetryPolicy, RetryQueue
+
+    probed = []
+
+    def probe(url, metrics=None):
+        probed.append(url)
+        if metrics is not None:
+            metrics["dns_time"] = 0.0
+        return 200, "Success"
+
+    components = {"probe": probe, "retry_queue": RetryQueue(probe, RetryPolicy()), "rate_limiter": None,
+                  "content_assertions": None, "screenshot_store": ScreenshotStore(str(tmp_path / "shots")),
+                  "circuit_breakers": CircuitBreakerRegistry(str(tmp_path / "breakers.json"))}
+    exit_hooks = []
+    monkeypatch.setattr(crawler, "build_check_components", lambda: components)
+    monkeypatch.setattr(check_backends, "load_activity_backends", lambda: {"Account Verification": HTTP})
+    monkeypatch.setattr(atexit, "register", exit_hooks.append)
+    monkeypatch.setattr(work_queue, "_crawler_context", None)
+    monkeypatch.setenv("DEFECT_SEED", "11")
+    monkeypatch.setenv("DEFECTS_ENABLED", "true")
+
+    activity_url = "file://" + os.path.abspath("activity1.html")
+    injector = DefectInjector.from_env()
+    check_id, cycle = next((i, 1_709_510_400.0 + hour * 3600) for hour in range(24) for i in range(1, 21)
+                           if injector.plan_batch([i], ["Account Verification"], 1_709_510_400.0 + hour * 3600)[0])
+
+    records = work_queue.selenium_runner({"check_id": check_id, "activity_url": activity_url,
+                                          "execution_id": "exec-1", "enqueued_at": cycle})
+    backend = work_queue._crawler_context["backends"][HTTP]
+    assert backend.probe is probe and backend.retry_queue is components["retry_queue"]
+    assert backend.screenshot_store is components["screenshot_store"]
+    assert probed == ["https://www.rbi.org.in"]
+    assert records[0]["alert"]["is_simulated"]
+
+    for hook in exit_hooks:
+        hook()
+    assert (tmp_path / "breakers.json").exists()
+
+
+class _FakeDriver:
+    """Just enough of a Chrome WebDriver for session capture/injection"""
+
+    def __init__(self, local_storage=None, cookies=None):
+        self.local_storage = local_storage or {}
+        self.cookies = cookies or []
+        self.cdp_calls = []
+
+    def execute_script(self, script, *args):
+        if "location.origin" in script:
+            return "https://kingnstarpancard-code.github.io"
+        return dict(self.local_storage)
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_calls.append((cmd, params))
+
+
+def test_session_state_capture_and_inject(tmp_path):
+    """A captured login is saved, reloaded and injected without navigation"""
+    state_file = str(tmp_path / "session.json")
+    logged_in = _FakeDriver({"loggedIn": "true"}, [{"name": "sid", "value": "abc", "path": "/"}])
+    SessionStateManager(state_file).capture(logged_in)
+
+    session = SessionStateManager(state_file)
+    assert session.is_valid()
+
+    worker = _FakeDriver()
+    assert session.inject(worker)
+    commands = [cmd for cmd, _ in worker.cdp_calls]
+    assert "Network.setCookie" in commands
+    script = worker.cdp_calls[-1][1]["source"]
+    assert '"loggedIn": "true"' in script
+
+    session.invalidate()
+    assert not SessionStateManager(state_file).is_valid()
+    assert not session.inject(_FakeDriver())
+
+
+def _png(shade, marker=None):
+    """Small gradient PNG, optionally with one changed pixel"""
+    from PIL import Image
+
+    image = Image.new("L", (90, 80))
+    image.putdata([(x * 2 + shade) % 256 for y in range(80) for x in range(90)])
+    if marker is not None:
+        image.putpixel(marker, 255)
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+def test_screenshot_store_deduplicates_and_detects_changes(tmp_path):
+    """Identical and visually unchanged screenshots reuse the stored blob"""
+    store = ScreenshotStore(str(tmp_path / "screenshots"))
+
+    first = store.put(1, _png(0), "success")
+    same = store.put(1, _png(0), "success")
+    assert same["path"] == first["path"] and not same["changed"]
+
+    nearly_same = store.put(1, _png(0, marker=(45, 40)), "success")
+    assert nearly_same["visually_unchanged"] and nearly_same["path"] == first["path"]
+
+    from PIL import Image
+    flipped = io.BytesIO()
+    Image.open(io.BytesIO(_png(0))).transpose(Image.FLIP_LEFT_RIGHT).save(flipped, format="PNG")
+    changed = store.put(1, flipped.getvalue(), "failure")
+    assert changed["changed"] and not changed["visually_unchanged"]
+    assert changed["path"] != first["path"]
+
+    reloaded = ScreenshotStore(str(tmp_path / "screenshots"))
+    assert [v["status"] for v in reloaded.get_versions(1)] == ["success"] * 3 + ["failure"]
+    assert len(list((tmp_path / "screenshots" / "blobs").glob("*/*"))) == 2
+    assert reloaded.prune() == 0
+
+
+def test_screenshot_store_keeps_failure_capture_of_near_duplicate(tmp_path):
+    """A visually unchanged page whose check failed gets its own stored image"""
+    store = ScreenshotStore(str(tmp_path / "screenshots"))
+    good = store.put(1, _png(0), "success")
+
+    failed = store.put(1, _png(0, marker=(45, 40)), "failure")
+    assert failed["changed"] and not failed["visually_unchanged"]
+    assert failed["path"] != good["path"] and failed["hash"] != good["hash"]
+    assert os.path.exists(failed["path"])
+
+    again = store.put(1, _png(0, marker=(46, 40)), "failure")
+    assert again["visually_unchanged"] and again["path"] == failed["path"]
+
+
+def test_screenshot_store_encodes_outside_the_lock(tmp_path, monkeypatch):
+    """A slow encode does not block other checks' captures and lookups"""
+    import screenshot_store
+
+    store = ScreenshotStore(str(tmp_path / "screenshots"), image_format="webp")
+    store.put(2, _png(1), "success")
+    served = []
+
+    def slow_convert(png_bytes, image_format, quality):
+        lookup = threading.Thread(target=lambda: served.append(
+            store.last_good(2) is not None and store.should_capture(2, "success")))
+        lookup.start()
+        lookup.join(2)
+        return png_bytes
+
+    monkeypatch.setattr(screenshot_store, "_convert", slow_convert)
+    assert store.put_async(1, _png(0), "success").result(5)["path"].endswith(".webp")
+    assert served == [True]
+    assert [v["status"] for v in store.get_versions(1)] == ["success"]
+    store.close()
+
+
+def test_screenshot_index_is_shared_by_worker_processes(tmp_path):
+    """Stores saving the same index each keep the other's checks"""
+    first = ScreenshotStore(str(tmp_path / "screenshots"))
+    second = ScreenshotStore(str(tmp_path / "screenshots"))
+    first.put(1, _png(0), "success")
+    second.put(2, _png(1), "success")
+    first.put(1, _png(0), "success")
+
+    reloaded = ScreenshotStore(str(tmp_path / "screenshots"))
+    assert len(reloaded.get_versions(1)) == 2 and len(reloaded.get_versions(2)) == 1
+    assert reloaded.prune() == 0
+
+
+def test_screenshot_capture_policies_fall_back_to_last_good(tmp_path):
+    """Sampled and status-change policies skip captures and reuse the cached image"""
+    sampled = ScreenshotStore(str(tmp_path / "sampled"), capture_policy=CAPTURE_SAMPLED,
+                              sample_every=3)
+    assert sampled.should_capture(1, "success")  # Nothing cached yet
+    good = sampled.put_async(1, _png(0), "success").result()
+
+    decisions = [sampled.should_capture(1, "success") for _ in range(6)]
+    assert decisions == [False, False, True, False, False, True]
+    assert sampled.should_capture(1, "failure")
+    sampled.put(1, _png(0), "failure")
+    assert sampled.last_good(1)["path"] == good["path"]
+    sampled.close()
+
+    changes = ScreenshotStore(str(tmp_path / "changes"), capture_policy=CAPTURE_STATUS_CHANGE)
+    assert changes.should_capture(1, "success")
+    changes.put(1, _png(0), "success")
+    statuses = ["success", "failure", "failure", "success"]
+    assert [changes.should_capture(1, s) for s in statuses] == [False, True, False, True]
+
+
+class _FakeChrome:
+    """Headless Chrome stand-in for run_check: an activity form and a target tab"""
+
+    def __init__(self, options=None, service=None):
+        self.title = "Activity"
+        self.window_handles = ["form"]
+        self.switch_to = self
+        self.attached = []
+
+    def get(self, url):
+        pass
+
+    def window(self, handle):
+        pass
+
+    def find_element(self, by, value):
+        return _FakeElement(self, value)
+
+    def execute_script(self, script, *args):
+        if "window.open" in script:
+            self.window_handles.append("target")
+        return 0
+
+    def get_screenshot_as_png(self):
+        return _png(3)
+
+    def quit(self):
+        pass
+
+
+class _FakeElement:
+    def __init__(self, driver, element_id):
+        self.driver = driver
+        self.element_id = element_id
+
+    def get_attribute(self, name):
+        return "Check https://www.rbi.org.in today"
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def send_keys(self, value):
+        if self.element_id == "screenshot":
+            self.driver.attached.append(value)
+
+
+def test_run_check_captures_when_cached_screenshot_is_gone(tmp_path, monkeypatch):
+    """No fresh capture is planned, but the last-good image vanished: take a new one"""
+    import axis3_enhanced as crawler
+
+    drivers = []
+    monkeypatch.setattr(crawler.webdriver, "Chrome", lambda **kwargs: drivers.append(_FakeChrome()) or drivers[-1])
+    store = ScreenshotStore(str(tmp_path / "screenshots"), capture_policy=CAPTURE_SAMPLED, sample_every=100)
+    store.put(1, _png(0), "success")
+    monkeypatch.setattr(store, "last_good", lambda check_id: None)
+
+    results = []
+
+    class _Sink:
+        def put(self, alert_event, report_row=None):
+            results.append(alert_event)
+
+    crawler.run_check("https://example.org/activity1.html", 1, _Sink(), "exec-1", DefectInjector(enabled=False),
+                      probe=lambda url, metrics=None: (200, "Success"), screenshot_store=store)
+    store.close()
+
+    assert results[0]["status"] == "success"
+    assert len(store.get_versions(1)) == 2
+    assert drivers[0].attached == [os.path.abspath(store.latest(1)["path"])]
+
+
+def test_http_backend_emits_standard_alert_event():
+    """The HTTP backend reads the activity page without a browser"""
+    probed = []
+
+    def probe(url, metrics=None):
+        probed.append(url)
+        metrics["dns_time"] = 0.0
+        return 200, "Success"
+
+    results = []
+
+    class _Sink:
+        def put(self, alert_event, report_row=None):
+            results.append((alert_event, report_row))
+
+    backend = HttpBackend(probe)
+    activity_url = "file://" + os.path.abspath("activity1.html")
+    backend.run_check(activity_url, 1, _Sink(), "exec-1", DefectInjector(enabled=False))
+
+    assert probed == ["https://www.rbi.org.in"]
+    alert, row = results[0]
+    assert alert["status"] == "success" and alert["source"] == HTTP
+    assert alert["activity_name"] == "Account Verification"
+    assert {"alert_id", "response_time", "dns_time", "retry_count", "is_simulated"} <= set(alert)
+    assert row == ["https://www.rbi.org.in", 200, "Checked", "Success"]
+
+
+
+def test_activity_backends_come_from_the_rules(tmp_path):
+    """Rules pick their backend; production activities all stay on Selenium"""
+
+    assert set(load_activity_backends("alert_rules.yaml").values()) == {SELENIUM}
+
+    rules_file = tmp_path / "alert_rules.yaml"
+    rules_file.write_text('rules:\n'
+                          '  - activity_name: "Performance Metrics"\n'
+                          '    backend: "http"\n'
+                          '  - activity_name: "Account Verification"\n'
+                          '    backend: "telnet"\n'
+                          '  - activity_name: "Loan Application"\n')
+    assert load_activity_backends(str(rules_file)) == {
+        "Performance Metrics": HTTP,
+        "Account Verification": SELENIUM,
+        "Loan Application": SELENIUM
+    }
+
+
+def test_check_backend_requires_run_check():
+    """A backend without run_check cannot be built"""
+    from check_backends import CheckBackend
+
+    class _Incomplete(CheckBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        _Incomplete(probe=None)
+    with pytest.raises(TypeError):
+        CheckBackend(probe=None)
+
+
+def test_process_tree_sampler_measures_children():
+    """CPU time, RSS and child processes of a process tree are read from /proc"""
+    if not ProcessTreeSampler.available():
+        return
+
+    # Parent burns CPU while a child sleeps, like chromedriver -> Chrome
+    script = ("import subprocess, sys, time; "
+              "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(5)']); "
+              "end = time.time() + 0.3\n"
+              "while time.time() < end: pass\n"
+              "time.sleep(5)")
+    parent = subprocess.Popen([sys.executable, "-c", script])
+    try:
+        sampler = ProcessTreeSampler(parent.pid, interval=0.05).start()
+        time.sleep(0.6)
+        usage = sampler.stop()
+        assert len(read_process_tree(parent.pid)) == 2
+    finally:
+        for pid in read_process_tree(parent.pid):
+            if pid != parent.pid:
+                os.kill(pid, 9)
+        parent.kill()
+        parent.wait()
+
+    assert usage["child_processes"] == 1
+    assert usage["cpu_time"] > 0.1
+    assert usage["peak_rss_mb"] > 1
+    assert read_process_tree(parent.pid) == {}
+
+
+def test_cycle_stats_aggregate_resource_usage():
+    """Per-check usage is rolled up per activity and per cycle"""
+    stats = CycleStats()
+    for cpu, rss in [(1.0, 300.0), (2.0, 450.0)]:
+        stats.consume({"alert": {"activity_name": "Account Verification", "status": "success",
+                                 "cpu_time": cpu, "peak_rss_mb": rss, "child_processes": 8,
+                                 "network_bytes": 1000}})
+    stats.consume({"alert": {"activity_name": "Security Scan", "status": "error"}})
+
+    usage = stats.resource_usage
+    assert usage["checks_measured"] == 2
+    assert usage["cpu_time_total"] == 3.0
+    assert usage["peak_rss_mb_max"] == 450.0
+    assert usage["by_activity"]["Account Verification"]["network_bytes"] == 2000
+    assert "Security Scan" not in usage["by_activity"]
+
+
+def test_benchmark_crawls_synthetic_activities():
+    """The harness serves generated activities and measures the crawl"""
+    profile = TargetProfile(latency_ms=5, latency_sigma=0, error_rate=0.5, large_body_rate=0)
+    result = run_benchmark(20, workers=4, profile=profile, seed=1)
+
+    assert sum(result["by_status"].values()) == 20
+    assert set(result["by_status"]) == {"success", "failure"}
+    assert result["checks_per_sec"] > 0
+    assert 0.005 <= result["p50_latency"] <= result["p95_latency"] <= result["p99_latency"]
+    assert percentile([3, 1, 2, 4], 50) == 2
+
+
+def test_cassette_replays_recorded_cycle_offline(tmp_path):
+    """A recorded cycle replays with the same results, without network, at either pace"""
+    calls = {}
+
+    def probe(url, metrics=None):
+        calls[url] = calls.get(url, 0) + 1
+        time.sleep(0.05)
+        if metrics is not None:
+            metrics["dns_time"] = 0.001
+        if url == "https://www.bis.org" and calls[url] == 1:
+            return 503, "Service Unavailable"
+        return 200, "Success"
+
+    class _Sink:
+        def __init__(self):
+            self.alerts = []
+
+        def put(self, alert_event, report_row=None):
+            self.alerts.append(alert_event)
+
+    def outcome(sink):
+        return sorted((a["check_id"], a["url"], a["status"], a["response_code"], a["retry_count"],
+                       a["is_simulated"], a["error_message"]) for a in sink.alerts)
+
+    retry_queue = RetryQueue(probe, RetryPolicy(max_attempts=3, base_delay=0.05, jitter=0))
+    recorder = CassetteRecorder("exec-rec")
+    backend = recorder.wrap_backend(HttpBackend(probe, retry_queue=retry_queue))
+    injector = DefectInjector(seed=11, config={"enabled": True, "defects": {"TIMEOUT": {"percentage": 40}}})
+    injector.plan_batch(list(range(1, 8)), [f"Activity {i}" for i in range(1, 8)], time.time())
+    check_injector = recorder.wrap_injector(injector)
+
+    recorded = _Sink()
+    started = time.monotonic()
+    for i in range(1, 8):
+        backend.run_check("file://" + os.path.abspath(f"activity{i}.html"), i, recorded, "exec-rec", check_injector)
+    recorded_seconds = time.monotonic() - started
+    retry_queue.close()
+    cassette_file = str(tmp_path / "cycle.cassette")
+    summary = recorder.save(cassette_file)
+    assert summary["checks"] == 7 and summary["distinct_pages"] == 7 and summary["retried"] == 1
+
+    calls.clear()
+    cassette = Cassette.load(cassette_file)
+    fast = _Sink()
+    started = time.monotonic()
+    replay_cycle(cassette, fast, execution_id="exec-rec")
+    assert time.monotonic() - started < recorded_seconds / 2
+    assert calls == {}
+    assert outcome(fast) == outcome(recorded)
+    assert any(a["retry_count"] == 1 and a["url"] == "https://www.bis.org" for a in fast.alerts)
+
+    paced = _Sink()
+    started = time.monotonic()
+    replay_cycle(cassette, paced, realtime=True, workers=1)
+    assert time.monotonic() - started >= recorded_seconds * 0.8
+    assert outcome(paced) == outcome(recorded)
+
+
+if __name__ == "__main__":
+    import inspect
+    import pathlib
+    import tempfile
+
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            if "tmp_path" in inspect.signature(func).parameters:
+                with tempfile.TemporaryDirectory() as tmp:
+                    func(pathlib.Path(tmp))
+            else:
+                func()
+            print(f"✅ {name}")
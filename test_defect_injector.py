@@ -0,0 +1,279 @@
+"""
+Tests for defect planning: reproducible per-check streams, batch plans and
+virtual-time simulation
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from defect_injector import DefectInjector, DefectSimulator, _uniform, _uniform_array
+from sim_clock import VirtualClock, replay_cycles
+from alert_stream import AlertStreamGenerator, load_test, send_to_socket, write_file
+
+
+CYCLE = datetime(2024, 3, 4, 10, 0)
+
+
+def _names(check_ids):
+    return [f"Activity {i}" for i in check_ids]
+
+
+def test_plan_batch_is_reproducible_per_seed():
+    """Same seed, same plan; another seed gives another plan"""
+    check_ids = list(range(1, 501))
+    first = DefectInjector(seed=7).plan_batch(check_ids, _names(check_ids), CYCLE)
+    second = DefectInjector(seed=7).plan_batch(check_ids, _names(check_ids), CYCLE)
+    other = DefectInjector(seed=8).plan_batch(check_ids, _names(check_ids), CYCLE)
+
+    assert first == second
+    assert first != other
+
+
+def test_plan_batch_does_not_depend_on_batch_composition():
+    """A check's defect depends only on its own stream, not on its neighbours"""
+    check_ids = list(range(1, 201))
+    full = DefectInjector(seed=3).plan_batch(check_ids, _names(check_ids), CYCLE)
+
+    subset = check_ids[::-7]
+    partial = DefectInjector(seed=3).plan_batch(subset, _names(subset), CYCLE)
+    assert partial == [full[i - 1] for i in subset]
+
+
+def test_plan_batch_honours_configured_eligibility():
+    """Activity 1 on Monday mornings: only TIMEOUT, SLOW_RESPONSE and ALERT_STORM apply"""
+    count = 20000
+    weeks = [CYCLE + timedelta(weeks=i) for i in range(count)]
+    plan = DefectInjector(seed=1).plan_batch([1] * count, ["Account Verification"] * count, weeks)
+
+    counts = {}
+    for defect in plan:
+        counts[defect["type"] if defect else None] = counts.get(defect["type"] if defect else None, 0) + 1
+    assert set(counts) == {"TIMEOUT", "SLOW_RESPONSE", "ALERT_STORM", None}
+    assert abs(counts["SLOW_RESPONSE"] / count - 0.20) < 0.015
+    assert abs(counts["ALERT_STORM"] / count - 0.05) < 0.01
+    assert abs(counts[None] / count - 0.60) < 0.015
+
+    slow = [d["response_time"] for d in plan if d and d["type"] == "SLOW_RESPONSE"]
+    assert 5.5 <= min(slow) and max(slow) < 12.0
+
+
+def test_eligibility_table_compiles_configuration():
+    from defect_injector import DefectConfiguration, DefectEligibilityTable
+
+    table = DefectEligibilityTable(DefectConfiguration.get_default_config())
+    assert table.lookup(6, 22, 7) == {"FALSE_POSITIVE": 8, "CONNECTION_ERROR": 12}
+    assert table.lookup(4, 9, 5) == {"CONNECTION_ERROR": 12}       # No slow responses on Fridays
+    assert table.lookup(0, 9, 42) == {}                            # Unknown activity
+    assert len(table.distributions) < 20                           # Shared between cells
+
+
+def test_rules_file_block_applies_to_injector():
+    from defect_injector import DefectConfiguration
+
+    config = DefectConfiguration.from_rules_file("alert_rules.yaml")
+    total = sum(d["percentage"] for d in config["defects"].values())
+    assert abs(total - 25) < 1e-9
+    assert 10 in config["defects"]["TIMEOUT"]["exclude_hours"]
+
+    injector = DefectInjector(seed=2, config=dict(config, exclude_activities=[3, "Security Scan"]))
+    business_hours = datetime(2024, 3, 5, 10, 0)
+    assert injector.plan_batch([1] * 1, ["Account Verification"], business_hours) == [None]
+    evening = [datetime(2024, 3, 5, 20, 0) + timedelta(weeks=i) for i in range(500)]
+    assert not any(injector.plan_batch([3] * 500, ["Loan Application Check"] * 500, evening))
+    assert not any(injector.plan_batch([6] * 500, ["Security Scan"] * 500, evening))
+    assert any(injector.plan_batch([5] * 500, ["Compliance Audit"] * 500, evening))
+
+
+def test_get_defect_returns_planned_defect_once():
+    injector = DefectInjector(seed=5)
+    plan = injector.plan_batch([1, 2, 3], _names([1, 2, 3]), CYCLE.timestamp())
+
+    assert [injector.get_defect(i, f"Activity {i}") for i in (1, 2, 3)] == plan
+    assert 1 not in injector._planned
+
+
+def test_seed_does_not_touch_global_random():
+    random.seed(99)
+    expected = random.random()
+
+    random.seed(99)
+    DefectInjector(seed=1).get_defect(1, "Activity 1")
+    assert random.random() == expected
+
+
+def test_plan_batch_rejects_mismatched_lengths():
+    with pytest.raises(ValueError):
+        DefectInjector(seed=1).plan_batch([1, 2], ["Activity 1"], [CYCLE, CYCLE])
+
+
+def test_vectorized_streams_match_pure_python():
+    np = pytest.importorskip("numpy")
+    keys = [random.Random(i).getrandbits(64) for i in range(1000)]
+    for index in (0, 1):
+        vectorized = _uniform_array(np, np.array(keys, dtype=np.uint64), index).tolist()
+        assert vectorized == [_uniform(key, index) for key in keys]
+
+
+def test_virtual_clock_turns_simulated_delays_into_virtual_time():
+    clock = VirtualClock(CYCLE)
+    started = time.monotonic()
+
+    with pytest.raises(TimeoutError):
+        DefectSimulator.simulate_timeout(clock=clock)
+    response_time = DefectSimulator.simulate_slow_response(clock=clock)
+
+    assert time.monotonic() - started < 0.5
+    assert 10 + response_time - 1.0 <= clock.monotonic() <= 15 + response_time
+    assert clock.now() == CYCLE + timedelta(seconds=clock.monotonic())
+
+
+def test_assessor_frequency_window_follows_event_time():
+    from alert_engine import AlertAssessor
+
+    clock = VirtualClock(CYCLE)
+    assessor = AlertAssessor(clock=clock)
+    alert = {"activity_name": "Security Scan", "timestamp": CYCLE.isoformat()}
+    for _ in range(12):
+        assessor._check_frequency(dict(alert))
+    assert assessor._check_frequency(dict(alert))["exceeded"]
+
+    later = dict(alert, timestamp=(CYCLE + timedelta(seconds=301)).isoformat())
+    assert assessor._check_frequency(later)["count_5_min"] == 0
+
+    # Alerts without a usable timestamp fall back to the clock
+    clock.advance(301)
+    assert assessor._check_frequency(dict(alert, timestamp=None))["count_5_min"] == 1
+
+
+def test_scheduler_lane_timings_use_the_clock():
+    from check_scheduler import CheckScheduler
+
+    clock = VirtualClock(CYCLE)
+    scheduler = CheckScheduler(max_workers=1, reserved_workers=0, clock=clock)
+    scheduler.submit(DefectSimulator.simulate_slow_response, kwargs={"clock": clock})
+    scheduler.run()
+    assert scheduler.get_lane_stats()["normal"]["last_finished_after"] >= 5.0
+
+
+def test_replay_day_with_maintenance_window_runs_in_seconds():
+    """A Sunday of 10-minute cycles, storms and maintenance window included"""
+    sunday = datetime(2024, 3, 10)
+    started = time.monotonic()
+    summary = replay_cycles(days=1, interval_minutes=10, start=sunday, seed=4)
+
+    assert time.monotonic() - started < 10
+    assert summary["cycles"] == 144
+    assert summary["virtual_seconds"] >= 143 * 600
+    assert summary["suppressed"] > 0          # Sunday 22:00-23:59
+    assert summary["deduplicated"] > 0        # Alert storms
+    assert replay_cycles(days=1, start=sunday, seed=4)["defects"] == summary["defects"]
+
+
+def _only(defect_type, **settings):
+    return DefectInjector(seed=1, config={"enabled": True, "defects": {defect_type: dict(percentage=100, **settings)}})
+
+
+def test_alert_stream_expands_storms_and_cascades():
+    storm = list(AlertStreamGenerator(start=CYCLE, injector=_only("ALERT_STORM")).events(200))
+    first = [a for a in storm if a["check_id"] == 1]
+    assert 50 <= len(first) <= 100
+    assert all(a["status"] == "failure" and a["is_simulated"] for a in storm)
+    assert [a["timestamp"] for a in storm] == sorted(a["timestamp"] for a in storm)
+
+    cascade = list(AlertStreamGenerator(start=CYCLE, injector=_only("CONNECTION_ERROR"),
+                                        cascade_rate=1.0).events(7))
+    assert cascade[0]["error_message"].startswith("Network unreachable")
+    assert sorted(a["check_id"] for a in cascade) == list(range(1, 8))
+
+    duplicates = list(AlertStreamGenerator(start=CYCLE, injector=_only("DUPLICATE_ALERT")).events(3))
+    assert {a["error_message"] for a in duplicates} == {"Service Unavailable"}
+    assert len({a["alert_id"] for a in duplicates}) == 3
+
+
+def test_alert_stream_is_reproducible_and_follows_maintenance_window():
+    sunday_evening = datetime(2024, 3, 10, 22, 0)
+    first = list(AlertStreamGenerator(start=sunday_evening, seed=9).events(5000))
+    second = list(AlertStreamGenerator(start=sunday_evening, seed=9).events(5000))
+    assert first == second
+
+    false_positives = [a for a in first if a["response_code"] == 503 and "maintenance" in a["error_message"]]
+    assert false_positives
+    monday = list(AlertStreamGenerator(start=CYCLE, seed=9).events(5000))
+    assert not any("maintenance" in a["error_message"] for a in monday)
+
+
+def test_alert_stream_sinks(tmp_path):
+    import json
+    import socket
+    import threading
+
+    events = list(AlertStreamGenerator(start=CYCLE, seed=2).events(300))
+    assert write_file(iter(events), str(tmp_path / "alerts.jsonl")) == 300
+    with open(tmp_path / "alerts.jsonl") as f:
+        assert [json.loads(line) for line in f] == events
+    write_file(iter(events), str(tmp_path / "raw_alerts.json"))
+    with open(tmp_path / "raw_alerts.json") as f:
+        assert json.load(f) == events
+
+    server = socket.create_server(("127.0.0.1", 0))
+    received = []
+
+    def collect():
+        conn, _ = server.accept()
+        with conn, conn.makefile("rb") as lines:
+            received.extend(json.loads(line) for line in lines)
+
+    collector = threading.Thread(target=collect)
+    collector.start()
+    assert send_to_socket(iter(events), f"127.0.0.1:{server.getsockname()[1]}") == 300
+    collector.join(5)
+    server.close()
+    assert received == events
+
+
+def test_alert_stream_load_test_detects_storms():
+    result = load_test(AlertStreamGenerator(start=CYCLE, seed=3).events(3000), batch_size=500)
+    assert result["alerts"] == 3000
+    assert result["deduplicated"] > 0
+    assert result["engine_alerts_per_sec"] > 0
+
+
+def test_alert_stream_load_test_stores_one_batch_per_save(tmp_path):
+    from database import AlertDatabase
+
+    saves = []
+    original = AlertDatabase._save_database
+
+    def counting_save(db):
+        saves.append(len(db.data["alerts"]))
+        original(db)
+
+    AlertDatabase._save_database = counting_save
+    try:
+        db_file = str(tmp_path / "alerts.json")
+        result = load_test(AlertStreamGenerator(start=CYCLE, seed=3).events(1200), batch_size=500,
+                           db_file=db_file)
+    finally:
+        AlertDatabase._save_database = original
+
+    assert saves == [500, 1000, 1200]
+    assert result["storage_alerts_per_sec"] > 0
+    assert len(AlertDatabase(db_file).data["alerts"]) == 1200
+
+
+if __name__ == "__main__":
+    import inspect
+    import pathlib
+    import tempfile
+
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            if "tmp_path" in inspect.signature(func).parameters:
+                with tempfile.TemporaryDirectory() as tmp:
+                    func(pathlib.Path(tmp))
+            else:
+                func()
+            print(f"✅ {name}")
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Test script for the link probing layer (retries, breakers, rate limits, DNS,
+content assertions)
+"""
+
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from retry_queue import RetryQueue, RetryPolicy
+from circuit_breaker import CircuitBreakerRegistry, CIRCUIT_OPEN_REASON
+from rate_limiter import DomainRateLimiter, TokenBucket
+import dns_cache
+from content_assertions import ContentAssertion, ContentAssertionRegistry, CONTENT_VIOLATION_REASON
+
+
+def _flaky_probe(failures):
+    """Probe that fails the given number of times, then succeeds"""
+    calls = {"count": 0}
+    lock = threading.Lock()
+
+    def probe(url):
+        with lock:
+            calls["count"] += 1
+            if calls["count"] <= failures:
+                return 503, "Failed"
+        return 200, "Success"
+
+    return probe, calls
+
+
+def test_retry_queue_recovers_transient_failure():
+    """A failure that recovers on retry is reported as success"""
+    probe, calls = _flaky_probe(failures=1)
+    queue = RetryQueue(probe, RetryPolicy(max_attempts=3, base_delay=0.01), seed=1)
+
+    status_code, reason, attempts = queue.confirm("https://example.org", 503, "Failed")
+    queue.close()
+
+    assert status_code == 200
+    assert attempts == 3
+    assert calls["count"] == 2
+
+
+def test_retry_queue_confirms_persistent_failure():
+    """A failure that never recovers is confirmed after max_attempts"""
+    probe, calls = _flaky_probe(failures=100)
+    queue = RetryQueue(probe, RetryPolicy(max_attempts=3, base_delay=0.01), seed=1)
+
+    status_code, reason, attempts = queue.confirm("https://example.org", 503, "Failed")
+    queue.close()
+
+    assert status_code == 503
+    assert attempts == 3
+    assert calls["count"] == 2
+
+
+def test_retry_queue_checks_content_assertions_on_retry():
+    """A retry that recovers the status still evaluates the page body"""
+    seen = []
+
+    def probe(url, assertions=None):
+        seen.append(assertions)
+        return 200, f"{CONTENT_VIOLATION_REASON}: found 'Maintenance'"
+
+    assertion = ContentAssertion(must_not_contain=["Maintenance"])
+    queue = RetryQueue(probe, RetryPolicy(max_attempts=3, base_delay=0.01), seed=1)
+    status_code, reason, attempts = queue.confirm("https://example.org", 503, "Failed", assertion)
+    queue.close()
+
+    assert seen == [assertion]
+    assert status_code == 200 and reason.startswith(CONTENT_VIOLATION_REASON)
+
+
+def test_retry_queue_skips_successes():
+    """Successful probes never enter the queue"""
+    probe, calls = _flaky_probe(failures=0)
+    queue = RetryQueue(probe, RetryPolicy(max_attempts=3, base_delay=0.01))
+
+    assert queue.confirm("https://example.org", 200, "Success") == (200, "Success", 1)
+    queue.close()
+    assert calls["count"] == 0
+
+
+def test_retry_queue_hedges_slow_retry():
+    """A hedged probe answers when the primary retry hangs"""
+    calls = {"count": 0}
+    lock = threading.Lock()
+
+    def probe(url):
+        with lock:
+            calls["count"] += 1
+            first = calls["count"] == 1
+        if first:
+            time.sleep(0.5)
+            return None, "timeout"
+        return 200, "Success"
+
+    policy = RetryPolicy(max_attempts=2, base_delay=0.01, hedge_after=0.05)
+    queue = RetryQueue(probe, policy)
+
+    started = time.monotonic()
+    status_code, _, attempts = queue.confirm("https://example.org", None, "timeout")
+    elapsed = time.monotonic() - started
+    queue.close()
+
+    assert status_code == 200
+    assert attempts == 2
+    assert elapsed < 0.5
+
+
+def test_circuit_breaker_opens_and_trials(tmp_path):
+    """Breaker opens after N failures and allows a single half-open trial"""
+    state_file = str(tmp_path / "breakers.json")
+    breakers = CircuitBreakerRegistry(state_file, failure_threshold=2, reset_timeout=0.05)
+    url = "https://bank.example.org/login"
+
+    breakers.record(url, None)
+    assert breakers.allow(url)[0]
+    breakers.record(url, 503)
+
+    allowed, reason = breakers.allow("https://bank.example.org/other")
+    assert not allowed
+    assert reason.startswith(CIRCUIT_OPEN_REASON)
+
+    time.sleep(0.06)
+    assert breakers.allow(url)[0]
+
+    # A probe arriving during the trial waits for its outcome instead of failing
+    waiting = []
+    waiter = threading.Thread(target=lambda: waiting.append(breakers.allow(url)))
+    waiter.start()
+    time.sleep(0.05)
+    assert waiting == []
+
+    breakers.record(url, 200)
+    waiter.join(1)
+    assert waiting == [(True, "")]
+    assert breakers.allow(url)[0]
+    assert breakers.get_open_hosts() == {}
+
+
+def test_circuit_breaker_waiting_probe_sees_failed_trial(tmp_path):
+    breakers = CircuitBreakerRegistry(str(tmp_path / "breakers.json"), failure_threshold=1, reset_timeout=0.05)
+    url = "https://bank.example.org/login"
+    breakers.record(url, None)
+    time.sleep(0.06)
+    assert breakers.allow(url)[0]
+
+    waiting = []
+    waiter = threading.Thread(target=lambda: waiting.append(breakers.allow(url)))
+    waiter.start()
+    time.sleep(0.02)
+    breakers.record(url, 503)
+    waiter.join(1)
+    assert not waiting[0][0] and "next trial" in waiting[0][1]
+
+
+def test_circuit_breaker_default_outlasts_the_cycle_interval(tmp_path):
+    """A breaker saved at the end of one 10-minute cycle is still open in the next"""
+    state_file = str(tmp_path / "breakers.json")
+    breakers = CircuitBreakerRegistry(state_file, failure_threshold=1)
+    breakers.record("https://down.example.org", None)
+    breakers.breakers["down.example.org"]["opened_at"] -= 600
+    breakers.save()
+
+    assert not CircuitBreakerRegistry.from_env(state_file).allow("https://down.example.org/page")[0]
+
+
+def test_circuit_breaker_state_persists(tmp_path):
+    """Open breakers survive a save/load round trip"""
+    state_file = str(tmp_path / "breakers.json")
+    breakers = CircuitBreakerRegistry(state_file, failure_threshold=1, reset_timeout=300)
+    breakers.record("https://down.example.org", None)
+    breakers.save()
+
+    reloaded = CircuitBreakerRegistry(state_file, failure_threshold=1, reset_timeout=300)
+    assert not reloaded.allow("https://down.example.org/page")[0]
+    assert reloaded.allow("https://up.example.org")[0]
+
+
+def test_circuit_breaker_saves_merge_across_worker_processes(tmp_path):
+    """A worker saving stale state does not close a breaker another worker opened"""
+    state_file = str(tmp_path / "breakers.json")
+    first = CircuitBreakerRegistry(state_file, failure_threshold=1)
+    second = CircuitBreakerRegistry(state_file, failure_threshold=1)
+
+    first.record("https://down.example.org", None)
+    first.save()
+    second.record("https://up.example.org", 200)
+    second.save()
+
+    reloaded = CircuitBreakerRegistry(state_file, failure_threshold=1)
+    assert not reloaded.allow("https://down.example.org/page")[0]
+    assert "up.example.org" in reloaded.breakers
+
+    # A newer outcome for the same host still wins
+    reloaded.record("https://down.example.org", 200)
+    reloaded.save()
+    first.save()
+    assert CircuitBreakerRegistry(state_file).allow("https://down.example.org/page")[0]
+
+
+def test_token_bucket_allows_burst_then_throttles():
+    """Burst is served immediately, the next request waits for a refill"""
+    bucket = TokenBucket(rate=20, burst=3)
+
+    for _ in range(3):
+        acquired, waited = bucket.acquire()
+        assert acquired and waited == 0
+
+    acquired, waited = bucket.acquire(timeout=0)
+    assert not acquired
+
+    acquired, waited = bucket.acquire()
+    assert acquired and 0 < waited <= 0.06
+
+
+def test_rate_limits_reject_non_positive_rates():
+    """A zero or negative rate fails at configuration time, not on a throttled probe"""
+    for rate in (0, -1):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=rate, burst=1)
+        with pytest.raises(ValueError):
+            DomainRateLimiter(domain_limits={"rbi.org.in": {"rate": rate, "burst": 1}})
+    with pytest.raises(ValueError):
+        DomainRateLimiter(default_rate=0)
+
+
+def test_domain_rate_limiter_shares_bucket_across_subdomains():
+    """Configured domains cover their subdomains, others use the default"""
+    limiter = DomainRateLimiter(default_rate=100, default_burst=5,
+                                domain_limits={"rbi.org.in": {"rate": 1, "burst": 1}})
+
+    assert limiter.acquire("https://www.rbi.org.in/page") == (True, 0.0)
+    assert limiter.acquire("https://rbi.org.in", timeout=0)[0] is False
+    assert limiter.acquire("https://www.swift.com", timeout=0)[0] is True
+    assert set(limiter.buckets) == {"rbi.org.in", "www.swift.com"}
+
+
+def test_rate_limits_load_from_rules_file():
+    """The rate_limits block in alert_rules.yaml is picked up"""
+    limiter = DomainRateLimiter.from_config("alert_rules.yaml")
+    assert "rbi.org.in" in limiter.domain_limits
+
+
+def _with_fake_resolver(test):
+    """Run test against a counting fake system resolver"""
+    calls = []
+
+    def fake_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+        calls.append(host)
+        if host.endswith(".invalid"):
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("192.0.2.1", port))]
+
+    original = dns_cache._system_getaddrinfo
+    dns_cache._system_getaddrinfo = fake_getaddrinfo
+    try:
+        test(calls)
+    finally:
+        dns_cache._system_getaddrinfo = original
+
+
+def test_dns_cache_hits_and_negative_caching():
+    """Repeated lookups hit the cache, NXDOMAIN answers are cached too"""
+    def test(calls):
+        cache = dns_cache.DNSCache(default_ttl=60, negative_ttl=60)
+        for _ in range(3):
+            assert cache.getaddrinfo("www.rbi.org.in", 443)[0][4] == ("192.0.2.1", 443)
+        for _ in range(2):
+            try:
+                cache.getaddrinfo("bank.invalid", 443)
+                assert False, "expected gaierror"
+            except socket.gaierror:
+                pass
+
+        assert calls == ["www.rbi.org.in", "bank.invalid"]
+        assert cache.stats["hits"] == 2
+        assert cache.stats["negative_hits"] == 1
+        assert cache.take_resolution_time() > 0
+        assert cache.take_resolution_time() == 0
+
+    _with_fake_resolver(test)
+
+
+def test_dns_cache_serves_stale_while_revalidating():
+    """Expired entries are served immediately and refreshed in the background"""
+    def test(calls):
+        cache = dns_cache.DNSCache(default_ttl=0, min_ttl=0, stale_ttl=60)
+        cache.getaddrinfo("www.swift.com", 443)
+        cache.getaddrinfo("www.swift.com", 443)
+
+        deadline = time.monotonic() + 1
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert cache.stats["stale_hits"] == 1
+        assert calls == ["www.swift.com", "www.swift.com"]
+        assert cache.getaddrinfo("127.0.0.1", 80)[0][4][0] == "192.0.2.1"  # bypasses cache
+        assert "127.0.0.1" not in [key[0] for key in cache.entries]
+
+    _with_fake_resolver(test)
+
+
+def test_dns_cache_only_serves_lookups_inside_active():
+    """The installed hook leaves lookups outside the probe scope to the system resolver"""
+    def test(calls):
+        cache = dns_cache.install(dns_cache.DNSCache(default_ttl=60))
+        socket.getaddrinfo("api.github.com", 443)
+        socket.getaddrinfo("api.github.com", 443)
+        assert cache.entries == {} and calls == ["api.github.com", "api.github.com"]
+
+        with cache.active():
+            socket.getaddrinfo("www.rbi.org.in", 443)
+            socket.getaddrinfo("www.rbi.org.in", 443)
+        assert cache.stats["hits"] == 1 and calls.count("www.rbi.org.in") == 1
+
+        worker = threading.Thread(target=socket.getaddrinfo, args=("www.rbi.org.in", 443))
+        with cache.active():
+            worker.start()
+            worker.join()
+        assert calls.count("www.rbi.org.in") == 2  # Other threads are not in scope
+
+    system_getaddrinfo = socket.getaddrinfo
+    try:
+        _with_fake_resolver(test)
+    finally:
+        dns_cache.uninstall()
+    assert socket.getaddrinfo is system_getaddrinfo
+    assert dns_cache.installed_cache() is None
+
+
+def _chunks(parts, consumed):
+    for part in parts:
+        consumed.append(part)
+        yield part
+
+
+def test_content_assertion_stops_reading_once_decided():
+    """Keywords split across chunks match, and reading stops when all are found"""
+    assertion = ContentAssertion(must_contain=["Reserve Bank", "RBI"], min_bytes=10)
+    consumed = []
+    parts = [b"<h1>Reserve Ba", b"nk of India</h1>", b"<p>rbi notices</p>", b"x" * 1000, b"y" * 1000]
+
+    violations, size = assertion.evaluate(_chunks(parts, consumed))
+
+    assert violations == []
+    assert len(consumed) == 3
+    assert size == sum(len(p) for p in parts[:3])
+
+
+def test_content_assertion_reports_violations():
+    """Error banners stop reading immediately; missing keywords and size are reported"""
+    banner = ContentAssertion(must_contain=["Welcome"], must_not_contain=["Service Unavailable"])
+    consumed = []
+    violations, _ = banner.evaluate(_chunks([b"<h1>503 Service Unavailable</h1>", b"more"], consumed))
+    assert len(consumed) == 1
+    assert violations == ["found 'Service Unavailable'", "missing 'Welcome'"]
+
+    small = ContentAssertion(min_bytes=100)
+    assert small.evaluate([b"tiny"])[0] == ["body 4 bytes, expected at least 100"]
+
+    large = ContentAssertion(max_bytes=5)
+    assert large.evaluate([b"0123", b"4567", b"89"])[0] == ["body larger than 5 bytes"]
+
+
+def test_content_assertion_matches_overlapping_keywords():
+    """A keyword that is a prefix of another is still found, in either order"""
+    for banners in (["Error", "Error 500"], ["Error 500", "Error"]):
+        assertion = ContentAssertion(must_contain=["Error 500 page"], must_not_contain=banners)
+        violations, _ = assertion.evaluate([b"<h1>Error 500 page</h1>"])
+        assert violations == [f"found '{banners[0]}'"]
+
+    nested = ContentAssertion(must_contain=["Reserve Bank of India", "Bank"])
+    assert nested.evaluate([b"Reserve Bank of India"])[0] == []
+
+
+def test_content_assertions_load_from_rules_file():
+    """Rules with a content_assertions block are compiled per activity"""
+    registry = ContentAssertionRegistry.from_config("alert_rules.yaml")
+    assert registry.for_activity("Account Verification").must_contain
+    assert registry.for_activity("Compliance Audit") is None
+
+
+class _BannerPage(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"<html><body><div class='error'>Service Unavailable</div></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_check_link_flags_http_200_with_broken_content():
+    """check_link streams the body and reports a content violation"""
+    from axis3_enhanced import check_link
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _BannerPage)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+    try:
+        assertion = ContentAssertion(must_not_contain=["Service Unavailable"])
+        status_code, reason = check_link(url, assertions=assertion)
+        assert status_code == 200
+        assert reason.startswith(CONTENT_VIOLATION_REASON)
+        assert check_link(url) == (200, "Success")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_fault_server_reproduces_defects_on_the_wire():
+    """Each simulated defect type fails check_link the way a real outage would"""
+    from axis3_enhanced import check_link
+    from fault_server import FaultSchedule, FaultServer
+
+    defects = {
+        "TIMEOUT": {"percentage": 100, "activity_ids": [1]},
+        "CONNECTION_ERROR": {"percentage": 100, "activity_ids": [2]},
+        "FALSE_POSITIVE": {"percentage": 100, "activity_ids": [3]},
+        "DUPLICATE_ALERT": {"percentage": 100, "activity_ids": [4]},
+        "SLOW_RESPONSE": {"percentage": 100, "activity_ids": [5], "threshold_ms": 5000}
+    }
+    server = FaultServer(FaultSchedule({"enabled": True, "defects": defects}, seed=1),
+                         time_scale=0.01).start()
+    try:
+        assert check_link(server.url_for(1))[0] is None       # Black hole: no response
+        assert check_link(server.url_for(2))[0] is None       # Reset
+        assert check_link(server.url_for(3)) == (503, "Failed")
+        assert check_link(server.url_for(4))[0] is None       # Truncated body
+
+        started = time.monotonic()
+        assert check_link(server.url_for(5)) == (200, "Success")
+        assert time.monotonic() - started >= 0.055           # 5.5s+ scaled by 0.01
+
+        assert check_link(server.url_for(6)) == (200, "Success")
+        assert server.stats == {"black_hole": 1, "reset": 1, "http_error": 1,
+                                "partial_body": 1, "slow": 1, "ok": 1}
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    import inspect
+    import pathlib
+    import tempfile
+
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            if "tmp_path" in inspect.signature(func).parameters:
+                with tempfile.TemporaryDirectory() as tmp:
+                    func(pathlib.Path(tmp))
+            else:
+                func()
+            print(f"✅ {name}")
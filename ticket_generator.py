@@ -203,6 +203,8 @@ class GitHubTicketGenerator:
         # Status label
         if alert["status"] == "failure":
             labels.append("failure")
+        elif alert["status"] == "content_violation":
+            labels.append("content-violation")
         elif alert["status"] == "error":
             labels.append("error")
         
@@ -160,7 +160,7 @@ class Validator:
             if field not in alert:
                 return False, f"Missing required field: {field}"
         
-        if alert["status"] not in ["success", "failure", "error"]:
+        if alert["status"] not in ["success", "failure", "content_violation", "error"]:
             return False, f"Invalid status: {alert['status']}"
         
         return True, "Valid"
@@ -0,0 +1,488 @@
+"""
+Work Queue Module
+Durable SQLite-backed job queue for spreading activity checks over several
+worker processes or machines
+
+Workers lease jobs, heartbeat while running them and write results back.
+Leases that expire (crashed or stuck worker) are re-queued automatically.
+
+Usage:
+    python work_queue.py enqueue     # Queue this cycle's activity checks
+    python work_queue.py worker      # Run worker process(es) until idle
+    python work_queue.py collect     # Write finished results to raw_alerts.json
+"""
+
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+# Seconds a worker waits for new work before exiting
+DEFAULT_IDLE_TIMEOUT = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    execution_id TEXT NOT NULL,
+    check_id INTEGER NOT NULL,
+    activity_url TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    enqueued_at REAL NOT NULL,
+    finished_at REAL,
+    results TEXT,
+    error TEXT,
+    UNIQUE (execution_id, check_id)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state, priority DESC, job_id);
+"""
+
+
+class WorkQueue:
+    """Job queue with leases, heartbeats and expiry-based re-queueing"""
+
+    def __init__(self, db_path: str = "crawl_queue.db", lease_seconds: float = 120,
+                 max_attempts: int = 3):
+        """
+        Args:
+            db_path: SQLite database file (on a shared filesystem for multi-node use)
+            lease_seconds: How long a lease lasts without a heartbeat
+            max_attempts: Leases per job before it is marked failed
+        """
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+        self._connection().executescript(SCHEMA)
+
+    @staticmethod
+    def from_env() -> "WorkQueue":
+        """Build queue from WORK_QUEUE_* environment variables"""
+
+        return WorkQueue(
+            db_path=os.getenv('WORK_QUEUE_DB', 'crawl_queue.db'),
+            lease_seconds=float(os.getenv('WORK_QUEUE_LEASE_SECONDS', '120')),
+            max_attempts=int(os.getenv('WORK_QUEUE_MAX_ATTEMPTS', '3'))
+        )
+
+    def enqueue(self, execution_id: str, jobs: List[Dict], enqueued_at: float = None) -> int:
+        """
+        Queue check jobs for an execution (idempotent per check_id)
+
+        Args:
+            execution_id: Execution the jobs belong to
+            jobs: Dicts with check_id, activity_url and optional priority
+            enqueued_at: Cycle time recorded with the jobs (now by default);
+                workers plan each check's defect for this time
+
+        Returns:
+            Number of newly queued jobs
+        """
+
+        now = enqueued_at if enqueued_at is not None else time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (execution_id, check_id, activity_url, priority, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(execution_id, job["check_id"], job["activity_url"], job.get("priority", 0), now)
+                 for job in jobs]
+            )
+            return conn.total_changes - before
+
+    def lease(self, worker_id: str) -> Optional[Dict]:
+        """Lease the highest-priority queued job, or None if there is none"""
+
+        now = time.time()
+        with self._transaction(immediate=True) as conn:
+            self._requeue_expired(conn, now)
+
+            row = conn.execute(
+                "SELECT job_id, execution_id, check_id, activity_url, priority, attempts, enqueued_at FROM jobs "
+                "WHERE state = ? ORDER BY priority DESC, job_id LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET state = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE job_id = ?", (LEASED, worker_id, now + self.lease_seconds, row[0])
+            )
+
+        return {
+            "job_id": row[0], "execution_id": row[1], "check_id": row[2],
+            "activity_url": row[3], "priority": row[4], "attempts": row[5] + 1,
+            "enqueued_at": row[6]
+        }
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Extend a lease; False if the worker no longer owns the job"""
+
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND state = ? AND lease_owner = ?",
+                (time.time() + self.lease_seconds, job_id, LEASED, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, results: List[Dict]) -> bool:
+        """Store job results; ignored if the lease was lost to another worker"""
+
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, results = ?, finished_at = ?, lease_expires = NULL "
+                "WHERE job_id = ? AND state = ? AND lease_owner = ?",
+                (DONE, json.dumps(results, default=str), time.time(), job_id, LEASED, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """Give a job back after an error; re-queued until max_attempts"""
+
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = ?, lease_owner = NULL, lease_expires = NULL "
+                "WHERE job_id = ? AND state = ? AND lease_owner = ?",
+                (self.max_attempts, FAILED, QUEUED, error, job_id, LEASED, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def get_counts(self, execution_id: str = None) -> Dict[str, int]:
+        """Job counts by state"""
+
+        with self._transaction() as conn:
+            self._requeue_expired(conn, time.time())
+            if execution_id:
+                rows = conn.execute("SELECT state, COUNT(*) FROM jobs WHERE execution_id = ? GROUP BY state",
+                                    (execution_id,)).fetchall()
+            else:
+                rows = conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def wait_until_done(self, execution_id: str, timeout: float = 900,
+                        poll_interval: float = 1.0) -> bool:
+        """Block until no job of the execution is queued or leased"""
+
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            counts = self.get_counts(execution_id)
+            if counts[QUEUED] == 0 and counts[LEASED] == 0:
+                return True
+            time.sleep(poll_interval)
+        return False
+
+    def collect_results(self, execution_id: str) -> List[Dict]:
+        """Result records ({alert, report_row}) of finished jobs, in check order"""
+
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT check_id, activity_url, state, results, error FROM jobs "
+                "WHERE execution_id = ? ORDER BY check_id", (execution_id,)
+            ).fetchall()
+
+        records = []
+        for check_id, activity_url, state, results, error in rows:
+            if state == DONE and results:
+                records.extend(json.loads(results))
+            elif state == FAILED:
+                records.append(_failed_job_record(execution_id, check_id, activity_url, error))
+        return records
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float):
+        """Return expired leases to the queue (or fail them after max_attempts)"""
+
+        conn.execute(
+            "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "error = CASE WHEN attempts >= ? THEN 'Lease expired' ELSE error END, "
+            "lease_owner = NULL, lease_expires = NULL "
+            "WHERE state = ? AND lease_expires < ?",
+            (self.max_attempts, FAILED, QUEUED, self.max_attempts, LEASED, now)
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection in autocommit mode with WAL journaling"""
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self, immediate: bool = False):
+        return _Transaction(self._connection(), immediate)
+
+
+class _Transaction:
+    """Context manager wrapping BEGIN/COMMIT on an autocommit connection"""
+
+    def __init__(self, conn: sqlite3.Connection, immediate: bool):
+        self.conn = conn
+        self.immediate = immediate
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE" if self.immediate else "BEGIN")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def run_worker(db_path: str, runner: Callable[[Dict], List[Dict]] = None,
+               worker_id: str = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+               lease_seconds: float = 120, heartbeat_interval: float = None) -> int:
+    """
+    Lease and run jobs until the queue stays empty for idle_timeout seconds
+
+    Args:
+        db_path: Work queue database
+        runner: Function running a job and returning result records;
+            defaults to the activity's check backend (selenium_runner)
+        worker_id: Unique worker name (host:pid:random by default)
+        idle_timeout: Seconds without work before the worker exits
+        lease_seconds: Lease length
+        heartbeat_interval: Seconds between heartbeats (lease_seconds / 3)
+
+    Returns:
+        Number of jobs completed by this worker
+    """
+
+    queue = WorkQueue(db_path, lease_seconds=lease_seconds)
+    runner = runner or selenium_runner
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    heartbeat_interval = heartbeat_interval or lease_seconds / 3
+
+    completed = 0
+    idle_since = time.time()
+
+    while True:
+        job = queue.lease(worker_id)
+        if job is None:
+            if time.time() - idle_since > idle_timeout:
+                return completed
+            time.sleep(0.2)
+            continue
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=_heartbeat_loop,
+            args=(db_path, job["job_id"], worker_id, heartbeat_interval, lease_seconds, stop),
+            daemon=True
+        )
+        heartbeat.start()
+
+        try:
+            results = runner(job)
+            if queue.complete(job["job_id"], worker_id, results):
+                completed += 1
+        except Exception as e:
+            queue.fail(job["job_id"], worker_id, str(e))
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        idle_since = time.time()
+
+
+def _heartbeat_loop(db_path: str, job_id: int, worker_id: str, interval: float,
+                    lease_seconds: float, stop: threading.Event):
+    """Extend the lease until the job finishes or the lease is lost"""
+
+    queue = WorkQueue(db_path, lease_seconds=lease_seconds)
+    while not stop.wait(interval):
+        if not queue.heartbeat(job_id, worker_id):
+            return
+
+
+def start_local_workers(db_path: str, count: int, runner: Callable = None,
+                        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                        lease_seconds: float = 120) -> List[multiprocessing.Process]:
+    """
+    Spawn worker processes on this machine
+
+    Workers are started with the spawn method: a forked copy of the crawler
+    would inherit its browser sessions, probe threads and locks. runner must
+    therefore be a module-level function.
+    """
+
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for _ in range(count):
+        p = context.Process(
+            target=run_worker, args=(db_path, runner),
+            kwargs={"idle_timeout": idle_timeout, "lease_seconds": lease_seconds}
+        )
+        p.start()
+        processes.append(p)
+    return processes
+
+
+def stop_local_workers(processes: List[multiprocessing.Process], timeout: float = 0):
+    """Wait up to timeout seconds for workers to exit, then terminate the rest"""
+
+    deadline = time.time() + timeout
+    for p in processes:
+        p.join(max(0, deadline - time.time()))
+    for p in processes:
+        if p.is_alive():
+            p.terminate()
+            p.join()
+
+
+class _JobResults:
+    """Minimal sink collecting run_check results for one job"""
+
+    def __init__(self):
+        self.records = []
+
+    def put(self, alert_event: Dict, report_row: List = None):
+        self.records.append({"alert": alert_event, "report_row": report_row})
+
+
+_crawler_context = None
+
+
+def selenium_runner(job: Dict) -> List[Dict]:
+    """
+    Run a job on its activity's check backend
+
+    The worker process builds the crawler's probe components once (retry
+    queue, circuit breakers, rate limiter, DNS cache, content assertions and
+    screenshot store) and plans each check's defect for the cycle time the
+    job was queued with, like main() does for an in-process cycle.
+    """
+
+    global _crawler_context
+    import atexit
+    import axis3_enhanced as crawler
+    from check_backends import SELENIUM, load_activity_backends
+    from defect_injector import DefectInjector
+
+    if _crawler_context is None:
+        _crawler_context = {
+            "defect_injector": DefectInjector.from_env(),
+            "activity_backends": load_activity_backends(),
+            "components": crawler.build_check_components(),
+            "backends": {}
+        }
+        # Browsers kept by backends are shut down and breaker and screenshot
+        # state is saved when the worker exits
+        atexit.register(_close_crawler_context)
+
+    activity_name = crawler.extract_activity_name(job["activity_url"])
+    backend_name = _crawler_context["activity_backends"].get(activity_name, SELENIUM)
+    backends = _crawler_context["backends"]
+    if backend_name not in backends:
+        backends[backend_name] = crawler.build_backend(backend_name, _crawler_context["components"])
+
+    defect_injector = _crawler_context["defect_injector"]
+    defect_injector.plan_batch([job["check_id"]], [activity_name], job["enqueued_at"])
+
+    results = _JobResults()
+    backends[backend_name].run_check(
+        job["activity_url"], job["check_id"], results, job["execution_id"], defect_injector
+    )
+    return results.records
+
+
+def _close_crawler_context():
+    import axis3_enhanced as crawler
+
+    for backend in _crawler_context["backends"].values():
+        backend.close()
+    crawler.close_check_components(_crawler_context["components"])
+
+
+def _failed_job_record(execution_id: str, check_id: int, activity_url: str, error: str) -> Dict:
+    """Error alert for a job that exhausted its attempts"""
+
+    from datetime import datetime
+
+    return {
+        "alert": {
+            "alert_id": str(uuid.uuid4()),
+            "execution_id": execution_id,
+            "timestamp": datetime.now().isoformat(),
+            "check_id": check_id,
+            "activity_name": "Unknown",
+            "url": activity_url,
+            "status": "error",
+            "response_code": None,
+            "response_time": 0,
+            "error_message": f"Work queue job failed: {error}",
+            "is_simulated": False,
+            "severity": 7,
+            "retry_count": 0,
+            "source": "work_queue"
+        },
+        "report_row": [activity_url, None, "Error", error]
+    }
+
+
+def main():
+    """Command line entry point"""
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "worker"
+    queue = WorkQueue.from_env()
+    execution_id = os.getenv('EXECUTION_ID', 'local')
+
+    if command == "enqueue":
+        from axis3_enhanced import extract_activity_name, is_critical_activity
+        from alert_engine import ActionabilityScorer
+
+        base_url = os.getenv('ACTIVITY_BASE_URL', "https://kingnstarpancard-code.github.io/axis_automation")
+        critical_services = ActionabilityScorer().critical_services
+        jobs = []
+        for i in range(1, int(os.getenv('ACTIVITY_COUNT', '7')) + 1):
+            url = f"{base_url}/activity{i}.html"
+            jobs.append({"check_id": i, "activity_url": url,
+                         "priority": 1 if is_critical_activity(url, critical_services) else 0})
+        added = queue.enqueue(execution_id, jobs)
+        print(f"✓ Queued {added} jobs for execution {execution_id}")
+
+    elif command == "worker":
+        count = int(os.getenv('WORKER_PROCESSES', '1'))
+        idle_timeout = float(os.getenv('WORKER_IDLE_TIMEOUT', str(DEFAULT_IDLE_TIMEOUT)))
+        if count == 1:
+            done = run_worker(queue.db_path, idle_timeout=idle_timeout, lease_seconds=queue.lease_seconds)
+            print(f"✓ Worker finished {done} jobs")
+        else:
+            for p in start_local_workers(queue.db_path, count, idle_timeout=idle_timeout,
+                                         lease_seconds=queue.lease_seconds):
+                p.join()
+            print(f"✓ {count} workers finished")
+
+    elif command == "collect":
+        records = queue.collect_results(execution_id)
+        with open("raw_alerts.json", "w") as f:
+            json.dump([r["alert"] for r in records], f, indent=2, default=str)
+        print(f"✓ Collected {len(records)} results into raw_alerts.json")
+        print(f"  Job states: {queue.get_counts(execution_id)}")
+
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()